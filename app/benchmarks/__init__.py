@@ -0,0 +1,9 @@
+from .fake_server import FakeAnythingLLMServer, FakeServerConfig
+from .harness import BenchmarkResult, run_benchmarks
+
+__all__ = [
+    "FakeAnythingLLMServer",
+    "FakeServerConfig",
+    "BenchmarkResult",
+    "run_benchmarks"
+]
@@ -0,0 +1,161 @@
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_CHAT_RE = re.compile(r"/v1/workspace/[^/]+(?:/thread/[^/]+)?/(chat|stream-chat)$")
+
+
+class FakeServerConfig:
+    """
+    Comportement du faux serveur AnythingLLM.
+
+    :param latency: Délai en secondes avant chaque réponse (simule le backend et le LLM).
+    :param chat_response_size: Taille en caractères de la réponse d'un chat.
+    :param stream_chunks: Nombre de fragments envoyés par stream-chat.
+    :param stream_chunk_delay: Délai en secondes entre deux fragments de stream-chat.
+    :param embedding_dim: Dimension des vecteurs renvoyés par /v1/openai/embeddings.
+    """
+    def __init__(self, latency=0.0, chat_response_size=512, stream_chunks=32, stream_chunk_delay=0.0, embedding_dim=384):
+        self.latency = latency
+        self.chat_response_size = chat_response_size
+        self.stream_chunks = stream_chunks
+        self.stream_chunk_delay = stream_chunk_delay
+        self.embedding_dim = embedding_dim
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # En-têtes et corps sont écrits séparément : sans TCP_NODELAY, Nagle ajoute ~40 ms par réponse
+    disable_nagle_algorithm = True
+
+    @property
+    def config(self):
+        return self.server.config
+
+    def _path(self):
+        path = self.path.split("?", 1)[0]
+        version = path.find("/v1/")
+        return path[version:] if version >= 0 else path
+
+    def _send_json(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self):
+        if self.headers.get("Authorization", "").startswith("Bearer "):
+            return True
+        self._send_json({"message": "Invalid API Key"}, 403)
+        return False
+
+    def do_GET(self):
+        time.sleep(self.config.latency)
+        if not self._authorized():
+            return
+        if self._path() == "/v1/auth":
+            return self._send_json({"authenticated": True})
+        self._send_json({"message": "Not found"}, 404)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(self.config.latency)
+        if not self._authorized():
+            return
+        path = self._path()
+        chat = _CHAT_RE.search(path)
+        if chat and chat.group(1) == "stream-chat":
+            return self._stream_chat()
+        if chat:
+            return self._send_json({
+                "id": uuid.uuid4().hex,
+                "type": "textResponse",
+                "textResponse": "x" * self.config.chat_response_size,
+                "sources": [],
+                "close": True,
+                "error": None
+            })
+        if path == "/v1/document/upload":
+            return self._send_json({
+                "success": True,
+                "error": None,
+                "documents": [{"location": f"custom-documents/upload-{uuid.uuid4().hex}.json", "size": len(body)}]
+            })
+        if path == "/v1/openai/embeddings":
+            inputs = json.loads(body).get("input") or []
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            vector = [0.001 * i for i in range(self.config.embedding_dim)]
+            return self._send_json({
+                "object": "list",
+                "data": [{"object": "embedding", "embedding": vector, "index": i} for i in range(len(inputs))],
+                "model": "fake-embedder"
+            })
+        self._send_json({"message": "Not found"}, 404)
+
+    def _write_chunk(self, data):
+        self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+        self.wfile.flush()
+
+    def _stream_chat(self):
+        # Réponse découpée (chunked) pour que chaque fragment arrive séparément au client
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        chat_id = uuid.uuid4().hex
+        piece = "x" * max(1, self.config.chat_response_size // max(1, self.config.stream_chunks))
+        for index in range(self.config.stream_chunks):
+            if index and self.config.stream_chunk_delay:
+                time.sleep(self.config.stream_chunk_delay)
+            frame = {"id": chat_id, "type": "textResponseChunk", "textResponse": piece, "sources": [], "close": False, "error": None}
+            self._write_chunk(b"data: " + json.dumps(frame).encode() + b"\n\n")
+        frame = {"id": chat_id, "type": "textResponseChunk", "textResponse": "", "sources": [], "close": True, "error": None}
+        self._write_chunk(b"data: " + json.dumps(frame).encode() + b"\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # La file par défaut (5) fait perdre des connexions sous forte concurrence
+    request_queue_size = 1024
+
+
+class FakeAnythingLLMServer:
+    """
+    Serveur HTTP local imitant les endpoints AnythingLLM utilisés par les benchmarks :
+    /v1/auth, /v1/workspace/{slug}/chat, stream-chat, /v1/document/upload et /v1/openai/embeddings.
+    """
+    def __init__(self, config=None, host="127.0.0.1", port=0):
+        self.config = config or FakeServerConfig()
+        self._server = _Server((host, port), _Handler)
+        self._server.config = self.config
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
@@ -0,0 +1,298 @@
+import asyncio
+import os
+import platform
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from services.async_services import (
+    AsyncAuthentificationService,
+    AsyncDocumentService,
+    AsyncOpenAICompatibleService,
+    AsyncWorkspaceService
+)
+from services.async_transport import AsyncHttpTransport
+from services.authentification import AuthentificationService
+from services.documents import DocumentService
+from services.openai_compatible_service import OpenAICompatibleService
+from services.transport import HttpTransport
+from services.workspace import WorkspaceService
+
+SCENARIOS = ("auth", "chat", "stream_chat", "upload", "embeddings")
+PATHS = ("sync", "pooled", "async")
+
+
+def percentile(values, p):
+    """
+    Percentile par interpolation linéaire (p entre 0 et 100) ; None pour une liste vide.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * p / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class BenchmarkResult:
+    """
+    Résultat d'un scénario sur un chemin client (sync, pooled ou async).
+    """
+    def __init__(self, scenario, path, latencies, errors, duration, ttfts=None, memory_peak=None):
+        self.scenario = scenario
+        self.path = path
+        self.latencies = latencies
+        self.errors = errors
+        self.duration = duration
+        self.ttfts = ttfts or []
+        self.memory_peak = memory_peak
+
+    @property
+    def requests_per_second(self):
+        return len(self.latencies) / self.duration if self.duration else 0.0
+
+    def as_dict(self):
+        return {
+            "scenario": self.scenario,
+            "path": self.path,
+            "requests": len(self.latencies),
+            "errors": self.errors,
+            "duration": self.duration,
+            "requests_per_second": self.requests_per_second,
+            "latency_p50": percentile(self.latencies, 50),
+            "latency_p99": percentile(self.latencies, 99),
+            "latency_mean": sum(self.latencies) / len(self.latencies) if self.latencies else None,
+            "ttft_p50": percentile(self.ttfts, 50),
+            "ttft_p99": percentile(self.ttfts, 99),
+            "memory_peak_bytes": self.memory_peak
+        }
+
+
+def _configure(base_url, *services):
+    for service in services:
+        service.base_url = base_url
+    return services
+
+
+class _SyncClient:
+    def __init__(self, base_url, transport):
+        # Sans cache, chaque appel du scénario "auth" atteint le serveur
+        self.auth_uncached = AuthentificationService(transport=transport, cache_ttl=0, negative_cache_ttl=0)
+        self.auth_service = AuthentificationService(transport=transport)
+        self.workspace_service = WorkspaceService(auth_service=self.auth_service, transport=transport)
+        self.document_service = DocumentService(auth_service=self.auth_service, transport=transport)
+        self.openai_service = OpenAICompatibleService(auth_service=self.auth_service, transport=transport)
+        _configure(base_url, self.auth_uncached, self.auth_service, self.workspace_service, self.document_service, self.openai_service)
+
+    def call(self, scenario, workload):
+        """
+        Exécute un appel ; retourne (ok, ttft).
+        """
+        token = workload.token
+        if scenario == "auth":
+            return self.auth_uncached.auth(Authorization=token)[1] == 200, None
+        if scenario == "chat":
+            return self.workspace_service.chat_with_workspace("bench", workload.chat_data, token)[1] == 200, None
+        if scenario == "stream_chat":
+            stream, status_code = self.workspace_service.stream_chat_with_workspace("bench", workload.chat_data, token)
+            if status_code != 200:
+                return False, None
+            stream.text()
+            return True, stream.metrics.time_to_first_token
+        if scenario == "upload":
+            return self.document_service.upload_file(workload.upload_path, token)[1] == 200, None
+        if scenario == "embeddings":
+            return self.openai_service.get_embeddings(workload.texts, token)[1] == 200, None
+        raise ValueError(f"Unknown scenario: {scenario}")
+
+
+class _AsyncClient:
+    def __init__(self, base_url, transport):
+        self.auth_uncached = AsyncAuthentificationService(transport=transport, cache_ttl=0, negative_cache_ttl=0)
+        self.auth_service = AsyncAuthentificationService(transport=transport)
+        self.workspace_service = AsyncWorkspaceService(auth_service=self.auth_service, transport=transport)
+        self.document_service = AsyncDocumentService(auth_service=self.auth_service, transport=transport)
+        self.openai_service = AsyncOpenAICompatibleService(auth_service=self.auth_service, transport=transport)
+        _configure(base_url, self.auth_uncached, self.auth_service, self.workspace_service, self.document_service, self.openai_service)
+
+    async def call(self, scenario, workload):
+        token = workload.token
+        if scenario == "auth":
+            return (await self.auth_uncached.auth(Authorization=token))[1] == 200, None
+        if scenario == "chat":
+            return (await self.workspace_service.chat_with_workspace("bench", workload.chat_data, token))[1] == 200, None
+        if scenario == "stream_chat":
+            stream, status_code = await self.workspace_service.stream_chat_with_workspace("bench", workload.chat_data, token)
+            if status_code != 200:
+                return False, None
+            await stream.text()
+            return True, stream.metrics.time_to_first_token
+        if scenario == "upload":
+            return (await self.document_service.upload_file(workload.upload_path, token))[1] == 200, None
+        if scenario == "embeddings":
+            return (await self.openai_service.get_embeddings(workload.texts, token))[1] == 200, None
+        raise ValueError(f"Unknown scenario: {scenario}")
+
+
+class _Workload:
+    def __init__(self, token, upload_path, embedding_inputs):
+        self.token = token
+        self.upload_path = upload_path
+        self.chat_data = {"message": "How fast is this client?", "mode": "chat"}
+        self.texts = [f"benchmark input {i}" for i in range(embedding_inputs)]
+
+
+class _Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = []
+        self.ttfts = []
+        self.errors = 0
+
+    def record(self, started_at, ok, ttft):
+        latency = time.perf_counter() - started_at
+        with self.lock:
+            if ok:
+                self.latencies.append(latency)
+                if ttft is not None:
+                    self.ttfts.append(ttft)
+            else:
+                self.errors += 1
+
+
+def _run_sync(base_url, scenario, workload, requests):
+    # Chemin historique : appels séquentiels, une nouvelle connexion par requête
+    recorder = _Recorder()
+    for _ in range(requests):
+        with HttpTransport() as transport:
+            client = _SyncClient(base_url, transport)
+            started_at = time.perf_counter()
+            try:
+                ok, ttft = client.call(scenario, workload)
+            except Exception:
+                ok, ttft = False, None
+            recorder.record(started_at, ok, ttft)
+    return recorder
+
+
+def _run_pooled(base_url, scenario, workload, requests, concurrency):
+    recorder = _Recorder()
+    with HttpTransport(pool_maxsize=concurrency) as transport:
+        client = _SyncClient(base_url, transport)
+
+        def one(_):
+            started_at = time.perf_counter()
+            try:
+                ok, ttft = client.call(scenario, workload)
+            except Exception:
+                ok, ttft = False, None
+            recorder.record(started_at, ok, ttft)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            list(executor.map(one, range(requests)))
+    return recorder
+
+
+def _run_async(base_url, scenario, workload, requests, concurrency):
+    recorder = _Recorder()
+
+    async def main():
+        async with AsyncHttpTransport(max_connections=concurrency, max_keepalive_connections=concurrency) as transport:
+            client = _AsyncClient(base_url, transport)
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def one():
+                async with semaphore:
+                    started_at = time.perf_counter()
+                    try:
+                        ok, ttft = await client.call(scenario, workload)
+                    except Exception:
+                        ok, ttft = False, None
+                    recorder.record(started_at, ok, ttft)
+
+            await asyncio.gather(*[one() for _ in range(requests)])
+
+    asyncio.run(main())
+    return recorder
+
+
+def run_benchmarks(base_url, scenarios=SCENARIOS, paths=PATHS, requests=200, concurrency=16, token="bench-token",
+                   upload_size=64 * 1024, embedding_inputs=16, trace_memory=True):
+    """
+    Exécute chaque scénario sur chaque chemin client et retourne un dictionnaire sérialisable en JSON
+    {"meta": {...}, "results": [BenchmarkResult.as_dict(), ...]}.
+
+    :param base_url: URL de base du serveur (ex: FakeAnythingLLMServer.base_url).
+    :param requests: Nombre d'appels par scénario et par chemin.
+    :param concurrency: Nombre d'appels simultanés pour les chemins pooled et async.
+    :param trace_memory: Mesurer le pic d'allocations Python (tracemalloc) ; ralentit légèrement les appels.
+    """
+    unknown = set(scenarios) - set(SCENARIOS) | set(paths) - set(PATHS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios or paths: {', '.join(sorted(unknown))}")
+
+    with tempfile.NamedTemporaryFile(suffix=".txt", delete=False) as upload_file:
+        upload_file.write(b"b" * upload_size)
+    workload = _Workload(token, upload_file.name, embedding_inputs)
+    results = []
+    try:
+        for scenario in scenarios:
+            for path in paths:
+                if trace_memory:
+                    tracemalloc.start()
+                started_at = time.perf_counter()
+                if path == "sync":
+                    recorder = _run_sync(base_url, scenario, workload, requests)
+                elif path == "pooled":
+                    recorder = _run_pooled(base_url, scenario, workload, requests, concurrency)
+                else:
+                    recorder = _run_async(base_url, scenario, workload, requests, concurrency)
+                duration = time.perf_counter() - started_at
+                memory_peak = None
+                if trace_memory:
+                    memory_peak = tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                results.append(BenchmarkResult(
+                    scenario, path, recorder.latencies, recorder.errors, duration, recorder.ttfts, memory_peak
+                ).as_dict())
+    finally:
+        os.remove(upload_file.name)
+
+    return {
+        "meta": {
+            "timestamp": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "requests": requests,
+            "concurrency": concurrency,
+            "upload_size": upload_size,
+            "embedding_inputs": embedding_inputs
+        },
+        "results": results
+    }
+
+
+def compare(previous, current, tolerance=0.1):
+    """
+    Compare deux sorties de run_benchmarks et retourne les régressions : baisse du débit ou hausse
+    de la latence p99 de plus de `tolerance` (10 % par défaut).
+    """
+    before = {(r["scenario"], r["path"]): r for r in previous["results"]}
+    regressions = []
+    for result in current["results"]:
+        old = before.get((result["scenario"], result["path"]))
+        if old is None:
+            continue
+        if old["requests_per_second"] and result["requests_per_second"] < old["requests_per_second"] * (1 - tolerance):
+            regressions.append({**_key(result), "metric": "requests_per_second",
+                                "before": old["requests_per_second"], "after": result["requests_per_second"]})
+        if old["latency_p99"] and result["latency_p99"] and result["latency_p99"] > old["latency_p99"] * (1 + tolerance):
+            regressions.append({**_key(result), "metric": "latency_p99",
+                                "before": old["latency_p99"], "after": result["latency_p99"]})
+    return regressions
+
+
+def _key(result):
+    return {"scenario": result["scenario"], "path": result["path"]}
@@ -0,0 +1,79 @@
+import argparse
+import json
+import sys
+import time
+from benchmarks import FakeAnythingLLMServer, FakeServerConfig, run_benchmarks
+from benchmarks.harness import PATHS, SCENARIOS, compare
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark des services contre un faux serveur AnythingLLM local.")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIOS), choices=SCENARIOS)
+    parser.add_argument("--paths", nargs="+", default=list(PATHS), choices=PATHS)
+    parser.add_argument("--requests", type=int, default=200, help="Appels par scénario et par chemin")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence simulée du serveur, en secondes")
+    parser.add_argument("--chat-size", type=int, default=512, help="Taille de la réponse de chat, en caractères")
+    parser.add_argument("--stream-chunks", type=int, default=32)
+    parser.add_argument("--stream-chunk-delay", type=float, default=0.0)
+    parser.add_argument("--embedding-dim", type=int, default=384)
+    parser.add_argument("--upload-size", type=int, default=64 * 1024)
+    parser.add_argument("--serve", type=int, metavar="PORT", help="Lancer seulement le faux serveur sur ce port")
+    parser.add_argument("--server-url", help="URL d'un faux serveur lancé à part avec --serve")
+    parser.add_argument("--no-memory", action="store_true", help="Ne pas mesurer la mémoire (tracemalloc)")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", help="Résultats précédents : code de sortie 1 en cas de régression")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args()
+
+    config = FakeServerConfig(
+        latency=args.latency,
+        chat_response_size=args.chat_size,
+        stream_chunks=args.stream_chunks,
+        stream_chunk_delay=args.stream_chunk_delay,
+        embedding_dim=args.embedding_dim
+    )
+    if args.serve:
+        with FakeAnythingLLMServer(config, port=args.serve) as server:
+            print("Faux serveur AnythingLLM :", server.base_url)
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                sys.exit(0)
+
+    options = dict(
+        scenarios=args.scenarios,
+        paths=args.paths,
+        requests=args.requests,
+        concurrency=args.concurrency,
+        upload_size=args.upload_size,
+        trace_memory=not args.no_memory
+    )
+    if args.server_url:
+        report = run_benchmarks(args.server_url, **options)
+        report["meta"]["server"] = args.server_url
+    else:
+        # Serveur dans le même processus : il partage le GIL avec le client mesuré
+        with FakeAnythingLLMServer(config) as server:
+            report = run_benchmarks(server.base_url, **options)
+        report["meta"]["server"] = vars(config)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for result in report["results"]:
+        ttft = f" ttft p50={result['ttft_p50'] * 1000:.1f}ms" if result["ttft_p50"] is not None else ""
+        p50 = result["latency_p50"] or 0
+        p99 = result["latency_p99"] or 0
+        print(
+            f"{result['scenario']:<12} {result['path']:<7} {result['requests_per_second']:>9.1f} req/s "
+            f"p50={p50 * 1000:.1f}ms p99={p99 * 1000:.1f}ms errors={result['errors']}{ttft}"
+        )
+    print("Résultats enregistrés dans", args.output)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(json.load(f), report, args.tolerance)
+        for regression in regressions:
+            print("Régression :", regression)
+        sys.exit(1 if regressions else 0)
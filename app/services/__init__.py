@@ -1,4 +1,15 @@
 
+from .resilience import RetryPolicy, CircuitBreaker, CircuitOpenError
+from .rate_limit import RateLimiter, RateLimit
+from .scheduler import RequestScheduler, request_priority
+from .instrumentation import Instrumentation
+from .transport import HttpTransport
+from .pipeline import RequestPipeline, BaseService, AuthMiddleware, RetryMiddleware, MetricsMiddleware
+from .response_cache import ResponseCache, CacheMiddleware
+from .single_flight import SingleFlight, AsyncSingleFlight, SingleFlightMiddleware
+from .upload_index import UploadIndex
+from .embedding_cache import EmbeddingCache
+from .embedding_batcher import EmbeddingBatcher
 from .authentification import AuthentificationService
 from .admin import AdminService
 from .documents import DocumentService
@@ -8,8 +19,46 @@ from .systemsettings import SystemSettingsService
 from .usermanagement import UserManagementService
 from .workspace import WorkspaceService
 from .workspacethread import WorkspaceThreadService
+from .ingestion import DocumentIngestionService
+from .chat_sync import ChatHistoryStore, ChatHistorySync
+from .fan_out import ChatFanOut, AsyncChatFanOut, FanOutResult
+from .async_transport import AsyncHttpTransport
+from .stream_mux import AsyncStreamMultiplexer, MultiplexedEvent
+from .async_services import (
+    AsyncAuthentificationService,
+    AsyncAdminService,
+    AsyncDocumentService,
+    AsyncEmbedService,
+    AsyncOpenAICompatibleService,
+    AsyncSystemSettingsService,
+    AsyncUserManagementService,
+    AsyncWorkspaceService,
+    AsyncWorkspaceThreadService
+)
 
 __all__ = [
+    "RetryPolicy",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "RateLimiter",
+    "RateLimit",
+    "RequestScheduler",
+    "request_priority",
+    "Instrumentation",
+    "HttpTransport",
+    "RequestPipeline",
+    "BaseService",
+    "AuthMiddleware",
+    "RetryMiddleware",
+    "MetricsMiddleware",
+    "ResponseCache",
+    "CacheMiddleware",
+    "SingleFlight",
+    "AsyncSingleFlight",
+    "SingleFlightMiddleware",
+    "UploadIndex",
+    "EmbeddingCache",
+    "EmbeddingBatcher",
     "AuthentificationService",
     "AdminService",
     "DocumentService",
@@ -18,7 +67,25 @@ __all__ = [
     "SystemSettingsService",
     "UserManagementService",
     "WorkspaceService",
-    "WorkspaceThreadService"
+    "WorkspaceThreadService",
+    "DocumentIngestionService",
+    "ChatHistoryStore",
+    "ChatHistorySync",
+    "ChatFanOut",
+    "AsyncChatFanOut",
+    "FanOutResult",
+    "AsyncHttpTransport",
+    "AsyncStreamMultiplexer",
+    "MultiplexedEvent",
+    "AsyncAuthentificationService",
+    "AsyncAdminService",
+    "AsyncDocumentService",
+    "AsyncEmbedService",
+    "AsyncOpenAICompatibleService",
+    "AsyncSystemSettingsService",
+    "AsyncUserManagementService",
+    "AsyncWorkspaceService",
+    "AsyncWorkspaceThreadService"
 ]
 
 
@@ -0,0 +1,566 @@
+import httpx
+import os
+import time
+from dotenv import load_dotenv
+from .async_transport import AsyncHttpTransport
+from .authentification import AsyncTokenInvalidationHook, TokenCache, bearer, register_token_cache
+from .multipart import MultipartFileEncoder
+from .sse import AsyncChatEventStream
+
+
+class AsyncAuthentificationService:
+    def __init__(self, transport=None, cache_ttl=None, negative_cache_ttl=None):
+        load_dotenv()
+        self.base_url = os.getenv("BASE_URL")
+        self.ssl_verify = os.getenv("SSL_VERIFY", "true").lower() == "true"
+        self.transport = transport or AsyncHttpTransport(verify=self.ssl_verify)
+        self.token_cache = TokenCache.from_env(cache_ttl, negative_cache_ttl)
+
+        # Invalider le token dès qu'un appel en aval répond 401/403
+        register_token_cache(self.transport, self.token_cache, AsyncTokenInvalidationHook)
+
+    @property
+    def cache_hits(self):
+        return self.token_cache.hits
+
+    @property
+    def cache_misses(self):
+        return self.token_cache.misses
+
+    async def auth(self, **kwargs):
+        token = kwargs.get("Authorization")
+        if not token:
+            return {"error": "No authorization token provided."}, 403
+
+        token = bearer(token)
+        cached = self.token_cache.get(token)
+        instrumentation = getattr(self.transport, "instrumentation", None)
+        if instrumentation is not None:
+            instrumentation.record_auth_cache(hit=cached is not None)
+        if cached is not None:
+            return cached
+
+        result = await self._validate(token)
+        self.token_cache.store(token, result)
+        return result
+
+    async def _validate(self, token):
+        url = f"{self.base_url}/v1/auth"
+        headers = {"Authorization": token}
+
+        try:
+            response = await self.transport.get(url, headers=headers)
+            response.raise_for_status()
+            return response.json(), response.status_code
+
+        except httpx.HTTPStatusError:
+            try:
+                error_details = response.json()
+                error_message = error_details.get("message", str(error_details))
+            except ValueError:
+                error_message = response.text
+
+            if response.status_code == 403:
+                return {"error": f"Invalid API Key: {error_message}"}, 403
+            return {"error": f"Authentication service error: {error_message}"}, response.status_code
+
+        except httpx.RequestError as e:
+            return {"error": f"Failed to connect to the authentication service: {str(e)}"}, 500
+
+        except ValueError as e:
+            # Corps 2xx qui n'est pas du JSON : réponse invalide, pas une erreur de connexion
+            return {"error": "Invalid authentication response", "details": str(e)}, 502
+
+    def invalidate(self, token=None):
+        """
+        Supprime un token du cache de validation, ou vide tout le cache si aucun token n'est donné.
+        """
+        self.token_cache.invalidate(bearer(token) if token else None)
+
+
+class AsyncBaseService:
+    """
+    Base commune des services async : mêmes retours (payload, status_code) que les services synchrones.
+
+    :param single_flight: AsyncSingleFlight optionnel (partageable entre services) qui regroupe les GET identiques en cours.
+    """
+    def __init__(self, auth_service=None, transport=None, single_flight=None):
+        load_dotenv()
+        self.auth_service = auth_service or AsyncAuthentificationService(transport=transport)
+        self.transport = transport or self.auth_service.transport
+        self.base_url = os.getenv("BASE_URL")
+        self.single_flight = single_flight
+
+    def _http_error(self, response, http_err):
+        return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
+
+    def _request_error(self, req_err):
+        return {"error": "Request exception occurred", "details": str(req_err)}, 500
+
+    async def handle_request(self, method, url, token, success_payload=None, decode_error="Invalid response", **kwargs):
+        """
+        Gère les requêtes HTTP pour les méthodes du service.
+        Un corps de succès qui n'est pas du JSON retourne ({"error": decode_error, ...}, 502), comme le pipeline sync.
+        """
+        headers = {"Authorization": f"Bearer {token}", **kwargs.pop("headers", {})}
+        try:
+            response = await self.transport.request(method, url, headers=headers, **kwargs)
+            response.raise_for_status()
+            if success_payload is not None:
+                return success_payload, response.status_code
+            return response.json(), response.status_code
+        except httpx.HTTPStatusError as http_err:
+            return self._http_error(http_err.response, http_err)
+        except httpx.RequestError as req_err:
+            return self._request_error(req_err)
+        except ValueError as decode_err:
+            return {"error": decode_error, "details": str(decode_err)}, 502
+
+    async def _call(self, method, path, token, **kwargs):
+        auth_response, status_code = await self.auth_service.auth(Authorization=token)
+        if status_code != 200:
+            return {"error": "Authentication failed", "details": auth_response}, status_code
+        url = f"{self.base_url}{path}"
+        if self.single_flight is not None and method == "GET":
+            key = (token, url, tuple(sorted((kwargs.get("params") or {}).items())))
+            return await self.single_flight.do(key, lambda: self.handle_request(method, url, token, **kwargs))
+        return await self.handle_request(method, url, token, **kwargs)
+
+    async def _stream(self, method, path, token, idle_timeout=None, buffer_size=None, stall_timeout=None, **kwargs):
+        auth_response, status_code = await self.auth_service.auth(Authorization=token)
+        if status_code != 200:
+            return {"error": "Authentication failed", "details": auth_response}, status_code
+
+        url = f"{self.base_url}{path}"
+        headers = {"Authorization": f"Bearer {token}"}
+        started_at = time.perf_counter()
+        try:
+            response = await self.transport.open_stream(method, url, headers=headers, **kwargs)
+        except httpx.RequestError as req_err:
+            return self._request_error(req_err)
+
+        try:
+            if response.is_error:
+                # Lire le corps de l'erreur avant de libérer la connexion
+                await response.aread()
+                response.raise_for_status()
+        except httpx.HTTPStatusError as http_err:
+            await self.transport.close_stream(response)
+            return self._http_error(response, http_err)
+        except httpx.RequestError as req_err:
+            await self.transport.close_stream(response)
+            return self._request_error(req_err)
+        stream = AsyncChatEventStream(
+            response, self.transport, started_at=started_at, idle_timeout=idle_timeout,
+            buffer_size=buffer_size, stall_timeout=stall_timeout
+        )
+        return stream, response.status_code
+
+
+class _HandleRequestErrorsMixin:
+    # Format d'erreur de AdminService.handle_request / DocumentService.handle_request
+    def _http_error(self, response, http_err):
+        try:
+            error_details = response.json()
+            error_message = error_details.get("message", str(error_details))
+        except ValueError:
+            error_message = response.text
+        return {"error": f"HTTP Error: {error_message}"}, response.status_code
+
+    def _request_error(self, req_err):
+        return {"error": f"Request failed: {str(req_err)}"}, 500
+
+
+class AsyncAdminService(_HandleRequestErrorsMixin, AsyncBaseService):
+    async def is_multi_user_mode(self, token):
+        """
+        GET /v1/admin/is-multi-user-mode
+        Vérifie si l'instance est en mode multi-utilisateur.
+        """
+        return await self._call("GET", "/v1/admin/is-multi-user-mode", token)
+
+    async def list_users(self, token):
+        """
+        GET /v1/admin/users
+        Récupère la liste de tous les utilisateurs en mode multi-utilisateur.
+        """
+        return await self._call("GET", "/v1/admin/users", token)
+
+    async def create_user(self, username, password, role, token):
+        """
+        POST /v1/admin/users/new
+        Crée un nouvel utilisateur avec un nom d'utilisateur, un mot de passe et un rôle.
+        """
+        data = {
+            "username": username,
+            "password": password,
+            "role": role
+        }
+        return await self._call("POST", "/v1/admin/users/new", token, json=data)
+
+    async def update_user(self, user_id, username=None, password=None, role=None, suspended=None, token=None):
+        """
+        POST /v1/admin/users/{id}
+        Met à jour les informations d'un utilisateur spécifique.
+        """
+        data = {k: v for k, v in {
+            "username": username,
+            "password": password,
+            "role": role,
+            "suspended": suspended
+        }.items() if v is not None}
+        return await self._call("POST", f"/v1/admin/users/{user_id}", token, json=data)
+
+    async def delete_user(self, user_id, token):
+        """
+        DELETE /v1/admin/users/{id}
+        Supprime un utilisateur par son identifiant.
+        """
+        return await self._call("DELETE", f"/v1/admin/users/{user_id}", token)
+
+    async def list_invites(self, token):
+        """
+        GET /v1/admin/invites
+        Liste toutes les invitations existantes.
+        """
+        return await self._call("GET", "/v1/admin/invites", token)
+
+    async def create_invite(self, workspace_ids, token):
+        """
+        POST /v1/admin/invite/new
+        Crée une nouvelle invitation pour enregistrer un utilisateur dans l'instance.
+        """
+        return await self._call("POST", "/v1/admin/invite/new", token, json={"workspaceIds": workspace_ids})
+
+    async def deactivate_invite(self, invite_id, token):
+        """
+        DELETE /v1/admin/invite/{id}
+        Désactive une invitation par son identifiant.
+        """
+        return await self._call("DELETE", f"/v1/admin/invite/{invite_id}", token)
+
+
+class AsyncDocumentService(_HandleRequestErrorsMixin, AsyncBaseService):
+    async def upload_file(self, file_path, token, chunk_size=64 * 1024, progress_callback=None, use_mmap=False):
+        """
+        POST /v1/document/upload
+        Upload un nouveau fichier pour être parsé et préparé pour embedding, envoyé par morceaux.
+        """
+        try:
+            body = MultipartFileEncoder('file', file_path, chunk_size=chunk_size, use_mmap=use_mmap, progress_callback=progress_callback)
+            return await self._call("POST", "/v1/document/upload", token, content=body.aiter_chunks(), headers=body.headers)
+        except Exception as e:
+            return {"error": f"Unexpected error during file upload: {str(e)}"}, 500
+
+    async def upload_link(self, link, token):
+        """
+        POST /v1/document/upload-link
+        Upload un lien valide pour être scrappé et préparé pour embedding.
+        """
+        return await self._call("POST", "/v1/document/upload-link", token, json={"link": link})
+
+    async def upload_raw_text(self, text_content, metadata, token):
+        """
+        POST /v1/document/raw-text
+        Upload de texte brut avec des métadonnées sans nécessiter de fichier.
+        """
+        json_data = {
+            "textContent": text_content,
+            "metadata": metadata
+        }
+        return await self._call("POST", "/v1/document/raw-text", token, json=json_data)
+
+    async def list_documents(self, token):
+        """
+        GET /v1/documents
+        Obtenir la liste de tous les documents stockés localement.
+        """
+        return await self._call("GET", "/v1/documents", token)
+
+    async def get_accepted_file_types(self, token):
+        """
+        GET /v1/document/accepted-file-types
+        Obtenir les types de fichiers acceptés pour l'upload.
+        """
+        return await self._call("GET", "/v1/document/accepted-file-types", token)
+
+    async def get_metadata_schema(self, token):
+        """
+        GET /v1/document/metadata-schema
+        Récupère le schéma des métadonnées pour les uploads de texte brut.
+        """
+        return await self._call("GET", "/v1/document/metadata-schema", token)
+
+    async def get_document_by_name(self, doc_name, token):
+        """
+        GET /v1/document/{docName}
+        Récupère un document par son nom unique.
+        """
+        return await self._call("GET", f"/v1/document/{doc_name}", token)
+
+    async def create_folder(self, folder_name, token):
+        """
+        POST /v1/document/create-folder
+        Crée un nouveau dossier dans le répertoire de stockage des documents.
+        """
+        return await self._call("POST", "/v1/document/create-folder", token, json={"name": folder_name})
+
+    async def move_files(self, files_to_move, token):
+        """
+        POST /v1/document/move-files
+        Déplace des fichiers dans le répertoire de stockage des documents.
+
+        :param files_to_move: Liste de dictionnaires contenant les chemins 'from' et 'to' de chaque fichier.
+        """
+        return await self._call("POST", "/v1/document/move-files", token, json={"files": files_to_move})
+
+
+class AsyncEmbedService(AsyncBaseService):
+    async def list_embeds(self, token):
+        """
+        GET /v1/embed
+        Récupère la liste de tous les embeds actifs.
+        """
+        return await self._call("GET", "/v1/embed", token)
+
+    async def get_chats_for_embed(self, embed_uuid, token):
+        """
+        GET /v1/embed/{embedUuid}/chats
+        Récupère toutes les conversations pour un embed spécifique.
+        """
+        return await self._call("GET", f"/v1/embed/{embed_uuid}/chats", token)
+
+    async def get_chats_for_embed_session(self, embed_uuid, session_uuid, token):
+        """
+        GET /v1/embed/{embedUuid}/chats/{sessionUuid}
+        Récupère les conversations pour un embed et une session spécifiques.
+        """
+        return await self._call("GET", f"/v1/embed/{embed_uuid}/chats/{session_uuid}", token)
+
+
+class AsyncOpenAICompatibleService(AsyncBaseService):
+    async def list_models(self, token):
+        """
+        GET /v1/openai/models
+        Récupère tous les modèles disponibles (workspaces pour le chat).
+        """
+        return await self._call("GET", "/v1/openai/models", token)
+
+    async def chat_completions(self, model_slug, messages, token, stream=False, temperature=0.7):
+        """
+        POST /v1/openai/chat/completions
+        Exécute une conversation avec un workspace en mode compatibilité OpenAI.
+        """
+        json_data = {
+            "model": model_slug,
+            "messages": messages,
+            "stream": stream,
+            "temperature": temperature
+        }
+        return await self._call("POST", "/v1/openai/chat/completions", token, json=json_data)
+
+    async def get_embeddings(self, input_texts, token, model=None):
+        """
+        POST /v1/openai/embeddings
+        Obtenir les embeddings d'un ou plusieurs textes.
+        """
+        payload = {"input": input_texts, "model": model}
+        return await self._call("POST", "/v1/openai/embeddings", token, json=payload, decode_error="Invalid embeddings response")
+
+    async def list_vector_stores(self, token):
+        """
+        GET /v1/openai/vector_stores
+        Liste toutes les collections de bases de données vectorielles connectées.
+        """
+        return await self._call("GET", "/v1/openai/vector_stores", token)
+
+
+class AsyncSystemSettingsService(AsyncBaseService):
+    async def dump_settings(self, token):
+        """
+        GET /v1/system/env-dump
+        Exporte tous les paramètres actuels vers un fichier de stockage.
+        """
+        return await self._call("GET", "/v1/system/env-dump", token)
+
+    async def get_system_settings(self, token):
+        """
+        GET /v1/system
+        Récupère tous les paramètres système actuellement définis.
+        """
+        return await self._call("GET", "/v1/system", token)
+
+    async def get_vector_count(self, token):
+        """
+        GET /v1/system/vector-count
+        Retourne le nombre de vecteurs dans la base de données de vecteurs connectée.
+        """
+        return await self._call("GET", "/v1/system/vector-count", token)
+
+    async def update_system_setting(self, update_data, token):
+        """
+        POST /v1/system/update-env
+        Met à jour un paramètre ou une préférence du système.
+        """
+        return await self._call("POST", "/v1/system/update-env", token, json=update_data)
+
+    async def export_chats(self, export_type, token):
+        """
+        GET /v1/system/export-chats
+        Exporte toutes les conversations du système dans un format spécifique.
+        """
+        return await self._call("GET", "/v1/system/export-chats", token, params={"type": export_type})
+
+    async def remove_documents(self, document_names, token):
+        """
+        DELETE /v1/system/remove-documents
+        Supprime définitivement des documents spécifiques du système.
+        """
+        return await self._call("DELETE", "/v1/system/remove-documents", token, json={"names": document_names})
+
+
+class AsyncUserManagementService(AsyncBaseService):
+    async def list_users(self, token):
+        """
+        GET /v1/users
+        Récupère la liste de tous les utilisateurs.
+        """
+        return await self._call("GET", "/v1/users", token)
+
+
+class AsyncWorkspaceService(AsyncBaseService):
+    async def create_workspace(self, name, token):
+        """
+        POST /v1/workspace/new
+        Create a new workspace with the specified name.
+        """
+        return await self._call("POST", "/v1/workspace/new", token, json={"name": name})
+
+    async def list_workspaces(self, token):
+        """
+        GET /v1/workspaces
+        List all current workspaces.
+        """
+        return await self._call("GET", "/v1/workspaces", token)
+
+    async def get_workspace_by_slug(self, slug, token):
+        """
+        GET /v1/workspace/{slug}
+        Retrieve a workspace by its unique slug.
+        """
+        return await self._call("GET", f"/v1/workspace/{slug}", token)
+
+    async def delete_workspace(self, slug, token):
+        """
+        DELETE /v1/workspace/{slug}
+        Delete a workspace by its unique slug.
+        """
+        return await self._call("DELETE", f"/v1/workspace/{slug}", token,
+                                success_payload={"message": "Workspace deleted successfully"})
+
+    async def update_workspace(self, slug, update_data, token):
+        """
+        POST /v1/workspace/{slug}/update
+        Update a workspace's settings by its unique slug.
+        """
+        return await self._call("POST", f"/v1/workspace/{slug}/update", token, json=update_data)
+
+    async def get_workspace_chats(self, slug, token):
+        """
+        GET /v1/workspace/{slug}/chats
+        Retrieve chats associated with a specific workspace slug.
+        """
+        return await self._call("GET", f"/v1/workspace/{slug}/chats", token)
+
+    async def update_workspace_embeddings(self, slug, embeddings_data, token):
+        """
+        POST /v1/workspace/{slug}/update-embeddings
+        Update embeddings by adding or removing documents for a workspace.
+        """
+        return await self._call("POST", f"/v1/workspace/{slug}/update-embeddings", token, json=embeddings_data)
+
+    async def update_workspace_pin(self, slug, pin_data, token):
+        """
+        POST /v1/workspace/{slug}/update-pin
+        Update pin status for a document in the workspace.
+        """
+        return await self._call("POST", f"/v1/workspace/{slug}/update-pin", token, json=pin_data)
+
+    async def chat_with_workspace(self, slug, chat_data, token):
+        """
+        POST /v1/workspace/{slug}/chat
+        Execute a chat with the specified workspace.
+        """
+        return await self._call("POST", f"/v1/workspace/{slug}/chat", token, json=chat_data)
+
+    async def stream_chat_with_workspace(self, slug, chat_data, token, idle_timeout=None, buffer_size=None, stall_timeout=None):
+        """
+        POST /v1/workspace/{slug}/stream-chat
+        Execute a streamable chat with the specified workspace.
+        idle_timeout, buffer_size and stall_timeout are passed to the AsyncChatEventStream handle.
+        """
+        return await self._stream(
+            "POST", f"/v1/workspace/{slug}/stream-chat", token, json=chat_data,
+            idle_timeout=idle_timeout, buffer_size=buffer_size, stall_timeout=stall_timeout
+        )
+
+
+class AsyncWorkspaceThreadService(AsyncBaseService):
+    async def create_thread(self, slug, user_id, token):
+        """
+        POST /v1/workspace/{slug}/thread/new
+        Crée un nouveau thread dans l'espace de travail.
+        """
+        data = {"userId": user_id} if user_id else {}
+        return await self._call("POST", f"/v1/workspace/{slug}/thread/new", token, json=data)
+
+    async def update_thread(self, slug, thread_slug, new_name, token):
+        """
+        POST /v1/workspace/{slug}/thread/{threadSlug}/update
+        Met à jour le nom d'un thread dans un espace de travail.
+        """
+        return await self._call("POST", f"/v1/workspace/{slug}/thread/{thread_slug}/update", token, json={"name": new_name})
+
+    async def delete_thread(self, slug, thread_slug, token):
+        """
+        DELETE /v1/workspace/{slug}/thread/{threadSlug}
+        Supprime un thread d'un espace de travail.
+        """
+        return await self._call("DELETE", f"/v1/workspace/{slug}/thread/{thread_slug}", token,
+                                success_payload={"message": "Thread deleted successfully"})
+
+    async def get_thread_chats(self, slug, thread_slug, token):
+        """
+        GET /v1/workspace/{slug}/thread/{threadSlug}/chats
+        Récupère les chats d'un thread dans un espace de travail.
+        """
+        return await self._call("GET", f"/v1/workspace/{slug}/thread/{thread_slug}/chats", token)
+
+    async def chat_with_thread(self, slug, thread_slug, message, mode, user_id, token):
+        """
+        POST /v1/workspace/{slug}/thread/{threadSlug}/chat
+        Envoie un message pour converser avec un thread dans un espace de travail.
+        """
+        data = {
+            "message": message,
+            "mode": mode,
+            "userId": user_id
+        }
+        return await self._call("POST", f"/v1/workspace/{slug}/thread/{thread_slug}/chat", token, json=data)
+
+    async def stream_chat_with_thread(self, slug, thread_slug, message, mode, user_id, token,
+                                      idle_timeout=None, buffer_size=None, stall_timeout=None):
+        """
+        POST /v1/workspace/{slug}/thread/{threadSlug}/stream-chat
+        Envoie un message en mode chat en continu avec un thread dans un espace de travail.
+        Mêmes options de flux que stream_chat_with_workspace.
+        """
+        data = {
+            "message": message,
+            "mode": mode,
+            "userId": user_id
+        }
+        return await self._stream(
+            "POST", f"/v1/workspace/{slug}/thread/{thread_slug}/stream-chat", token, json=data,
+            idle_timeout=idle_timeout, buffer_size=buffer_size, stall_timeout=stall_timeout
+        )
@@ -0,0 +1,212 @@
+import asyncio
+import time
+import httpx
+from .instrumentation import PhaseTrace
+from .resilience import CircuitOpenError
+from .transport import _release_all
+
+
+class AsyncCircuitOpenError(httpx.ConnectError):
+    """
+    Équivalent httpx de CircuitOpenError, pour que les services async la traitent comme une erreur réseau.
+    """
+    def __init__(self, host, retry_in):
+        self.host = host
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {host}, retry in {retry_in:.1f}s")
+
+
+class AsyncHttpTransport:
+    """
+    Transport HTTP asynchrone partagé entre les services async : un seul client httpx avec pool
+    de connexions keep-alive, et une limite de requêtes simultanées par client.
+
+    :param max_connections: Nombre maximal de connexions ouvertes par le client.
+    :param max_keepalive_connections: Nombre de connexions inactives conservées pour réutilisation.
+    :param max_concurrency: Nombre maximal de requêtes en vol (None pour ne pas limiter).
+    :param timeout: Timeout par défaut, en secondes ou tuple (connexion, lecture).
+    :param verify: Vérification du certificat TLS.
+    :param retry_policy: RetryPolicy appliquée à chaque requête (None pour ne jamais rejouer).
+    :param circuit_breaker: CircuitBreaker par hôte (None pour le désactiver).
+    :param rate_limiter: RateLimiter par famille d'endpoints et par token (None pour ne pas limiter).
+    :param scheduler: RequestScheduler qui ordonne les requêtes par priorité (None pour l'ordre d'arrivée).
+    :param instrumentation: Instrumentation qui reçoit les mesures de chaque requête (None pour ne rien mesurer).
+    """
+    def __init__(self, max_connections=100, max_keepalive_connections=20, max_concurrency=None, timeout=(5, 120), verify=True,
+                 retry_policy=None, circuit_breaker=None, rate_limiter=None, scheduler=None, instrumentation=None):
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        self.client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive_connections),
+            timeout=timeout,
+            verify=verify
+        )
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.rate_limiter = rate_limiter
+        self.scheduler = scheduler
+        self.instrumentation = instrumentation
+        self.retries = 0
+        self._stream_slots = {}
+
+    def add_response_hook(self, hook):
+        """
+        Enregistre un hook async appelé avec chaque réponse reçue par le client (une seule fois par hook).
+        """
+        hooks = self.client.event_hooks
+        if hook not in hooks["response"]:
+            hooks["response"].append(hook)
+            self.client.event_hooks = hooks
+
+    async def _acquire(self):
+        if self._semaphore is not None:
+            await self._semaphore.acquire()
+
+    def _release(self):
+        if self._semaphore is not None:
+            self._semaphore.release()
+
+    async def request(self, method, url, **kwargs):
+        return await self._with_policy(
+            method, url, lambda extensions: self.client.request(method, url, extensions=extensions, **kwargs),
+            kwargs.get("headers")
+        )
+
+    async def _with_policy(self, method, url, send, headers=None, stream=False):
+        """
+        Envoie via `send(extensions)` en appliquant le limiteur, le disjoncteur et la politique de nouvelles tentatives.
+        Les places (limiteur et concurrence) sont libérées pendant l'attente entre deux tentatives.
+        """
+        attempt = 1
+        while True:
+            slots = []
+            try:
+                if self.rate_limiter is not None:
+                    slots.append(await self.rate_limiter.acquire_async(url, headers))
+                if self.scheduler is not None:
+                    slots.append(await self.scheduler.acquire_async(url))
+                await self._acquire()
+            except BaseException:
+                _release_all(slots)
+                raise
+
+            def release(slots=slots):
+                self._release()
+                _release_all(slots)
+
+            try:
+                response = await self._send(method, url, send, stream)
+            except AsyncCircuitOpenError:
+                release()
+                raise
+            except httpx.TransportError as e:
+                release()
+                if self.retry_policy is None:
+                    raise
+                connect_error = isinstance(e, httpx.ConnectTimeout)
+                delay = self.retry_policy.delay_for_error(attempt, method, connect_error=connect_error)
+                if delay is None:
+                    raise
+            except BaseException:
+                release()
+                raise
+            else:
+                delay = self.retry_policy.delay_for_response(attempt, method, response) if self.retry_policy else None
+                if delay is None:
+                    # Pour un flux, les places restent occupées jusqu'à close_stream
+                    if stream:
+                        self._stream_slots[response] = slots
+                    else:
+                        release()
+                    return response
+                await response.aclose()
+                release()
+            self.retries += 1
+            if self.instrumentation is not None:
+                self.instrumentation.record_retry(method, url, attempt, delay)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _send(self, method, url, send, stream=False):
+        if self.circuit_breaker is None:
+            return await self._instrumented_send(method, url, send, stream)
+        host = self.circuit_breaker.host_of(url)
+        try:
+            probe = self.circuit_breaker.before_request(host)
+        except CircuitOpenError as e:
+            raise AsyncCircuitOpenError(e.host, e.retry_in) from None
+        try:
+            response = await self._instrumented_send(method, url, send, stream)
+        except httpx.TransportError:
+            self.circuit_breaker.record_failure(host)
+            raise
+        except BaseException:
+            # Requête annulée (quorum, délai global...) ou erreur inattendue : l'essai ne doit pas rester bloqué
+            if probe:
+                self.circuit_breaker.release_probe(host)
+            raise
+        self.circuit_breaker.record_response(host, response.status_code)
+        return response
+
+    async def _instrumented_send(self, method, url, send, stream):
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return await send({})
+        trace = PhaseTrace()
+        try:
+            response = await send({"trace": trace})
+        except httpx.TransportError as e:
+            instrumentation.record_request(
+                method, url, time.perf_counter() - trace.started_at, error=str(e), connect=trace.connect
+            )
+            raise
+        duration = time.perf_counter() - trace.started_at
+        ttfb = trace.ttfb
+        instrumentation.record_request(
+            method, url, duration,
+            status_code=response.status_code,
+            connect=trace.connect,
+            ttfb=ttfb,
+            download=max(0.0, duration - ttfb) if ttfb is not None and not stream else None,
+            bytes_sent=int(response.request.headers.get("Content-Length") or 0),
+            bytes_received=int(response.headers.get("Content-Length") or 0) if stream else len(response.content)
+        )
+        return instrumentation.instrument_decode(method, url, response)
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        return await self.request("DELETE", url, **kwargs)
+
+    async def open_stream(self, method, url, **kwargs):
+        """
+        Envoie une requête dont le corps sera lu en flux. La place de concurrence reste occupée
+        jusqu'à l'appel de close_stream(response).
+        """
+        return await self._with_policy(
+            method, url,
+            lambda extensions: self.client.send(self.client.build_request(method, url, extensions=extensions, **kwargs), stream=True),
+            kwargs.get("headers"), stream=True
+        )
+
+    async def close_stream(self, response):
+        try:
+            await response.aclose()
+        finally:
+            self._release()
+            _release_all(self._stream_slots.pop(response, ()))
+
+    async def aclose(self):
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
@@ -1,28 +1,160 @@
 import requests
 import os
+import threading
+import time
+import weakref
 from dotenv import load_dotenv
+from .transport import HttpTransport
 
-class AuthentificationService:
+class TokenCache:
+    """
+    Cache thread-safe des validations de token : les succès (200) et les refus (403) sont conservés
+    pendant une durée de vie en secondes, jamais les erreurs réseau ou serveur.
+    """
+    def __init__(self, ttl=300, negative_ttl=30):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, ttl=None, negative_ttl=None):
+        """
+        Construit le cache à partir des valeurs données, sinon de AUTH_CACHE_TTL et AUTH_NEGATIVE_CACHE_TTL.
+        """
+        return cls(
+            ttl=float(ttl if ttl is not None else os.getenv("AUTH_CACHE_TTL", "300")),
+            negative_ttl=float(negative_ttl if negative_ttl is not None else os.getenv("AUTH_NEGATIVE_CACHE_TTL", "30"))
+        )
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is not None and entry[0] > time.monotonic():
+                self.hits += 1
+                return entry[1]
+            self._entries.pop(token, None)
+            self.misses += 1
+            return None
+
+    def store(self, token, result):
+        status_code = result[1]
+        if status_code == 200:
+            ttl = self.ttl
+        elif status_code == 403:
+            ttl = self.negative_ttl
+        else:
+            return
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (time.monotonic() + ttl, result)
+
+    def invalidate(self, token=None):
+        with self._lock:
+            if token is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(token, None)
+
+
+def bearer(token):
+    # Ajouter "Bearer " devant le token s'il n'est pas déjà présent
+    if not token.startswith("Bearer "):
+        token = f"Bearer {token}"
+    return token
+
+
+class TokenInvalidationHook:
+    """
+    Hook de réponse partagé par tous les services d'authentification d'un même transport : un 401/403
+    reçu en aval invalide le token dans chaque cache enregistré. Les caches sont référencés faiblement,
+    pour que le hook ne garde pas en vie les services qui les portent.
+    """
     def __init__(self):
+        self.caches = weakref.WeakSet()
+
+    def invalidate(self, response):
+        if response.status_code in (401, 403):
+            token = response.request.headers.get("Authorization")
+            if token:
+                for cache in list(self.caches):
+                    cache.invalidate(bearer(token))
+
+    def __call__(self, response, *args, **kwargs):
+        self.invalidate(response)
+
+
+class AsyncTokenInvalidationHook(TokenInvalidationHook):
+    # httpx attend des hooks async
+    async def __call__(self, response):
+        self.invalidate(response)
+
+
+_invalidation_hooks = weakref.WeakKeyDictionary()
+_invalidation_hooks_lock = threading.Lock()
+
+
+def register_token_cache(transport, token_cache, hook_class=TokenInvalidationHook):
+    """
+    Enregistre un cache de tokens auprès du hook d'invalidation du transport ; le hook n'est ajouté
+    qu'une fois par transport, quel que soit le nombre de services créés dessus.
+    """
+    with _invalidation_hooks_lock:
+        hook = _invalidation_hooks.get(transport)
+        if hook is None:
+            hook = _invalidation_hooks[transport] = hook_class()
+            transport.add_response_hook(hook)
+        hook.caches.add(token_cache)
+
+
+class AuthentificationService:
+    def __init__(self, transport=None, cache_ttl=None, negative_cache_ttl=None):
         load_dotenv()
+        self.transport = transport or HttpTransport()
         self.base_url = os.getenv("BASE_URL")
         self.ssl_verify = os.getenv("SSL_VERIFY", "true").lower() == "true"  # Charger SSL_VERIFY depuis les variables d'environnement
 
+        # Cache des tokens déjà validés (200) et refusés (403), avec une durée de vie en secondes
+        self.token_cache = TokenCache.from_env(cache_ttl, negative_cache_ttl)
+
+        # Invalider le token dès qu'un appel en aval répond 401/403
+        register_token_cache(self.transport, self.token_cache)
+
+    @property
+    def cache_hits(self):
+        return self.token_cache.hits
+
+    @property
+    def cache_misses(self):
+        return self.token_cache.misses
+
     def auth(self, **kwargs):
         token = kwargs.get("Authorization")
         if not token:
             return {"error": "No authorization token provided."}, 403
-        
-        # Ajouter "Bearer " devant le token s'il n'est pas déjà présent
-        if not token.startswith("Bearer "):
-            token = f"Bearer {token}"
-        
+
+        token = bearer(token)
+        cached = self.token_cache.get(token)
+        instrumentation = getattr(self.transport, "instrumentation", None)
+        if instrumentation is not None:
+            instrumentation.record_auth_cache(hit=cached is not None)
+        if cached is not None:
+            return cached
+
+        result = self._validate(token)
+        self.token_cache.store(token, result)
+        return result
+
+    def _validate(self, token):
         url = f"{self.base_url}/v1/auth"
         headers = {"Authorization": token}
 
         try:
             # Ajouter ssl_verify dans l'appel de la requête
-            response = requests.get(url, headers=headers, verify=self.ssl_verify)
+            response = self.transport.get(url, headers=headers, verify=self.ssl_verify)
             response.raise_for_status()
             return response.json(), response.status_code
 
@@ -40,5 +172,15 @@ class AuthentificationService:
                 return {"error": f"Invalid API Key: {error_message}"}, 403
             return {"error": f"Authentication service error: {error_message}"}, response.status_code
 
+        except requests.exceptions.JSONDecodeError as e:
+            # Corps 2xx qui n'est pas du JSON : réponse invalide, pas une erreur de connexion
+            return {"error": "Invalid authentication response", "details": str(e)}, 502
+
         except requests.exceptions.RequestException as e:
             return {"error": f"Failed to connect to the authentication service: {str(e)}"}, 500
+
+    def invalidate(self, token=None):
+        """
+        Supprime un token du cache de validation, ou vide tout le cache si aucun token n'est donné.
+        """
+        self.token_cache.invalidate(bearer(token) if token else None)
@@ -0,0 +1,235 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import requests
+from dotenv import load_dotenv
+from .authentification import AuthentificationService
+from .embed import EmbedService
+from .workspace import WorkspaceService
+from .workspacethread import WorkspaceThreadService
+
+# Champs stables d'un enregistrement, utilisés pour reconnaître le dernier enregistrement copié
+_IDENTITY_FIELDS = ("id", "chatId", "role", "content", "prompt", "sentAt", "createdAt")
+
+
+def record_fingerprint(record):
+    identity = {field: record.get(field) for field in _IDENTITY_FIELDS} if isinstance(record, dict) else record
+    return hashlib.sha256(json.dumps(identity, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+class ChatHistoryStore:
+    """
+    Copie locale (SQLite) de l'historique des conversations, avec un marqueur de progression
+    (high-water mark) par workspace, thread ou session d'embed.
+
+    Table chat_records : instance, kind ("workspace", "thread" ou "embed_session"), scope, position
+    (rang dans l'historique), role, content, sent_at et l'enregistrement complet en JSON (record),
+    interrogeable avec json_extract.
+
+    :param path: Fichier SQLite (CHAT_HISTORY_PATH par défaut, ":memory:" pour une copie non persistante).
+    """
+    def __init__(self, path=None):
+        self.path = path or os.getenv("CHAT_HISTORY_PATH", ".chat_history.sqlite3")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS chat_records ("
+                "instance TEXT NOT NULL, kind TEXT NOT NULL, scope TEXT NOT NULL, position INTEGER NOT NULL, "
+                "role TEXT, content TEXT, sent_at TEXT, record TEXT NOT NULL, "
+                "PRIMARY KEY (instance, kind, scope, position))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS chat_sync_state ("
+                "instance TEXT NOT NULL, kind TEXT NOT NULL, scope TEXT NOT NULL, position INTEGER NOT NULL, "
+                "fingerprint TEXT, synced_at REAL NOT NULL, PRIMARY KEY (instance, kind, scope))"
+            )
+
+    def high_water_mark(self, instance, kind, scope):
+        """
+        Retourne (nombre d'enregistrements déjà copiés, empreinte du dernier), ou (0, None).
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT position, fingerprint FROM chat_sync_state WHERE instance = ? AND kind = ? AND scope = ?",
+                (instance, kind, scope)
+            ).fetchone()
+        return (row[0], row[1]) if row else (0, None)
+
+    def append(self, instance, kind, scope, start, records):
+        """
+        Ajoute des enregistrements à partir de la position `start` et avance le marqueur dans la même transaction.
+        """
+        rows = []
+        for offset, record in enumerate(records):
+            fields = record if isinstance(record, dict) else {}
+            content = fields.get("content", fields.get("prompt"))
+            sent_at = fields.get("sentAt", fields.get("createdAt"))
+            rows.append((
+                instance, kind, scope, start + offset, fields.get("role"),
+                content if content is None or isinstance(content, str) else json.dumps(content),
+                None if sent_at is None else str(sent_at), json.dumps(record)
+            ))
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO chat_records (instance, kind, scope, position, role, content, sent_at, record) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chat_sync_state (instance, kind, scope, position, fingerprint, synced_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (instance, kind, scope, start + len(rows), record_fingerprint(records[-1]), time.time())
+            )
+
+    def touch(self, instance, kind, scope):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE chat_sync_state SET synced_at = ? WHERE instance = ? AND kind = ? AND scope = ?",
+                (time.time(), instance, kind, scope)
+            )
+
+    def reset(self, instance, kind, scope):
+        """
+        Oublie la copie d'un historique (avant de la reconstruire).
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM chat_records WHERE instance = ? AND kind = ? AND scope = ?", (instance, kind, scope))
+            self._conn.execute("DELETE FROM chat_sync_state WHERE instance = ? AND kind = ? AND scope = ?", (instance, kind, scope))
+
+    def records(self, kind=None, scope=None, instance=None):
+        """
+        Itère sur les enregistrements copiés (dicts), dans l'ordre de l'historique.
+        """
+        clauses, params = [], []
+        for column, value in (("instance", instance), ("kind", kind), ("scope", scope)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT record FROM chat_records{where} ORDER BY instance, kind, scope, position", params
+            ).fetchall()
+        for (record,) in rows:
+            yield json.loads(record)
+
+    def query(self, sql, params=()):
+        """
+        Exécute une requête SQL (analyse) sur la copie locale et retourne les lignes.
+        """
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ChatHistorySync:
+    """
+    Synchronisation incrémentale de l'historique des conversations vers un ChatHistoryStore.
+
+    L'API ne permet pas de ne demander que les messages récents : chaque synchronisation relit
+    l'historique du serveur, décodé au fil de l'eau (mémoire bornée), et n'ajoute que les enregistrements
+    situés après le marqueur. Si l'historique a été raccourci ou modifié avant le marqueur, la copie de
+    ce périmètre est reconstruite.
+
+    :param batch_size: Nombre d'enregistrements écrits par transaction (le marqueur avance à chaque lot).
+    """
+    def __init__(self, store=None, auth_service=None, transport=None, workspace_service=None, thread_service=None,
+                 embed_service=None, batch_size=500):
+        load_dotenv()
+        self.store = store or ChatHistoryStore()
+        self.auth_service = auth_service or AuthentificationService(transport=transport)
+        self.transport = transport or self.auth_service.transport
+        self.workspace_service = workspace_service or WorkspaceService(auth_service=self.auth_service, transport=self.transport)
+        self.thread_service = thread_service or WorkspaceThreadService(auth_service=self.auth_service, transport=self.transport)
+        self.embed_service = embed_service or EmbedService(auth_service=self.auth_service, transport=self.transport)
+        self.batch_size = batch_size
+
+    def sync_workspace(self, slug, token):
+        """
+        Copie les nouveaux messages d'un workspace. Retourne (résumé, status_code).
+        Si la lecture de l'historique échoue en cours de route, retourne une erreur dont "summary"
+        indique la progression déjà enregistrée.
+        """
+        return self._sync(
+            self.workspace_service.base_url, "workspace", slug,
+            lambda: self.workspace_service.iter_workspace_chats(slug, token)
+        )
+
+    def sync_thread(self, slug, thread_slug, token):
+        return self._sync(
+            self.thread_service.base_url, "thread", f"{slug}/{thread_slug}",
+            lambda: self.thread_service.iter_thread_chats(slug, thread_slug, token)
+        )
+
+    def sync_embed_session(self, embed_uuid, session_uuid, token):
+        return self._sync(
+            self.embed_service.base_url, "embed_session", f"{embed_uuid}/{session_uuid}",
+            lambda: self.embed_service.iter_chats_for_embed_session(embed_uuid, session_uuid, token)
+        )
+
+    def _sync(self, instance, kind, scope, fetch):
+        instance = instance or ""
+        summary = {"kind": kind, "scope": scope, "fetched": 0, "appended": 0, "rebuilt": False}
+        records, status_code = fetch()
+        if status_code != 200:
+            return records, status_code
+        try:
+            complete = self._append_new(instance, kind, scope, records, summary)
+            if not complete:
+                # Historique modifié avant le marqueur : copie reconstruite à partir d'une nouvelle lecture
+                self.store.reset(instance, kind, scope)
+                summary.update(fetched=0, appended=0, rebuilt=True)
+                records, status_code = fetch()
+                if status_code != 200:
+                    return records, status_code
+                self._append_new(instance, kind, scope, records, summary)
+        except ValueError as error:
+            # Corps tronqué ou invalide : les lots déjà écrits restent valides, la prochaine synchronisation reprend au marqueur
+            return self._interrupted(instance, kind, scope, summary, "Invalid chat history response", error, 502)
+        except requests.exceptions.RequestException as error:
+            return self._interrupted(instance, kind, scope, summary, "Chat history download interrupted", error, 500)
+        summary["position"] = self.store.high_water_mark(instance, kind, scope)[0]
+        return summary, 200
+
+    def _interrupted(self, instance, kind, scope, summary, message, error, status_code):
+        summary["position"] = self.store.high_water_mark(instance, kind, scope)[0]
+        return {"error": message, "details": str(error), "summary": summary}, status_code
+
+    def _append_new(self, instance, kind, scope, records, summary):
+        """
+        Ajoute les enregistrements situés après le marqueur ; retourne False si l'historique ne
+        correspond plus à la copie locale.
+        """
+        position, fingerprint = self.store.high_water_mark(instance, kind, scope)
+        batch = []
+        try:
+            for index, record in enumerate(records):
+                summary["fetched"] += 1
+                if index < position:
+                    if index == position - 1 and record_fingerprint(record) != fingerprint:
+                        return False
+                    continue
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    self.store.append(instance, kind, scope, index + 1 - len(batch), batch)
+                    summary["appended"] += len(batch)
+                    batch = []
+        finally:
+            close = getattr(records, "close", None)
+            if close is not None:
+                close()
+        if summary["fetched"] < position:
+            return False
+        self.store.append(instance, kind, scope, summary["fetched"] - len(batch), batch)
+        summary["appended"] += len(batch)
+        if not summary["appended"]:
+            self.store.touch(instance, kind, scope)
+        return True
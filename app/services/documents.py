@@ -1,141 +1,133 @@
-import requests
-import os
-from dotenv import load_dotenv
-from .authentification import AuthentificationService
+from .pipeline import BaseService, MessageErrors
+from .json_stream import iter_response_items
+from .multipart import MultipartFileEncoder
 
-class DocumentService:
-    def __init__(self, auth_service=None):
-        load_dotenv()
-        self.auth_service = auth_service or AuthentificationService()
-        self.base_url = os.getenv("BASE_URL")
+class DocumentService(BaseService):
+    errors = MessageErrors
+
+    def __init__(self, auth_service=None, transport=None, upload_index=None, pipeline=None):
+        super().__init__(auth_service, transport, pipeline)
+        # Index optionnel (UploadIndex) pour ne pas ré-uploader un contenu identique
+        self.upload_index = upload_index
 
     def handle_request(self, method, url, token, **kwargs):
         """
-        Gère les requêtes HTTP pour les méthodes du service.
-        """
-        headers = {"Authorization": f"Bearer {token}"}
-        try:
-            response = requests.request(method, url, headers=headers, **kwargs)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as e:
-            try:
-                error_details = response.json()
-                error_message = error_details.get("message", str(error_details))
-            except ValueError:
-                error_message = response.text
-            return {"error": f"HTTP Error: {error_message}"}, response.status_code
-        except requests.exceptions.RequestException as e:
-            return {"error": f"Request failed: {str(e)}"}, 500
-
-    def upload_file(self, file_path, token):
-        """
-        POST /v1/document/upload
-        Upload un nouveau fichier pour être parsé et préparé pour embedding.
+        Envoie une requête vers une URL complète via le pipeline, sans valider le token
+        (les méthodes du service passent par _call, qui le valide).
         """
+        return self.pipeline.send(method, url, token, authenticate=False, errors=self.errors, **kwargs)
+
+    def _get_indexed_upload(self, content_hash, token):
+        if content_hash is None:
+            return None
+        cached = self.upload_index.get(self.base_url or "", content_hash)
+        if cached is None:
+            return None
+        # Réponse servie sans requête : le token est validé ici plutôt que par le pipeline
         auth_response, status_code = self.auth_service.auth(Authorization=token)
         if status_code != 200:
             return {"error": "Authentication failed", "details": auth_response}, status_code
+        return dict(cached, cached=True), 200
 
-        url = f"{self.base_url}/v1/document/upload"
-        files = {'file': open(file_path, 'rb')}
+    def _index_upload(self, content_hash, response, status_code, source):
+        if content_hash is not None and status_code == 200:
+            self.upload_index.put(self.base_url or "", content_hash, response, source=source)
 
+    def upload_file(self, file_path, token, chunk_size=64 * 1024, progress_callback=None, use_mmap=False):
+        """
+        POST /v1/document/upload
+        Upload un nouveau fichier pour être parsé et préparé pour embedding.
+        Le corps multipart est envoyé par morceaux de `chunk_size` octets, sans charger le fichier en mémoire ;
+        `progress_callback(octets_envoyés, octets_total)` est appelé après chaque morceau.
+        Avec un upload_index, un fichier déjà uploadé retourne la réponse enregistrée (avec "cached": True).
+        """
         try:
-            return self.handle_request("POST", url, token, files=files)
+            content_hash = self.upload_index.hash_file(file_path) if self.upload_index is not None else None
+            cached = self._get_indexed_upload(content_hash, token)
+            if cached is not None:
+                return cached
+
+            body = MultipartFileEncoder('file', file_path, chunk_size=chunk_size, use_mmap=use_mmap, progress_callback=progress_callback)
+            response, status_code = self._call("POST", "/v1/document/upload", token, data=body, headers=body.headers)
+            self._index_upload(content_hash, response, status_code, file_path)
+            return response, status_code
         except Exception as e:
             return {"error": f"Unexpected error during file upload: {str(e)}"}, 500
-        finally:
-            files['file'].close()
 
     def upload_link(self, link, token):
         """
         POST /v1/document/upload-link
         Upload un lien valide pour être scrappé et préparé pour embedding.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/document/upload-link"
         json_data = {"link": link}
-        return self.handle_request("POST", url, token, json=json_data)
+        return self._call("POST", "/v1/document/upload-link", token, json=json_data)
 
     def upload_raw_text(self, text_content, metadata, token):
         """
         POST /v1/document/raw-text
         Upload de texte brut avec des métadonnées sans nécessiter de fichier.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
+        content_hash = self.upload_index.hash_text(text_content, metadata) if self.upload_index is not None else None
+        cached = self._get_indexed_upload(content_hash, token)
+        if cached is not None:
+            return cached
 
-        url = f"{self.base_url}/v1/document/raw-text"
         json_data = {
             "textContent": text_content,
             "metadata": metadata
         }
-        return self.handle_request("POST", url, token, json=json_data)
+        response, status_code = self._call("POST", "/v1/document/raw-text", token, json=json_data)
+        self._index_upload(content_hash, response, status_code, (metadata or {}).get("title"))
+        return response, status_code
 
     def list_documents(self, token):
         """
         GET /v1/documents
         Obtenir la liste de tous les documents stockés localement.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
+        return self._call("GET", "/v1/documents", token)
 
-        url = f"{self.base_url}/v1/documents"
-        return self.handle_request("GET", url, token)
+    def iter_documents(self, token, chunk_size=64 * 1024):
+        """
+        GET /v1/documents
+        Variante de list_documents qui décode la réponse au fil de l'eau : retourne un itérateur de
+        (dossier, document) et le code HTTP, avec une mémoire bornée par la taille d'un document.
+        L'itérateur ferme la connexion une fois épuisé (ou par close()).
+        """
+        def decode(response, context):
+            items = iter_response_items(response, ("localFiles", "items", "*", "items", "*"), chunk_size, with_parents=True)
+            return ((parents[-1].get("name"), document) for parents, document in items)
+
+        return self._call("GET", "/v1/documents", token, stream=True, decode=decode)
 
     def get_accepted_file_types(self, token):
         """
         GET /v1/document/accepted-file-types
         Obtenir les types de fichiers acceptés pour l'upload.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/document/accepted-file-types"
-        return self.handle_request("GET", url, token)
+        return self._call("GET", "/v1/document/accepted-file-types", token)
 
     def get_metadata_schema(self, token):
         """
         GET /v1/document/metadata-schema
         Récupère le schéma des métadonnées pour les uploads de texte brut.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/document/metadata-schema"
-        return self.handle_request("GET", url, token)
+        return self._call("GET", "/v1/document/metadata-schema", token)
 
     def get_document_by_name(self, doc_name, token):
         """
         GET /v1/document/{docName}
         Récupère un document par son nom unique.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/document/{doc_name}"
-        return self.handle_request("GET", url, token)
+        return self._call("GET", f"/v1/document/{doc_name}", token)
 
     def create_folder(self, folder_name, token):
         """
         POST /v1/document/create-folder
         Crée un nouveau dossier dans le répertoire de stockage des documents.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/document/create-folder"
         json_data = {"name": folder_name}
-        return self.handle_request("POST", url, token, json=json_data)
+        return self._call("POST", "/v1/document/create-folder", token, json=json_data)
 
     def move_files(self, files_to_move, token):
         """
@@ -144,10 +136,9 @@ class DocumentService:
         
         :param files_to_move: Liste de dictionnaires contenant les chemins 'from' et 'to' de chaque fichier.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/document/move-files"
         json_data = {"files": files_to_move}
-        return self.handle_request("POST", url, token, json=json_data)
+        response, status_code = self._call("POST", "/v1/document/move-files", token, json=json_data)
+        if self.upload_index is not None and status_code == 200:
+            # Les emplacements indexés ne sont plus valides après un déplacement
+            self.upload_index.invalidate_locations(self.base_url or "", [f.get("from") for f in files_to_move])
+        return response, status_code
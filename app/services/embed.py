@@ -1,73 +1,47 @@
-import requests
-import os
-from dotenv import load_dotenv
-from .authentification import AuthentificationService
+from .json_stream import iter_response_items
+from .pipeline import BaseService
 
-class EmbedService:
-    def __init__(self, auth_service=None):
-        load_dotenv()
-        self.auth_service = auth_service or AuthentificationService()
-        self.base_url = os.getenv("BASE_URL")
 
+class EmbedService(BaseService):
     def list_embeds(self, token):
         """
         GET /v1/embed
         Récupère la liste de tous les embeds actifs.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/embed"
-        headers = {"Authorization": f"Bearer {token}"}
-
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        return self._call("GET", "/v1/embed", token)
 
     def get_chats_for_embed(self, embed_uuid, token):
         """
         GET /v1/embed/{embedUuid}/chats
         Récupère toutes les conversations pour un embed spécifique.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/embed/{embed_uuid}/chats"
-        headers = {"Authorization": f"Bearer {token}"}
+        return self._call("GET", f"/v1/embed/{embed_uuid}/chats", token)
 
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+    def iter_chats_for_embed(self, embed_uuid, token, chunk_size=64 * 1024):
+        """
+        GET /v1/embed/{embedUuid}/chats
+        Variante de get_chats_for_embed décodée au fil de l'eau : retourne un itérateur des
+        conversations ("chats") et le code HTTP.
+        """
+        return self._call(
+            "GET", f"/v1/embed/{embed_uuid}/chats", token, stream=True,
+            decode=lambda response, context: iter_response_items(response, ("chats", "*"), chunk_size)
+        )
 
     def get_chats_for_embed_session(self, embed_uuid, session_uuid, token):
         """
         GET /v1/embed/{embedUuid}/chats/{sessionUuid}
         Récupère les conversations pour un embed et une session spécifiques.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/embed/{embed_uuid}/chats/{session_uuid}"
-        headers = {"Authorization": f"Bearer {token}"}
+        return self._call("GET", f"/v1/embed/{embed_uuid}/chats/{session_uuid}", token)
 
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+    def iter_chats_for_embed_session(self, embed_uuid, session_uuid, token, chunk_size=64 * 1024):
+        """
+        GET /v1/embed/{embedUuid}/chats/{sessionUuid}
+        Variante de get_chats_for_embed_session décodée au fil de l'eau : retourne un itérateur des
+        conversations ("chats") et le code HTTP.
+        """
+        return self._call(
+            "GET", f"/v1/embed/{embed_uuid}/chats/{session_uuid}", token, stream=True,
+            decode=lambda response, context: iter_response_items(response, ("chats", "*"), chunk_size)
+        )
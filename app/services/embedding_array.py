@@ -0,0 +1,78 @@
+import base64
+import re
+
+_EMBEDDING_RE = re.compile(rb'"embedding"\s*:\s*(\[|")')
+_INDEX_RE = re.compile(rb'"index"\s*:\s*(\d+)')
+_MODEL_RE = re.compile(rb'"model"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError("numpy is required for array embeddings output (pip install numpy)") from e
+    return numpy
+
+
+def decode_embeddings(body):
+    """
+    Décode le corps brut d'une réponse /v1/openai/embeddings en tableau numpy float32 contigu
+    de forme (n, dim), sans passer par des listes de floats Python.
+
+    Retourne {"ids": [index, ...], "embeddings": ndarray, "model": str|None}, lignes triées par index.
+    Les embeddings encodés en base64 (encoding_format="base64") sont aussi acceptés.
+    """
+    np = _numpy()
+    spans = []
+    for match in _EMBEDDING_RE.finditer(body):
+        start = match.end()
+        if match.group(1) == b"[":
+            end = body.index(b"]", start)
+            spans.append((False, start, end))
+        else:
+            end = body.index(b'"', start)
+            spans.append((True, start, end))
+
+    ids = [int(index) for index in _INDEX_RE.findall(body)]
+    if len(ids) != len(spans):
+        ids = list(range(len(spans)))
+    model = _MODEL_RE.search(body)
+    model = model.group(1).decode("utf-8") if model else None
+
+    if not spans:
+        return {"ids": [], "embeddings": np.empty((0, 0), dtype=np.float32), "model": model}
+
+    rows = None
+    for position, (is_base64, start, end) in enumerate(spans):
+        if is_base64:
+            row = np.frombuffer(base64.b64decode(body[start:end]), dtype=np.float32)
+        else:
+            row = np.fromstring(body[start:end], dtype=np.float32, sep=",")
+        if rows is None:
+            rows = np.empty((len(spans), row.shape[0]), dtype=np.float32)
+        if row.shape[0] != rows.shape[1]:
+            raise ValueError(f"Embedding {position} has {row.shape[0]} dimensions, expected {rows.shape[1]}")
+        rows[position] = row
+
+    if ids != sorted(ids):
+        order = np.argsort(ids, kind="stable")
+        rows = np.ascontiguousarray(rows[order])
+        ids = [ids[i] for i in order]
+    return {"ids": ids, "embeddings": rows, "model": model}
+
+
+def embeddings_to_array(vectors, ids=None, model=None):
+    """
+    Construit la même sortie que decode_embeddings à partir de vecteurs déjà décodés (listes).
+    """
+    np = _numpy()
+    if len(vectors) == 0:
+        return {"ids": [], "embeddings": np.empty((0, 0), dtype=np.float32), "model": model}
+    embeddings = np.asarray(vectors, dtype=np.float32)
+    if embeddings.ndim == 1:
+        embeddings = embeddings.reshape(len(vectors), -1)
+    return {
+        "ids": list(ids) if ids is not None else list(range(len(vectors))),
+        "embeddings": np.ascontiguousarray(embeddings),
+        "model": model
+    }
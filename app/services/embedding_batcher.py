@@ -0,0 +1,158 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+def vectors_from_response(response, expected):
+    """
+    Extrait les vecteurs d'une réponse /v1/openai/embeddings, dans l'ordre des entrées.
+    """
+    data = sorted(response.get("data") or [], key=lambda item: item.get("index", 0))
+    if len(data) != expected:
+        return {"error": "Unexpected embeddings response", "details": f"{len(data)} embeddings for {expected} inputs"}, 502
+    return [item["embedding"] for item in data], 200
+
+
+class _PendingCall:
+    __slots__ = ("texts", "done", "result")
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.done = threading.Event()
+        self.result = None
+
+
+class EmbeddingBatcher:
+    """
+    Découpe les entrées d'embedding en lots (nombre d'éléments et taille approximative en octets),
+    envoie les lots en parallèle avec une limite de concurrence, et regroupe les petits appels
+    simultanés de plusieurs threads. Un appel sans requête en cours pour sa clé part immédiatement ;
+    sinon il attend la fin de cette requête (au plus `coalesce_window` secondes, ou jusqu'à ce que le lot
+    soit plein) et part avec les appels arrivés entre-temps.
+
+    :param max_batch_items: Nombre maximal de textes par requête.
+    :param max_batch_bytes: Taille maximale (UTF-8) des textes d'une requête ; un texte plus grand part seul.
+    :param max_concurrency: Nombre maximal de requêtes d'embedding simultanées.
+    :param coalesce_window: Attente maximale d'un appel regroupé, en secondes (0 pour désactiver le regroupement).
+    """
+    def __init__(self, max_batch_items=256, max_batch_bytes=512 * 1024, max_concurrency=4, coalesce_window=0.005):
+        self.max_batch_items = max_batch_items
+        self.max_batch_bytes = max_batch_bytes
+        self.max_concurrency = max_concurrency
+        self.coalesce_window = coalesce_window
+        self.requests_sent = 0
+        self.coalesced_calls = 0
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="embedding-batch")
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._pending = {}
+        self._in_flight = {}
+
+    def split(self, texts):
+        """
+        Découpe `texts` en lots consécutifs respectant les limites d'éléments et d'octets.
+        """
+        batches = []
+        batch = []
+        batch_bytes = 0
+        for text in texts:
+            size = len(text.encode("utf-8"))
+            if batch and (len(batch) >= self.max_batch_items or batch_bytes + size > self.max_batch_bytes):
+                batches.append(batch)
+                batch = []
+                batch_bytes = 0
+            batch.append(text)
+            batch_bytes += size
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def embed(self, texts, send, key=None):
+        """
+        Retourne (vecteurs, 200) dans l'ordre de `texts`, ou (erreur, status_code) si un lot échoue.
+
+        :param send: Fonction send(textes) -> (réponse, status_code) qui envoie une requête d'embedding.
+        :param key: Clé de regroupement (ex: (token, modèle)) ; seuls les appels de même clé sont regroupés.
+        """
+        texts = list(texts)
+        if not texts:
+            return [], 200
+        if self.coalesce_window > 0 and len(texts) < self.max_batch_items:
+            return self._coalesce(texts, send, key)
+        return self._run_batches(texts, send)
+
+    def _run_batches(self, texts, send):
+        batches = self.split(texts)
+        with self._lock:
+            self.requests_sent += len(batches)
+        if len(batches) == 1:
+            results = [self._send_batch(send, batches[0])]
+        else:
+            results = list(self._executor.map(lambda batch: self._send_batch(send, batch), batches))
+
+        vectors = []
+        for result, status_code in results:
+            if status_code != 200:
+                return result, status_code
+            vectors.extend(result)
+        return vectors, 200
+
+    @staticmethod
+    def _send_batch(send, batch):
+        response, status_code = send(batch)
+        if status_code != 200:
+            return response, status_code
+        return vectors_from_response(response, len(batch))
+
+    def _queued_items(self, key):
+        return sum(len(call.texts) for call in self._pending.get(key, ()))
+
+    def _coalesce(self, texts, send, key):
+        call = _PendingCall(texts)
+        with self._ready:
+            queue = self._pending.setdefault(key, [])
+            queue.append(call)
+            leader = len(queue) == 1
+            if not leader and self._queued_items(key) >= self.max_batch_items:
+                self._ready.notify_all()
+        if not leader:
+            call.done.wait()
+            return call.result
+
+        # Le premier appel en file envoie pour tous ceux qui l'ont rejoint
+        calls = None
+        result, status_code = {"error": "Request exception occurred", "details": "Coalesced call interrupted"}, 500
+        try:
+            with self._ready:
+                self._ready.wait_for(
+                    lambda: not self._in_flight.get(key) or self._queued_items(key) >= self.max_batch_items,
+                    timeout=self.coalesce_window
+                )
+                calls = self._pending.pop(key)
+                self._in_flight[key] = self._in_flight.get(key, 0) + 1
+                self.coalesced_calls += len(calls) - 1
+            try:
+                result, status_code = self._run_batches([text for c in calls for text in c.texts], send)
+            except Exception as e:
+                result, status_code = {"error": "Request exception occurred", "details": str(e)}, 500
+        finally:
+            # Exécuté aussi sur BaseException (KeyboardInterrupt...) : les appels regroupés ne restent pas bloqués
+            with self._ready:
+                if calls is None:
+                    calls = self._pending.pop(key, [call])
+                else:
+                    self._in_flight[key] -= 1
+                    if not self._in_flight[key]:
+                        del self._in_flight[key]
+                self._ready.notify_all()
+            offset = 0
+            for pending in calls:
+                if status_code == 200:
+                    pending.result = (result[offset:offset + len(pending.texts)], 200)
+                    offset += len(pending.texts)
+                else:
+                    pending.result = (result, status_code)
+                pending.done.set()
+        return call.result
+
+    def close(self):
+        self._executor.shutdown(wait=True)
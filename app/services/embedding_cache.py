@@ -0,0 +1,150 @@
+import hashlib
+import mmap
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+
+
+class EmbeddingCache:
+    """
+    Cache d'embeddings adressé par contenu, clé (modèle, sha256 du texte), sur deux niveaux :
+    un LRU en mémoire et, si `directory` est donné, des fichiers float32 lus par mmap sur disque.
+    Les vecteurs sont conservés en float32.
+
+    Le dossier peut être partagé entre processus : les écritures prennent le verrou d'écriture de l'index
+    SQLite (BEGIN IMMEDIATE), qui sérialise les ajouts aux fichiers de vecteurs, et le numéro de ligne
+    n'est enregistré qu'après l'écriture complète du vecteur.
+
+    :param directory: Dossier du cache disque (None pour un cache uniquement en mémoire).
+    :param max_memory_items: Nombre de vecteurs gardés dans le LRU en mémoire.
+    """
+    def __init__(self, directory=None, max_memory_items=10000):
+        self.directory = directory
+        self.max_memory_items = max_memory_items
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._maps = {}
+        self._conn = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False)
+            with self._conn:
+                self._conn.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, dim INTEGER NOT NULL, row INTEGER NOT NULL)"
+                )
+
+    @staticmethod
+    def key(model, text):
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        return f"{model or ''}:{digest}"
+
+    def get_many(self, model, texts):
+        """
+        Retourne une liste alignée sur `texts` : le vecteur (liste de floats) ou None en cas d'absence.
+        """
+        with self._lock:
+            return [self._get(self.key(model, text)) for text in texts]
+
+    def get(self, model, text):
+        return self.get_many(model, [text])[0]
+
+    def put_many(self, model, texts, vectors):
+        with self._lock:
+            entries = [(self.key(model, text), array("f", vector)) for text, vector in zip(texts, vectors)]
+            for key, packed in entries:
+                self._remember(key, packed)
+            if self._conn is None or not entries:
+                return
+            # Verrou d'écriture de l'index, partagé avec les autres processus utilisant le même dossier
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                for key, packed in entries:
+                    self._write(key, packed)
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+
+    def put(self, model, text, vector):
+        self.put_many(model, [text], [vector])
+
+    def _get(self, key):
+        vector = self._memory.get(key)
+        if vector is not None:
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return vector.tolist()
+        if self._conn is not None:
+            vector = self._read(key)
+            if vector is not None:
+                self._remember(key, vector)
+                self.disk_hits += 1
+                return vector.tolist()
+        self.misses += 1
+        return None
+
+    def _remember(self, key, vector):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_items:
+            self._memory.popitem(last=False)
+
+    def _data_path(self, dim):
+        return os.path.join(self.directory, f"vectors_{dim}.f32")
+
+    def _write(self, key, vector):
+        if self._conn.execute("SELECT 1 FROM embeddings WHERE key = ?", (key,)).fetchone():
+            return
+        dim = len(vector)
+        row_size = dim * vector.itemsize
+        with open(self._data_path(dim), "ab") as data_file:
+            size = data_file.tell()
+            if size % row_size:
+                # Ligne partielle laissée par un processus interrompu : jamais indexée, elle décalerait les suivantes
+                size -= size % row_size
+                data_file.truncate(size)
+            vector.tofile(data_file)
+        row = size // row_size
+        self._conn.execute("INSERT INTO embeddings (key, dim, row) VALUES (?, ?, ?)", (key, dim, row))
+
+    def _read(self, key):
+        entry = self._conn.execute("SELECT dim, row FROM embeddings WHERE key = ?", (key,)).fetchone()
+        if entry is None:
+            return None
+        dim, row = entry
+        row_size = dim * 4
+        mapped = self._maps.get(dim)
+        if mapped is None or (row + 1) * row_size > len(mapped):
+            # Le fichier a grandi depuis le dernier mapping : le remapper
+            if mapped is not None:
+                mapped.close()
+            with open(self._data_path(dim), "rb") as data_file:
+                mapped = mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._maps[dim] = mapped
+        vector = array("f")
+        vector.frombytes(mapped[row * row_size:(row + 1) * row_size])
+        return vector
+
+    def clear_memory(self):
+        with self._lock:
+            self._memory.clear()
+
+    def __len__(self):
+        with self._lock:
+            if self._conn is not None:
+                return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            return len(self._memory)
+
+    def close(self):
+        with self._lock:
+            for mapped in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,198 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from .async_services import AsyncWorkspaceService
+from .workspace import WorkspaceService
+
+
+class FanOutResult:
+    """
+    Réponse d'un workspace à une conversation envoyée en parallèle. `cancelled` : appel abandonné
+    (quorum atteint ou délai global écoulé) ; `timed_out` : délai de l'appel dépassé.
+    """
+    __slots__ = ("slug", "response", "status_code", "elapsed", "cancelled", "timed_out")
+
+    def __init__(self, slug, response, status_code, elapsed=None, cancelled=False, timed_out=False):
+        self.slug = slug
+        self.response = response
+        self.status_code = status_code
+        self.elapsed = elapsed
+        self.cancelled = cancelled
+        self.timed_out = timed_out
+
+    @property
+    def ok(self):
+        return self.status_code == 200
+
+    @classmethod
+    def deadline_exceeded(cls, slug, call_timeout, elapsed):
+        return cls(slug, {"error": "Deadline exceeded", "details": f"No response after {call_timeout}s"}, 504, elapsed, timed_out=True)
+
+    @classmethod
+    def cancelled_call(cls, slug, reason):
+        return cls(slug, {"error": "Cancelled", "details": reason}, None, cancelled=True)
+
+    def __repr__(self):
+        return f"FanOutResult(slug={self.slug!r}, status_code={self.status_code}, cancelled={self.cancelled}, timed_out={self.timed_out})"
+
+
+def _select_slugs(response, workspace_filter):
+    workspaces = response.get("workspaces") or [] if isinstance(response, dict) else []
+    return [workspace["slug"] for workspace in workspaces if workspace_filter is None or workspace_filter(workspace)]
+
+
+class ChatFanOut:
+    """
+    Envoie la même conversation à plusieurs workspaces en parallèle (pool de threads borné) et produit
+    les réponses dans l'ordre d'arrivée.
+
+    Un appel en cours dans un thread ne peut pas être interrompu : à l'annulation, les appels non démarrés
+    sont retirés de la file et ceux en cours sont abandonnés (leur thread se termine au plus tard au
+    timeout de lecture, fixé à `call_timeout`).
+
+    :param max_concurrency: Nombre maximal de conversations simultanées.
+    :param call_timeout: Délai par appel, en secondes (None : timeout du transport).
+    """
+    def __init__(self, workspace_service=None, auth_service=None, transport=None, max_concurrency=8, call_timeout=None):
+        self.workspace_service = workspace_service or WorkspaceService(auth_service=auth_service, transport=transport)
+        self.max_concurrency = max_concurrency
+        self.call_timeout = call_timeout
+
+    def chat(self, chat_data, token, slugs=None, workspace_filter=None, quorum=None, deadline=None, call_timeout=None):
+        """
+        Retourne (itérateur de FanOutResult, 200), ou l'erreur de list_workspaces.
+
+        :param slugs: Workspaces visés ; par défaut, ceux de list_workspaces retenus par `workspace_filter`.
+        :param workspace_filter: Fonction workspace (dict) -> bool appliquée à list_workspaces.
+        :param quorum: Nombre de réponses réussies après lequel les appels restants sont annulés.
+        :param deadline: Délai global, en secondes, après lequel les appels restants sont annulés.
+        """
+        if slugs is None:
+            response, status_code = self.workspace_service.list_workspaces(token)
+            if status_code != 200:
+                return response, status_code
+            slugs = _select_slugs(response, workspace_filter)
+        return self._run(list(slugs), chat_data, token, quorum, deadline, call_timeout or self.call_timeout), 200
+
+    def _run(self, slugs, chat_data, token, quorum, deadline, call_timeout):
+        deadline_at = time.monotonic() + deadline if deadline is not None else None
+        started = {}
+
+        def call(slug):
+            started[slug] = time.monotonic()
+            response, status_code = self.workspace_service.chat_with_workspace(slug, chat_data, token, timeout=call_timeout)
+            return FanOutResult(slug, response, status_code, time.monotonic() - started[slug])
+
+        executor = ThreadPoolExecutor(max_workers=self.max_concurrency)
+        pending = {executor.submit(call, slug): slug for slug in slugs}
+        succeeded = 0
+        reason = None
+        try:
+            while pending:
+                now = time.monotonic()
+                limits = [deadline_at] if deadline_at is not None else []
+                if call_timeout is not None:
+                    limits.extend(started[slug] + call_timeout for slug in pending.values() if slug in started)
+                timeout = max(0, min(limits) - now) if limits else None
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    del pending[future]
+                    result = future.result()
+                    succeeded += result.ok
+                    yield result
+                now = time.monotonic()
+                if quorum is not None and succeeded >= quorum:
+                    reason = f"Quorum of {quorum} reached"
+                    break
+                if deadline_at is not None and now >= deadline_at:
+                    reason = f"Deadline of {deadline}s reached"
+                    break
+                if call_timeout is not None:
+                    for future, slug in list(pending.items()):
+                        if slug in started and now - started[slug] >= call_timeout:
+                            del pending[future]
+                            yield FanOutResult.deadline_exceeded(slug, call_timeout, now - started[slug])
+            for future, slug in list(pending.items()):
+                del pending[future]
+                # Terminé entre-temps : la réponse est produite plutôt qu'annulée
+                yield future.result() if future.done() else FanOutResult.cancelled_call(slug, reason)
+                future.cancel()
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+class AsyncChatFanOut:
+    """
+    Équivalent asyncio de ChatFanOut : les appels restants sont réellement annulés (requêtes HTTP interrompues)
+    quand le quorum ou le délai global est atteint.
+    """
+    def __init__(self, workspace_service=None, auth_service=None, transport=None, max_concurrency=8, call_timeout=None):
+        self.workspace_service = workspace_service or AsyncWorkspaceService(auth_service=auth_service, transport=transport)
+        self.max_concurrency = max_concurrency
+        self.call_timeout = call_timeout
+
+    async def chat(self, chat_data, token, slugs=None, workspace_filter=None, quorum=None, deadline=None, call_timeout=None):
+        """
+        Retourne (itérateur async de FanOutResult, 200), ou l'erreur de list_workspaces.
+        Mêmes paramètres que ChatFanOut.chat.
+        """
+        if slugs is None:
+            response, status_code = await self.workspace_service.list_workspaces(token)
+            if status_code != 200:
+                return response, status_code
+            slugs = _select_slugs(response, workspace_filter)
+        return self._run(list(slugs), chat_data, token, quorum, deadline, call_timeout or self.call_timeout), 200
+
+    async def _run(self, slugs, chat_data, token, quorum, deadline, call_timeout):
+        loop = asyncio.get_running_loop()
+        deadline_at = loop.time() + deadline if deadline is not None else None
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def call(slug):
+            async with semaphore:
+                started_at = loop.time()
+                try:
+                    response, status_code = await asyncio.wait_for(
+                        self.workspace_service.chat_with_workspace(slug, chat_data, token), call_timeout
+                    )
+                except asyncio.TimeoutError:
+                    return FanOutResult.deadline_exceeded(slug, call_timeout, loop.time() - started_at)
+                return FanOutResult(slug, response, status_code, loop.time() - started_at)
+
+        pending = {asyncio.ensure_future(call(slug)): slug for slug in slugs}
+        succeeded = 0
+        reason = None
+        try:
+            while pending:
+                timeout = max(0, deadline_at - loop.time()) if deadline_at is not None else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    del pending[task]
+                    result = task.result()
+                    succeeded += result.ok
+                    yield result
+                if quorum is not None and succeeded >= quorum:
+                    reason = f"Quorum of {quorum} reached"
+                    break
+                if deadline_at is not None and loop.time() >= deadline_at:
+                    reason = f"Deadline of {deadline}s reached"
+                    break
+            remaining = list(pending.items())
+            finished = [task for task, _ in remaining if task.done()]
+            await self._cancel(pending)
+            for task, slug in remaining:
+                # Terminé entre-temps : la réponse est produite plutôt qu'annulée
+                yield task.result() if task in finished else FanOutResult.cancelled_call(slug, reason)
+        finally:
+            await self._cancel(pending)
+
+    @staticmethod
+    async def _cancel(pending):
+        tasks = list(pending)
+        pending.clear()
+        for task in tasks:
+            task.cancel()
+        # Laisser les requêtes annulées libérer leurs connexions
+        await asyncio.gather(*tasks, return_exceptions=True)
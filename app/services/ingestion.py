@@ -0,0 +1,154 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dotenv import load_dotenv
+from .authentification import AuthentificationService
+from .documents import DocumentService
+from .workspace import WorkspaceService
+
+
+class IngestionResult:
+    """
+    Résultat de l'ingestion d'un fichier : upload effectué, ou fichier ignoré (skipped) avec la raison.
+    """
+    __slots__ = ("path", "response", "status_code", "skipped")
+
+    def __init__(self, path, response, status_code, skipped=False):
+        self.path = path
+        self.response = response
+        self.status_code = status_code
+        self.skipped = skipped
+
+    @property
+    def ok(self):
+        return not self.skipped and self.status_code == 200
+
+    @property
+    def locations(self):
+        if not self.ok or not isinstance(self.response, dict):
+            return []
+        return [doc["location"] for doc in self.response.get("documents") or [] if doc.get("location")]
+
+    def __repr__(self):
+        return f"IngestionResult(path={self.path!r}, status_code={self.status_code}, skipped={self.skipped})"
+
+
+class EmbeddingBatchResult:
+    """
+    Résultat d'un appel update-embeddings regroupant plusieurs documents uploadés.
+    """
+    __slots__ = ("slug", "locations", "response", "status_code")
+
+    def __init__(self, slug, locations, response, status_code):
+        self.slug = slug
+        self.locations = locations
+        self.response = response
+        self.status_code = status_code
+
+    @property
+    def ok(self):
+        return self.status_code == 200
+
+    def __repr__(self):
+        return f"EmbeddingBatchResult(slug={self.slug!r}, documents={len(self.locations)}, status_code={self.status_code})"
+
+
+class DocumentIngestionService:
+    """
+    Ingestion en masse : upload concurrent de fichiers avec un pool de workers borné, puis ajout
+    des documents au workspace par lots via update-embeddings.
+    """
+    def __init__(self, auth_service=None, transport=None, document_service=None, workspace_service=None, max_workers=8, embed_batch_size=100, upload_index=None):
+        load_dotenv()
+        self.auth_service = auth_service or AuthentificationService(transport=transport)
+        self.transport = transport or self.auth_service.transport
+        self.document_service = document_service or DocumentService(auth_service=self.auth_service, transport=self.transport, upload_index=upload_index)
+        self.workspace_service = workspace_service or WorkspaceService(auth_service=self.auth_service, transport=self.transport)
+        self.max_workers = max_workers
+        self.embed_batch_size = embed_batch_size
+
+    def get_accepted_extensions(self, token):
+        """
+        Retourne l'ensemble des extensions acceptées par le serveur (ex: {".pdf", ".txt"}),
+        ou None si la liste n'a pas pu être récupérée.
+        """
+        response, status_code = self.document_service.get_accepted_file_types(token)
+        if status_code != 200 or not isinstance(response, dict):
+            return None
+        extensions = set()
+        for values in (response.get("types") or {}).values():
+            extensions.update(ext.lower() for ext in values)
+        return extensions or None
+
+    @staticmethod
+    def iter_paths(source, recursive=True):
+        """
+        Itère sur les fichiers d'un dossier (récursivement par défaut), ou sur un itérable de chemins.
+        """
+        if isinstance(source, (str, os.PathLike)) and os.path.isdir(source):
+            if recursive:
+                for root, dirs, files in os.walk(source):
+                    dirs.sort()
+                    for name in sorted(files):
+                        yield os.path.join(root, name)
+            else:
+                for entry in sorted(os.scandir(source), key=lambda e: e.name):
+                    if entry.is_file():
+                        yield entry.path
+        elif isinstance(source, (str, os.PathLike)):
+            yield os.fspath(source)
+        else:
+            yield from source
+
+    def ingest(self, source, token, workspace_slug=None, max_workers=None, embed_batch_size=None, recursive=True):
+        """
+        Upload tous les fichiers de `source` (dossier ou itérable de chemins) et produit les résultats
+        au fil de l'eau, dans l'ordre de fin d'upload.
+
+        Les fichiers dont l'extension est refusée par get_accepted_file_types sont ignorés sans upload.
+        Si `workspace_slug` est donné, les documents uploadés sont ajoutés au workspace par lots de
+        `embed_batch_size`, et un EmbeddingBatchResult est produit pour chaque lot.
+        """
+        max_workers = max_workers or self.max_workers
+        embed_batch_size = embed_batch_size or self.embed_batch_size
+        accepted = self.get_accepted_extensions(token)
+        pending_locations = []
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            in_flight = {}
+            paths = self.iter_paths(source, recursive=recursive)
+            exhausted = False
+
+            while in_flight or not exhausted:
+                # Limiter le nombre d'uploads soumis pour ne pas matérialiser toute la liste de chemins
+                while not exhausted and len(in_flight) < max_workers * 2:
+                    path = next(paths, None)
+                    if path is None:
+                        exhausted = True
+                        break
+                    extension = os.path.splitext(path)[1].lower()
+                    if accepted is not None and extension not in accepted:
+                        yield IngestionResult(path, {"error": f"Unsupported file type: {extension or path}"}, None, skipped=True)
+                        continue
+                    in_flight[executor.submit(self.document_service.upload_file, path, token)] = path
+
+                if not in_flight:
+                    continue
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = in_flight.pop(future)
+                    response, status_code = future.result()
+                    result = IngestionResult(path, response, status_code)
+                    yield result
+
+                    if workspace_slug:
+                        pending_locations.extend(result.locations)
+                        while len(pending_locations) >= embed_batch_size:
+                            batch, pending_locations = pending_locations[:embed_batch_size], pending_locations[embed_batch_size:]
+                            yield self._embed_batch(workspace_slug, batch, token)
+
+        if workspace_slug and pending_locations:
+            yield self._embed_batch(workspace_slug, pending_locations, token)
+
+    def _embed_batch(self, slug, locations, token):
+        response, status_code = self.workspace_service.update_workspace_embeddings(slug, {"adds": locations, "deletes": []}, token)
+        return EmbeddingBatchResult(slug, locations, response, status_code)
@@ -0,0 +1,262 @@
+import threading
+import time
+from bisect import bisect_left
+from urllib.parse import urlsplit
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+PHASES = ("connect", "ttfb", "download", "decode")
+
+_FIXED_DOCUMENT_PATHS = {
+    "upload", "upload-link", "raw-text", "create-folder", "move-files", "accepted-file-types", "metadata-schema"
+}
+
+
+def endpoint_template(url):
+    """
+    Chemin de l'URL à partir de /v1 avec les identifiants remplacés (ex: /v1/workspace/{slug}/chat),
+    pour garder un nombre borné de séries par endpoint.
+    """
+    path = urlsplit(url).path.rstrip("/")
+    version = path.find("/v1/")
+    segments = (path[version:] if version >= 0 else path).strip("/").split("/")
+    for index, segment in enumerate(segments):
+        previous = segments[index - 1] if index else None
+        if previous == "workspace" and segment != "new" and index == 2:
+            segments[index] = "{slug}"
+        elif previous == "thread" and segment != "new" and segments[:2] == ["v1", "workspace"]:
+            segments[index] = "{thread_slug}"
+        elif previous in ("users", "invite") and segments[1] == "admin" and segment != "new":
+            segments[index] = "{id}"
+        elif previous == "document" and index == 2 and segment not in _FIXED_DOCUMENT_PATHS:
+            segments[index] = "{name}"
+        elif previous == "embed" and index == 2:
+            segments[index] = "{embed_uuid}"
+        elif previous == "chats" and segments[1] == "embed":
+            segments[index] = "{session_uuid}"
+    return "/" + "/".join(segments)
+
+
+class Histogram:
+    """
+    Histogramme cumulatif à la Prometheus (compteurs par borne supérieure, somme et nombre).
+    Non thread-safe : protégé par le verrou de Instrumentation.
+    """
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{str(value)}"' for key, value in labels.items()) + "}"
+
+
+class Instrumentation:
+    """
+    Mesures des requêtes envoyées par les transports : histogrammes de latence par endpoint et par phase
+    (connect, ttfb, download, decode), octets envoyés et reçus, codes de statut, nouvelles tentatives
+    et cache d'authentification. Les hooks reçoivent chaque événement sous forme de dictionnaire.
+
+    :param buckets: Bornes des histogrammes de latence, en secondes.
+    :param namespace: Préfixe des métriques exportées.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS, namespace="anythingllm"):
+        self.buckets = tuple(buckets)
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self._hooks = []
+        self._latency = {}
+        self._calls = {}
+        self._phases = {}
+        self._requests = {}
+        self._bytes_sent = {}
+        self._bytes_received = {}
+        self._retries = {}
+        self._auth_cache = {"hit": 0, "miss": 0}
+
+    def add_hook(self, hook):
+        """
+        Enregistre une fonction appelée avec chaque événement ({"kind": "request" | "call" | "retry" | "decode" | "auth_cache", ...}).
+        """
+        if hook not in self._hooks:
+            self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        if hook in self._hooks:
+            self._hooks.remove(hook)
+
+    def _emit(self, event):
+        for hook in list(self._hooks):
+            hook(event)
+
+    def _observe(self, table, key, value):
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = Histogram(self.buckets)
+        histogram.observe(value)
+
+    def record_request(self, method, url, duration, status_code=None, error=None, connect=None, ttfb=None,
+                       download=None, bytes_sent=0, bytes_received=0):
+        """
+        Enregistre une tentative de requête. `status_code` vaut None en cas d'erreur réseau.
+        """
+        endpoint = endpoint_template(url)
+        status = str(status_code) if status_code is not None else "error"
+        with self._lock:
+            self._observe(self._latency, (method, endpoint), duration)
+            for phase, value in (("connect", connect), ("ttfb", ttfb), ("download", download)):
+                if value is not None:
+                    self._observe(self._phases, (endpoint, phase), value)
+            self._requests[(method, endpoint, status)] = self._requests.get((method, endpoint, status), 0) + 1
+            self._bytes_sent[(method, endpoint)] = self._bytes_sent.get((method, endpoint), 0) + bytes_sent
+            self._bytes_received[(method, endpoint)] = self._bytes_received.get((method, endpoint), 0) + bytes_received
+        if self._hooks:
+            self._emit({
+                "kind": "request", "method": method, "endpoint": endpoint, "url": url, "status_code": status_code,
+                "error": error, "duration": duration, "connect": connect, "ttfb": ttfb, "download": download,
+                "bytes_sent": bytes_sent, "bytes_received": bytes_received
+            })
+
+    def record_call(self, method, url, duration, status_code):
+        """
+        Enregistre un appel de service complet (authentification, nouvelles tentatives et décodage compris).
+        """
+        endpoint = endpoint_template(url)
+        with self._lock:
+            self._observe(self._calls, (method, endpoint), duration)
+        if self._hooks:
+            self._emit({"kind": "call", "method": method, "endpoint": endpoint, "duration": duration, "status_code": status_code})
+
+    def record_retry(self, method, url, attempt, delay):
+        endpoint = endpoint_template(url)
+        with self._lock:
+            self._retries[(method, endpoint)] = self._retries.get((method, endpoint), 0) + 1
+        if self._hooks:
+            self._emit({"kind": "retry", "method": method, "endpoint": endpoint, "attempt": attempt, "delay": delay})
+
+    def record_decode(self, method, url, duration):
+        endpoint = endpoint_template(url)
+        with self._lock:
+            self._observe(self._phases, (endpoint, "decode"), duration)
+        if self._hooks:
+            self._emit({"kind": "decode", "method": method, "endpoint": endpoint, "duration": duration})
+
+    def record_auth_cache(self, hit):
+        with self._lock:
+            self._auth_cache["hit" if hit else "miss"] += 1
+        if self._hooks:
+            self._emit({"kind": "auth_cache", "hit": hit})
+
+    def instrument_decode(self, method, url, response):
+        """
+        Mesure la durée du décodage JSON lors de l'appel à response.json().
+        """
+        decode = response.json
+
+        def timed_json(**kwargs):
+            started_at = time.perf_counter()
+            try:
+                return decode(**kwargs)
+            finally:
+                self.record_decode(method, url, time.perf_counter() - started_at)
+        response.json = timed_json
+        return response
+
+    def snapshot(self):
+        """
+        Copie des compteurs : {"requests", "bytes_sent", "bytes_received", "retries", "auth_cache", "latency", "calls", "phases"}.
+        """
+        with self._lock:
+            return {
+                "requests": dict(self._requests),
+                "bytes_sent": dict(self._bytes_sent),
+                "bytes_received": dict(self._bytes_received),
+                "retries": dict(self._retries),
+                "auth_cache": dict(self._auth_cache),
+                "latency": {key: {"count": h.count, "sum": h.sum} for key, h in self._latency.items()},
+                "calls": {key: {"count": h.count, "sum": h.sum} for key, h in self._calls.items()},
+                "phases": {key: {"count": h.count, "sum": h.sum} for key, h in self._phases.items()}
+            }
+
+    def export_prometheus(self):
+        """
+        Retourne les métriques au format texte d'exposition Prometheus.
+        """
+        name = self.namespace
+        lines = []
+
+        def header(metric, kind, help_text):
+            lines.append(f"# HELP {name}_{metric} {help_text}")
+            lines.append(f"# TYPE {name}_{metric} {kind}")
+
+        def histogram(metric, table, label_names):
+            for key, h in sorted(table.items()):
+                labels = dict(zip(label_names, key))
+                for bound, total in h.cumulative():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f"{name}_{metric}_bucket{_labels(**labels, le=le)} {total}")
+                lines.append(f"{name}_{metric}_sum{_labels(**labels)} {h.sum}")
+                lines.append(f"{name}_{metric}_count{_labels(**labels)} {h.count}")
+
+        def counter(metric, table, label_names):
+            for key, value in sorted(table.items()):
+                lines.append(f"{name}_{metric}{_labels(**dict(zip(label_names, key)))} {value}")
+
+        with self._lock:
+            header("request_duration_seconds", "histogram", "Request latency by endpoint.")
+            histogram("request_duration_seconds", self._latency, ("method", "endpoint"))
+            header("call_duration_seconds", "histogram", "Service call latency, auth and decode included.")
+            histogram("call_duration_seconds", self._calls, ("method", "endpoint"))
+            header("request_phase_seconds", "histogram", "Time spent in connect, ttfb, download and decode.")
+            histogram("request_phase_seconds", self._phases, ("endpoint", "phase"))
+            header("requests_total", "counter", "Requests by endpoint and status code.")
+            counter("requests_total", self._requests, ("method", "endpoint", "status"))
+            header("request_bytes_sent_total", "counter", "Request body bytes sent.")
+            counter("request_bytes_sent_total", self._bytes_sent, ("method", "endpoint"))
+            header("response_bytes_received_total", "counter", "Response body bytes received.")
+            counter("response_bytes_received_total", self._bytes_received, ("method", "endpoint"))
+            header("retries_total", "counter", "Requests retried by the retry policy.")
+            counter("retries_total", self._retries, ("method", "endpoint"))
+            header("auth_cache_total", "counter", "Auth token cache lookups.")
+            counter("auth_cache_total", {(result,): value for result, value in self._auth_cache.items()}, ("result",))
+        return "\n".join(lines) + "\n"
+
+
+class PhaseTrace:
+    """
+    Callback d'extension "trace" de httpx : relève les instants de connexion et de réception des en-têtes.
+    """
+    __slots__ = ("started_at", "connect_started", "connect", "headers_at")
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.connect_started = None
+        self.connect = None
+        self.headers_at = None
+
+    async def __call__(self, name, info):
+        now = time.perf_counter()
+        if name == "connection.connect_tcp.started":
+            self.connect_started = now
+        elif name in ("connection.connect_tcp.complete", "connection.start_tls.complete") and self.connect_started:
+            self.connect = now - self.connect_started
+        elif name.endswith(".receive_response_headers.complete"):
+            self.headers_at = now
+
+    @property
+    def ttfb(self):
+        return self.headers_at - self.started_at if self.headers_at is not None else None
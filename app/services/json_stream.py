@@ -0,0 +1,182 @@
+import codecs
+import json
+import re
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_NUMBER_END = " \t\n\r,]}"
+_STRING_TAIL = re.compile(r'(?:[^"\\]|\\.)*"', re.S)
+# Au-delà, la partie déjà consommée du tampon est libérée
+_COMPACT_AFTER = 64 * 1024
+
+
+class JsonStreamReader:
+    """
+    Lecteur JSON incrémental sur un itérable de morceaux d'octets (UTF-8). Seuls les éléments
+    demandés sont décodés en entier ; les autres valeurs sont parcourues sans être conservées,
+    si bien que la mémoire reste bornée par la taille du plus gros élément produit.
+    """
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """
+        Ajoute le morceau suivant au tampon ; retourne False en fin de flux.
+        """
+        if self.pos > _COMPACT_AFTER:
+            self.buffer = self.buffer[self.pos:]
+            self.pos = 0
+        while not self.eof:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self.eof = True
+                self.buffer += self._utf8.decode(b"", final=True)
+                return False
+            text = self._utf8.decode(chunk)
+            if text:
+                self.buffer += text
+                return True
+        return False
+
+    def _grow(self):
+        # Double la partie non consommée pour garder un coût linéaire sur les longues valeurs
+        pending = len(self.buffer) - self.pos
+        grew = False
+        while len(self.buffer) - self.pos < 2 * pending + 1 and self._fill():
+            grew = True
+        return grew
+
+    def peek(self):
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected '{char}' in JSON stream, found '{found}'")
+        self.pos += 1
+
+    def value(self):
+        """
+        Décode la valeur suivante en entier.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self.buffer, self.pos)
+                # Un nombre peut continuer dans le morceau suivant ("0." + "5", "1e" + "3") : il n'est
+                # accepté que suivi d'un délimiteur ou en fin de flux
+                if self.eof or not isinstance(value, (int, float)) or isinstance(value, bool) or (
+                        end < len(self.buffer) and self.buffer[end] in _NUMBER_END):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            # En fin de flux, la tentative suivante retourne la valeur ou lève l'erreur
+            self._grow()
+
+    def skip(self):
+        """
+        Passe la valeur suivante sans la conserver.
+        """
+        if self.peek() not in "[{":
+            self.value()
+            return
+        depth = 0
+        while True:
+            match = _STRUCTURE.search(self.buffer, self.pos)
+            if match is None:
+                self.pos = len(self.buffer)
+                if not self._fill():
+                    raise ValueError("Unexpected end of JSON stream")
+                continue
+            self.pos = match.end()
+            char = match.group()
+            if char == '"':
+                self._skip_string_tail()
+            elif char in "[{":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def _skip_string_tail(self):
+        while True:
+            match = _STRING_TAIL.match(self.buffer, self.pos)
+            if match is not None:
+                self.pos = match.end()
+                return
+            if not self._grow():
+                raise ValueError("Unexpected end of JSON stream")
+
+    def items(self, path, parents=()):
+        """
+        Produit (parents, élément) pour chaque valeur située à `path`, tuple de clés et de "*"
+        (chaque élément d'un tableau). `parents` contient, pour chaque objet traversé, ses champs
+        scalaires lus avant la clé suivie (ex: le nom d'un dossier avant sa liste "items").
+        """
+        if not path:
+            yield parents, self.value()
+            return
+        head, rest = path[0], path[1:]
+        opening, closing = ("[", "]") if head == "*" else ("{", "}")
+        if self.peek() != opening:
+            # Structure différente de celle attendue (ex: null) : rien à produire
+            self.skip()
+            return
+        self.pos += 1
+        if self.peek() == closing:
+            self.pos += 1
+            return
+        fields = {}
+        while True:
+            if head == "*":
+                yield from self.items(rest, parents)
+            else:
+                key = self.value()
+                self.expect(":")
+                if key == head:
+                    yield from self.items(rest, parents + (fields,))
+                elif self.peek() in "[{":
+                    self.skip()
+                else:
+                    fields[key] = self.value()
+            separator = self.peek()
+            self.pos += 1
+            if separator == closing:
+                return
+            if separator != ",":
+                raise ValueError(f"Expected ',' or '{closing}' in JSON stream, found '{separator}'")
+
+
+def iter_json_items(chunks, path, with_parents=False):
+    """
+    Itère sur les éléments situés à `path` d'un document JSON reçu par morceaux d'octets.
+
+    :param path: Tuple de clés et de "*" (ex: ("history", "*") pour chaque élément de {"history": [...]}).
+    :param with_parents: Produire (parents, élément) au lieu de l'élément seul (voir JsonStreamReader.items).
+    """
+    for parents, item in JsonStreamReader(chunks).items(tuple(path)):
+        yield (parents, item) if with_parents else item
+
+
+def iter_response_items(response, path, chunk_size=64 * 1024, with_parents=False):
+    """
+    Itère sur les éléments JSON d'une réponse ouverte en stream, puis la ferme (y compris si
+    l'itération est interrompue par close()). Une erreur de décodage lève ValueError pendant l'itération.
+    """
+    try:
+        yield from iter_json_items(response.iter_content(chunk_size), path, with_parents)
+    finally:
+        response.close()
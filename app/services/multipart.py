@@ -0,0 +1,90 @@
+import asyncio
+import mimetypes
+import mmap
+import os
+import uuid
+
+
+class MultipartFileEncoder:
+    """
+    Corps multipart/form-data produit par morceaux à partir d'un fichier, sans le charger en mémoire.
+    La taille totale est connue à l'avance (Content-Length), la mémoire utilisée reste d'un morceau.
+
+    :param field_name: Nom du champ du formulaire.
+    :param file_path: Chemin du fichier à envoyer.
+    :param chunk_size: Taille des morceaux lus sur le disque.
+    :param use_mmap: Lire le fichier via mmap plutôt que par read().
+    :param progress_callback: Fonction appelée avec (octets_envoyés, octets_total) après chaque morceau.
+    """
+    def __init__(self, field_name, file_path, chunk_size=64 * 1024, use_mmap=False, progress_callback=None, content_type=None):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.use_mmap = use_mmap
+        self.progress_callback = progress_callback
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+
+        file_name = os.path.basename(file_path).replace('"', '%22')
+        file_type = content_type or mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+        self._head = (
+            f"--{self.boundary}\r\n"
+            f'Content-Disposition: form-data; name="{field_name}"; filename="{file_name}"\r\n'
+            f"Content-Type: {file_type}\r\n\r\n"
+        ).encode("utf-8")
+        self._tail = f"\r\n--{self.boundary}--\r\n".encode("utf-8")
+        self.file_size = os.path.getsize(file_path)
+        self.bytes_sent = 0
+
+    def __len__(self):
+        return len(self._head) + self.file_size + len(self._tail)
+
+    @property
+    def headers(self):
+        return {"Content-Type": self.content_type, "Content-Length": str(len(self))}
+
+    def _sent(self, size):
+        self.bytes_sent += size
+        if self.progress_callback is not None:
+            self.progress_callback(self.bytes_sent, len(self))
+
+    def _iter_file(self, file):
+        if self.use_mmap and self.file_size:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, self.file_size, self.chunk_size):
+                        # Copie d'un seul morceau : la vue ne doit pas survivre à la fermeture du mmap
+                        yield bytes(view[offset:offset + self.chunk_size])
+                finally:
+                    view.release()
+        else:
+            for chunk in iter(lambda: file.read(self.chunk_size), b""):
+                yield chunk
+
+    def __iter__(self):
+        self.bytes_sent = 0
+        yield self._head
+        self._sent(len(self._head))
+        with open(self.file_path, "rb") as file:
+            for chunk in self._iter_file(file):
+                yield chunk
+                self._sent(len(chunk))
+        yield self._tail
+        self._sent(len(self._tail))
+
+    async def aiter_chunks(self):
+        """
+        Itérateur asynchrone sur les morceaux, pour httpx.AsyncClient. Les lectures sur le disque
+        (read() ou accès au mmap) sont faites dans un thread pour ne pas bloquer la boucle d'événements ;
+        le progress_callback est donc appelé depuis ce thread.
+        """
+        chunks = iter(self)
+        try:
+            while True:
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            # Ferme le fichier si l'envoi est interrompu
+            chunks.close()
@@ -1,101 +1,105 @@
-import requests
-import os
-from dotenv import load_dotenv
-from .authentification import AuthentificationService
+from .pipeline import BaseService, decode_json
+from .embedding_batcher import vectors_from_response
+from .embedding_array import decode_embeddings, embeddings_to_array
 
-class OpenAICompatibleService:
-    def __init__(self, auth_service=None):
-        load_dotenv()
-        self.auth_service = auth_service or AuthentificationService()
-        self.base_url = os.getenv("BASE_URL")
+
+def _decode_numpy(response, context):
+    # Décodage direct du corps brut vers un tableau float32
+    return decode_embeddings(response.content)
+
+
+class OpenAICompatibleService(BaseService):
+    def __init__(self, auth_service=None, transport=None, embedding_cache=None, embedding_batcher=None, pipeline=None):
+        super().__init__(auth_service, transport, pipeline)
+        # Cache optionnel (EmbeddingCache) des embeddings déjà calculés
+        self.embedding_cache = embedding_cache
+        # Découpage en lots et regroupement optionnels (EmbeddingBatcher) des requêtes d'embedding
+        self.embedding_batcher = embedding_batcher
 
     def list_models(self, token):
         """
         GET /v1/openai/models
         Récupère tous les modèles disponibles (workspaces pour le chat).
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/openai/models"
-        headers = {"Authorization": f"Bearer {token}"}
-
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        return self._call("GET", "/v1/openai/models", token)
 
     def chat_completions(self, model_slug, messages, token, stream=False, temperature=0.7):
         """
         POST /v1/openai/chat/completions
         Exécute une conversation avec un workspace en mode compatibilité OpenAI.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/openai/chat/completions"
-        headers = {"Authorization": f"Bearer {token}"}
         json_data = {
             "model": model_slug,
             "messages": messages,
             "stream": stream,
             "temperature": temperature
         }
+        return self._call("POST", "/v1/openai/chat/completions", token, json=json_data)
 
-        try:
-            response = requests.post(url, json=json_data, headers=headers)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
-
-    def get_embeddings(self, input_texts, token, model=None):
+    def get_embeddings(self, input_texts, token, model=None, as_numpy=False):
         """
         POST /v1/openai/embeddings
         Obtenir les embeddings d'un ou plusieurs textes.
+        Avec un embedding_cache, seuls les textes absents du cache sont envoyés ; avec un embedding_batcher,
+        ils sont découpés en lots envoyés en parallèle.
+        Avec as_numpy=True, retourne {"ids", "embeddings" (ndarray float32 (n, dim)), "model"}.
         """
         auth_response, status_code = self.auth_service.auth(Authorization=token)
         if status_code != 200:
             return {"error": "Authentication failed", "details": auth_response}, status_code
 
-        url = f"{self.base_url}/v1/openai/embeddings"
-        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        if self.embedding_cache is None and self.embedding_batcher is None:
+            return self._post_embeddings(input_texts, token, model, as_numpy=as_numpy)
+
+        texts = [input_texts] if isinstance(input_texts, str) else list(input_texts)
+        if self.embedding_cache is None:
+            vectors, status_code = self._fetch_vectors(texts, token, model)
+            if status_code != 200:
+                return vectors, status_code
+            return self._embeddings_response(vectors, model, as_numpy), 200
+
+        vectors = self.embedding_cache.get_many(model, texts)
+        missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+        if missing:
+            fetched, status_code = self._fetch_vectors(missing, token, model)
+            if status_code != 200:
+                return fetched, status_code
+            self.embedding_cache.put_many(model, missing, fetched)
+            by_text = dict(zip(missing, fetched))
+            vectors = [vector if vector is not None else by_text[text] for text, vector in zip(texts, vectors)]
+        return self._embeddings_response(vectors, model, as_numpy), 200
+
+    def _fetch_vectors(self, texts, token, model):
+        def send(batch):
+            return self._post_embeddings(batch, token, model)
+
+        if self.embedding_batcher is not None:
+            return self.embedding_batcher.embed(texts, send, key=(token, model))
+        response, status_code = send(texts)
+        if status_code != 200:
+            return response, status_code
+        return vectors_from_response(response, len(texts))
+
+    @staticmethod
+    def _embeddings_response(vectors, model, as_numpy=False):
+        if as_numpy:
+            return embeddings_to_array(vectors, model=model)
+        return {
+            "object": "list",
+            "data": [{"object": "embedding", "embedding": vector, "index": index} for index, vector in enumerate(vectors)],
+            "model": model
+        }
+
+    def _post_embeddings(self, input_texts, token, model, as_numpy=False):
         payload = {"input": input_texts, "model": model}
+        return self._call(
+            "POST", "/v1/openai/embeddings", token, json=payload, authenticate=False,
+            decode=_decode_numpy if as_numpy else decode_json, decode_error="Invalid embeddings response"
+        )
 
-        try:
-            response = requests.post(url, headers=headers, json=payload)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
-            
     def list_vector_stores(self, token):
         """
         GET /v1/openai/vector_stores
         Liste toutes les collections de bases de données vectorielles connectées.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/openai/vector_stores"
-        headers = {"Authorization": f"Bearer {token}"}
-
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        return self._call("GET", "/v1/openai/vector_stores", token)
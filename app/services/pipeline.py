@@ -0,0 +1,224 @@
+import os
+import time
+import requests
+from dotenv import load_dotenv
+from .authentification import AuthentificationService
+
+
+class DetailedErrors:
+    """
+    Format d'erreur des services workspace, thread, embed, openai, système et utilisateurs.
+    """
+    @staticmethod
+    def http_error(response, error):
+        return {"error": "HTTP error occurred", "details": str(error)}, response.status_code
+
+    @staticmethod
+    def request_error(error):
+        return {"error": "Request exception occurred", "details": str(error)}, 500
+
+
+class MessageErrors:
+    """
+    Format d'erreur des services admin et documents : message renvoyé par le serveur.
+    """
+    @staticmethod
+    def http_error(response, error):
+        try:
+            error_details = response.json()
+            error_message = error_details.get("message", str(error_details))
+        except ValueError:
+            error_message = response.text
+        return {"error": f"HTTP Error: {error_message}"}, response.status_code
+
+    @staticmethod
+    def request_error(error):
+        return {"error": f"Request failed: {str(error)}"}, 500
+
+
+def decode_json(response, context):
+    return response.json()
+
+
+class RequestContext:
+    """
+    État d'un appel traversant le pipeline. Les étapes peuvent lire `response` et `error`
+    après l'appel à l'étape suivante.
+    """
+    __slots__ = (
+        "method", "url", "token", "kwargs", "authenticate", "decode", "success_payload", "errors",
+        "decode_error", "started_at", "response", "error"
+    )
+
+    def __init__(self, method, url, token, kwargs, authenticate=True, decode=decode_json, success_payload=None,
+                 errors=DetailedErrors, decode_error="Invalid response"):
+        self.method = method
+        self.url = url
+        self.token = token
+        self.kwargs = kwargs
+        self.authenticate = authenticate
+        self.decode = decode
+        self.success_payload = success_payload
+        self.errors = errors
+        self.decode_error = decode_error
+        self.started_at = None
+        self.response = None
+        self.error = None
+
+    @property
+    def stream(self):
+        return bool(self.kwargs.get("stream"))
+
+
+class AuthMiddleware:
+    """
+    Valide le token avant l'envoi (via le cache de AuthentificationService) ; l'appel s'arrête en cas d'échec.
+    """
+    def __init__(self, auth_service):
+        self.auth_service = auth_service
+
+    def __call__(self, context, call_next):
+        if context.authenticate:
+            auth_response, status_code = self.auth_service.auth(Authorization=context.token)
+            if status_code != 200:
+                return {"error": "Authentication failed", "details": auth_response}, status_code
+        return call_next(context)
+
+
+class RetryMiddleware:
+    """
+    Rejoue l'appel selon une RetryPolicy, au niveau du service (utile quand le transport partagé n'en a pas).
+    """
+    def __init__(self, retry_policy, sleep=time.sleep):
+        self.retry_policy = retry_policy
+        self.sleep = sleep
+
+    def __call__(self, context, call_next):
+        attempt = 1
+        while True:
+            result = call_next(context)
+            if context.error is not None:
+                connect_error = isinstance(context.error, requests.exceptions.ConnectTimeout)
+                delay = self.retry_policy.delay_for_error(attempt, context.method, connect_error=connect_error)
+            elif context.response is not None:
+                delay = self.retry_policy.delay_for_response(attempt, context.method, context.response)
+            else:
+                delay = None
+            if delay is None:
+                return result
+            if context.response is not None:
+                context.response.close()
+            context.response = None
+            context.error = None
+            attempt += 1
+            self.sleep(delay)
+
+
+class MetricsMiddleware:
+    """
+    Mesure la durée complète de chaque appel de service (authentification et décodage compris).
+    """
+    def __init__(self, instrumentation):
+        self.instrumentation = instrumentation
+
+    def __call__(self, context, call_next):
+        started_at = time.perf_counter()
+        payload, status_code = call_next(context)
+        self.instrumentation.record_call(context.method, context.url, time.perf_counter() - started_at, status_code)
+        return payload, status_code
+
+
+class RequestPipeline:
+    """
+    Pipeline commun des services sync : chaque étape (middleware) reçoit le RequestContext et la fonction
+    de l'étape suivante, et retourne (payload, status_code). La dernière étape envoie la requête
+    via le transport puis décode la réponse avec `context.decode`.
+
+    :param transport: HttpTransport utilisé pour l'envoi.
+    :param auth_service: AuthentificationService utilisé par l'étape d'authentification.
+    :param middlewares: Étapes, de la plus externe à la plus interne (par défaut : AuthMiddleware seule).
+    """
+    def __init__(self, transport, auth_service, middlewares=None):
+        self.transport = transport
+        self.auth_service = auth_service
+        self.middlewares = list(middlewares) if middlewares is not None else [AuthMiddleware(auth_service)]
+
+    def use(self, middleware):
+        """
+        Ajoute une étape après les étapes existantes (au plus près de l'envoi).
+        """
+        self.middlewares.append(middleware)
+        return self
+
+    def send(self, method, url, token, authenticate=True, decode=decode_json, success_payload=None,
+             errors=DetailedErrors, decode_error="Invalid response", **kwargs):
+        """
+        Exécute un appel et retourne (payload, status_code).
+
+        :param authenticate: Valider le token avant l'envoi.
+        :param decode: Fonction decode(response, context) qui produit le payload d'une réponse réussie.
+        :param success_payload: Payload fixe retourné en cas de succès (au lieu de décoder la réponse).
+        :param errors: Format des erreurs (DetailedErrors ou MessageErrors).
+        :param kwargs: Arguments transmis au transport (json, params, data, headers, stream...).
+        """
+        context = RequestContext(method, url, token, kwargs, authenticate, decode, success_payload, errors, decode_error)
+        return self._run(context, 0)
+
+    def _run(self, context, index):
+        if index == len(self.middlewares):
+            return self._dispatch(context)
+        return self.middlewares[index](context, lambda next_context: self._run(next_context, index + 1))
+
+    def _transport_call(self, method):
+        # Les méthodes get/post/delete du transport sont utilisées quand elles existent (comme avant le pipeline)
+        if method in ("GET", "POST", "DELETE"):
+            return getattr(self.transport, method.lower())
+        return lambda url, **kwargs: self.transport.request(method, url, **kwargs)
+
+    def _dispatch(self, context):
+        kwargs = dict(context.kwargs)
+        headers = {"Authorization": f"Bearer {context.token}", **kwargs.pop("headers", {})}
+        context.started_at = time.perf_counter()
+        try:
+            response = context.response = self._transport_call(context.method)(context.url, headers=headers, **kwargs)
+            if response.status_code == 304:
+                return None, 304
+            response.raise_for_status()
+            if context.success_payload is not None:
+                return context.success_payload, response.status_code
+            return context.decode(response, context), response.status_code
+        except requests.exceptions.HTTPError as http_err:
+            if context.stream:
+                context.response.close()
+            return context.errors.http_error(context.response, http_err)
+        except requests.exceptions.JSONDecodeError as decode_err:
+            # Sous-classe de RequestException et de ValueError : corps invalide, pas une erreur réseau à rejouer
+            return {"error": context.decode_error, "details": str(decode_err)}, 502
+        except requests.exceptions.RequestException as req_err:
+            context.error = req_err
+            return context.errors.request_error(req_err)
+        except ValueError as decode_err:
+            return {"error": context.decode_error, "details": str(decode_err)}, 502
+
+
+class BaseService:
+    """
+    Base des services sync : transport et authentification partagés, appels via un RequestPipeline.
+
+    :param pipeline: RequestPipeline partagé (par défaut, un pipeline propre au service).
+    """
+    errors = DetailedErrors
+
+    def __init__(self, auth_service=None, transport=None, pipeline=None):
+        load_dotenv()
+        if pipeline is not None:
+            auth_service = auth_service or pipeline.auth_service
+            transport = transport or pipeline.transport
+        self.auth_service = auth_service or AuthentificationService(transport=transport)
+        self.transport = transport or self.auth_service.transport
+        self.base_url = os.getenv("BASE_URL")
+        self.pipeline = pipeline or RequestPipeline(self.transport, self.auth_service)
+
+    def _call(self, method, path, token, **kwargs):
+        kwargs.setdefault("errors", self.errors)
+        return self.pipeline.send(method, f"{self.base_url}{path}", token, **kwargs)
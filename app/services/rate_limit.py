@@ -0,0 +1,222 @@
+import asyncio
+import threading
+import time
+from urllib.parse import urlsplit
+
+FAMILIES = ("chat", "embeddings", "documents", "admin", "default")
+
+
+def endpoint_family(url):
+    """
+    Famille d'endpoint d'une URL de l'API : "chat", "embeddings", "documents", "admin" ou "default".
+    """
+    path = urlsplit(url).path.rstrip("/")
+    # BASE_URL contient en général un préfixe (ex: /api) avant /v1
+    version = path.find("/v1/")
+    if version > 0:
+        path = path[version:]
+    if path.endswith(("/chat", "/stream-chat", "/chat/completions")):
+        return "chat"
+    if path.endswith(("/embeddings", "/update-embeddings")):
+        return "embeddings"
+    if path.startswith("/v1/document"):
+        return "documents"
+    if path.startswith(("/v1/admin", "/v1/system", "/v1/users")):
+        return "admin"
+    return "default"
+
+
+def token_of(headers):
+    authorization = (headers or {}).get("Authorization") or ""
+    return authorization[len("Bearer "):] if authorization.startswith("Bearer ") else authorization
+
+
+class RateLimit:
+    """
+    Limite d'une famille d'endpoints, appliquée séparément à chaque token API.
+
+    :param rate: Requêtes par seconde autorisées en régime continu (None pour ne pas limiter le débit).
+    :param burst: Nombre de requêtes pouvant partir d'un coup (taille du seau, par défaut max(1, rate)).
+    :param max_in_flight: Nombre maximal de requêtes simultanées (None pour ne pas limiter).
+    """
+    def __init__(self, rate=None, burst=None, max_in_flight=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, rate or 1)
+        self.max_in_flight = max_in_flight
+
+
+class TokenBucket:
+    """
+    Seau à jetons thread-safe. reserve() réserve un jeton et retourne le temps d'attente nécessaire,
+    ce qui permet d'attendre avec time.sleep comme avec asyncio.sleep.
+    """
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class _WaitStats:
+    __slots__ = ("acquired", "waiting", "wait_total", "wait_max")
+
+    def __init__(self):
+        self.acquired = 0
+        self.waiting = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def as_dict(self):
+        return {
+            "acquired": self.acquired,
+            "waiting": self.waiting,
+            "wait_total": self.wait_total,
+            "wait_max": self.wait_max,
+            "wait_avg": self.wait_total / self.acquired if self.acquired else 0.0
+        }
+
+
+class RateSlot:
+    """
+    Place obtenue auprès du limiteur ; release() la rend (une seule fois).
+    """
+    __slots__ = ("_release", "wait_time")
+
+    def __init__(self, release, wait_time):
+        self._release = release
+        self.wait_time = wait_time
+
+    def release(self):
+        release, self._release = self._release, None
+        if release is not None:
+            release()
+
+
+class RateLimiter:
+    """
+    Limiteur de débit (seau à jetons) et de requêtes simultanées, par famille d'endpoints et par token API.
+    Les seaux sont partagés entre les transports sync et async ; les limites de requêtes simultanées
+    sont comptées séparément pour les threads et pour chaque boucle asyncio.
+
+    :param limits: Dictionnaire {famille: RateLimit} (voir endpoint_family).
+    :param default: RateLimit appliquée aux familles absentes de `limits` (None pour ne pas limiter).
+    """
+    def __init__(self, limits=None, default=None):
+        unknown = set(limits or {}) - set(FAMILIES)
+        if unknown:
+            raise ValueError(f"Unknown endpoint families: {', '.join(sorted(unknown))}")
+        self.limits = dict(limits or {})
+        self.default = default
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self._semaphores = {}
+        self._async_semaphores = {}
+        self._stats = {}
+
+    def limit_for(self, family):
+        return self.limits.get(family, self.default)
+
+    def _bucket(self, key, limit):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(limit.rate, limit.burst)
+        return bucket
+
+    def _prepare(self, url, headers):
+        family = endpoint_family(url)
+        limit = self.limit_for(family)
+        if limit is None:
+            return family, None, None, None
+        key = (family, token_of(headers))
+        with self._lock:
+            bucket = self._bucket(key, limit) if limit.rate else None
+            stats = self._stats.setdefault(family, _WaitStats())
+            stats.waiting += 1
+        return family, limit, key, bucket
+
+    def _acquired(self, family, started_at):
+        # started_at None : l'attente a été interrompue, la requête ne part pas
+        waited = time.perf_counter() - started_at if started_at is not None else 0.0
+        with self._lock:
+            stats = self._stats[family]
+            stats.waiting -= 1
+            if started_at is None:
+                return waited
+            stats.acquired += 1
+            stats.wait_total += waited
+            stats.wait_max = max(stats.wait_max, waited)
+        return waited
+
+    def acquire(self, url, headers=None):
+        """
+        Attend (en bloquant le thread) le droit d'envoyer une requête vers `url` et retourne un RateSlot.
+        """
+        started_at = time.perf_counter()
+        family, limit, key, bucket = self._prepare(url, headers)
+        if limit is None:
+            return RateSlot(None, 0.0)
+        semaphore = None
+        try:
+            if limit.max_in_flight:
+                with self._lock:
+                    pending = self._semaphores.get(key)
+                    if pending is None:
+                        pending = self._semaphores[key] = threading.Semaphore(limit.max_in_flight)
+                pending.acquire()
+                semaphore = pending
+            if bucket is not None:
+                delay = bucket.reserve()
+                if delay:
+                    time.sleep(delay)
+        except BaseException:
+            if semaphore is not None:
+                semaphore.release()
+            self._acquired(family, None)
+            raise
+        waited = self._acquired(family, started_at)
+        return RateSlot(semaphore.release if semaphore is not None else None, waited)
+
+    async def acquire_async(self, url, headers=None):
+        """
+        Équivalent asynchrone de acquire().
+        """
+        started_at = time.perf_counter()
+        family, limit, key, bucket = self._prepare(url, headers)
+        if limit is None:
+            return RateSlot(None, 0.0)
+        semaphore = None
+        try:
+            if limit.max_in_flight:
+                loop_key = (key, id(asyncio.get_running_loop()))
+                pending = self._async_semaphores.get(loop_key)
+                if pending is None:
+                    pending = self._async_semaphores[loop_key] = asyncio.Semaphore(limit.max_in_flight)
+                await pending.acquire()
+                semaphore = pending
+            if bucket is not None:
+                delay = bucket.reserve()
+                if delay:
+                    await asyncio.sleep(delay)
+        except BaseException:
+            if semaphore is not None:
+                semaphore.release()
+            self._acquired(family, None)
+            raise
+        waited = self._acquired(family, started_at)
+        return RateSlot(semaphore.release if semaphore is not None else None, waited)
+
+    def stats(self):
+        """
+        Statistiques d'attente par famille : {famille: {"acquired", "waiting", "wait_total", "wait_max", "wait_avg"}}.
+        """
+        with self._lock:
+            return {family: stats.as_dict() for family, stats in self._stats.items()}
@@ -0,0 +1,183 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+import requests
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """
+    Levée sans envoyer la requête quand le disjoncteur de l'hôte est ouvert.
+    Hérite de ConnectionError : les services la traitent comme une erreur réseau (500).
+    """
+    def __init__(self, host, retry_in):
+        self.host = host
+        self.retry_in = retry_in
+        super().__init__(f"Circuit open for {host}, retry in {retry_in:.1f}s")
+
+
+class RetryPolicy:
+    """
+    Politique de nouvelles tentatives : backoff exponentiel avec jitter, respect de Retry-After.
+    Les erreurs réseau et les statuts transitoires ne sont rejoués que pour les méthodes idempotentes ;
+    un échec de connexion (requête jamais envoyée) est rejoué pour toutes les méthodes.
+
+    :param max_attempts: Nombre total de tentatives (1 pour désactiver les nouvelles tentatives).
+    :param backoff_factor: Délai de base en secondes, doublé à chaque tentative.
+    :param max_backoff: Délai maximal entre deux tentatives.
+    :param retry_statuses: Statuts HTTP considérés comme transitoires.
+    :param retry_methods: Méthodes rejouées après une erreur ou un statut transitoire.
+    :param max_retry_after: Retry-After au-delà duquel la réponse est rendue telle quelle.
+    """
+    def __init__(self, max_attempts=3, backoff_factor=0.5, max_backoff=30, jitter=True,
+                 retry_statuses=(429, 502, 503, 504), retry_methods=IDEMPOTENT_METHODS, max_retry_after=60):
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods = frozenset(method.upper() for method in retry_methods)
+        self.max_retry_after = max_retry_after
+
+    def backoff(self, attempt):
+        """
+        Délai avant la tentative suivant `attempt` (1 pour la première), avec "full jitter".
+        """
+        delay = min(self.max_backoff, self.backoff_factor * (2 ** (attempt - 1)))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    @staticmethod
+    def parse_retry_after(value):
+        """
+        Retourne le délai en secondes d'un en-tête Retry-After (secondes ou date HTTP), ou None.
+        """
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+    def delay_for_response(self, attempt, method, response):
+        """
+        Retourne le délai avant de rejouer la requête, ou None si la réponse doit être rendue.
+        """
+        if attempt >= self.max_attempts or response.status_code not in self.retry_statuses:
+            return None
+        if method.upper() not in self.retry_methods:
+            return None
+        retry_after = self.parse_retry_after(response.headers.get("Retry-After"))
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_retry_after else None
+        return self.backoff(attempt)
+
+    def delay_for_error(self, attempt, method, connect_error=False):
+        """
+        Retourne le délai avant de rejouer après une erreur réseau, ou None pour la propager.
+        """
+        if attempt >= self.max_attempts:
+            return None
+        if not connect_error and method.upper() not in self.retry_methods:
+            return None
+        return self.backoff(attempt)
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur par hôte : après `failure_threshold` échecs consécutifs (erreurs réseau ou statuts 5xx),
+    les requêtes vers l'hôte échouent immédiatement pendant `recovery_timeout` secondes, puis une
+    requête d'essai est laissée passer pour refermer le circuit.
+
+    :param failure_threshold: Nombre d'échecs consécutifs qui ouvre le circuit.
+    :param recovery_timeout: Durée d'ouverture du circuit en secondes.
+    :param failure_statuses: Statuts HTTP comptés comme des échecs du serveur.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, recovery_timeout=30, failure_statuses=(500, 502, 503, 504)):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.failure_statuses = frozenset(failure_statuses)
+        self._lock = threading.Lock()
+        self._hosts = {}
+
+    @staticmethod
+    def host_of(url):
+        return urlsplit(url).netloc
+
+    def _host(self, host):
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = {"state": self.CLOSED, "failures": 0, "opened_at": 0.0, "probing": False}
+        return state
+
+    def state(self, host):
+        with self._lock:
+            state = self._host(host)
+            if state["state"] == self.OPEN and time.monotonic() - state["opened_at"] >= self.recovery_timeout:
+                return self.HALF_OPEN
+            return state["state"]
+
+    def before_request(self, host):
+        """
+        Lève CircuitOpenError si le circuit de l'hôte est ouvert. Retourne True si la requête est
+        la requête d'essai de la demi-ouverture (à libérer par release_probe si elle n'aboutit pas).
+        """
+        with self._lock:
+            state = self._host(host)
+            if state["state"] == self.CLOSED:
+                return False
+            remaining = self.recovery_timeout - (time.monotonic() - state["opened_at"])
+            if state["state"] == self.OPEN and remaining <= 0:
+                state["state"] = self.HALF_OPEN
+            if state["state"] == self.HALF_OPEN and not state["probing"]:
+                # Une seule requête d'essai à la fois pendant la demi-ouverture
+                state["probing"] = True
+                return True
+            raise CircuitOpenError(host, max(remaining, 0.0))
+
+    def record_success(self, host):
+        with self._lock:
+            state = self._host(host)
+            state.update(state=self.CLOSED, failures=0, probing=False)
+
+    def record_failure(self, host):
+        with self._lock:
+            state = self._host(host)
+            state["failures"] += 1
+            state["probing"] = False
+            if state["state"] == self.HALF_OPEN or state["failures"] >= self.failure_threshold:
+                state["state"] = self.OPEN
+                state["opened_at"] = time.monotonic()
+
+    def release_probe(self, host):
+        """
+        Libère la requête d'essai interrompue (annulation, exception autre qu'une erreur réseau) sans
+        compter d'échec : la requête suivante peut de nouveau servir d'essai.
+        """
+        with self._lock:
+            state = self._host(host)
+            if state["state"] == self.HALF_OPEN and state["probing"]:
+                # opened_at n'est pas modifié : le délai de récupération reste écoulé
+                state.update(state=self.OPEN, probing=False)
+
+    def record_response(self, host, status_code):
+        if status_code in self.failure_statuses:
+            self.record_failure(host)
+        else:
+            self.record_success(host)
+
+    def reset(self, host=None):
+        with self._lock:
+            if host is None:
+                self._hosts.clear()
+            else:
+                self._hosts.pop(host, None)
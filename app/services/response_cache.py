@@ -0,0 +1,224 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from urllib.parse import urlsplit
+from .instrumentation import endpoint_template
+
+# Durée de vie par défaut (secondes) des endpoints de lecture interrogés en boucle par les tableaux de bord
+DEFAULT_TTLS = {
+    "/v1/workspaces": 30,
+    "/v1/workspace/{slug}": 30,
+    "/v1/documents": 30,
+    "/v1/document/accepted-file-types": 300,
+    "/v1/embed": 60,
+    "/v1/system": 60,
+    "/v1/openai/models": 60
+}
+
+
+def split_api_url(url):
+    """
+    Sépare une URL de l'API en (origine, chemin à partir de /v1).
+    """
+    parts = urlsplit(url)
+    path = parts.path.rstrip("/")
+    version = path.find("/v1/")
+    prefix, path = (path[:version], path[version:]) if version >= 0 else ("", path)
+    return f"{parts.scheme}://{parts.netloc}{prefix}", path
+
+
+def invalidated_prefixes(path):
+    """
+    Préfixes des chemins en cache rendus obsolètes par une écriture réussie sur `path`.
+    """
+    if path.endswith(("/chat", "/stream-chat")) and path.startswith("/v1/workspace/"):
+        return (path.rsplit("/", 1)[0] + "/chats",)
+    if path.startswith("/v1/workspace/"):
+        # Les workspaces apparaissent aussi comme modèles et collections vectorielles OpenAI
+        return ("/v1/workspace", "/v1/openai/models", "/v1/openai/vector_stores", "/v1/system/vector-count")
+    if path.startswith("/v1/document/") or path == "/v1/system/remove-documents":
+        return ("/v1/document", "/v1/system/vector-count")
+    if path.startswith("/v1/admin/"):
+        return ("/v1/admin", "/v1/users")
+    if path == "/v1/system/update-env":
+        return ("/v1/system",)
+    return ()
+
+
+class _Entry:
+    __slots__ = ("origin", "path", "payload", "status_code", "size", "expires_at", "etag", "last_modified")
+
+    def __init__(self, origin, path, payload, status_code, size, expires_at, etag, last_modified):
+        self.origin = origin
+        self.path = path
+        self.payload = payload
+        self.status_code = status_code
+        self.size = size
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class ResponseCache:
+    """
+    Cache LRU en mémoire des réponses GET décodées, clé (token, URL, paramètres).
+    Une entrée expirée qui a un ETag ou un Last-Modified est revalidée par une requête conditionnelle
+    (304 : l'entrée est resservie sans nouveau téléchargement).
+
+    :param ttls: Durées de vie par modèle d'endpoint (ex: {"/v1/workspace/{slug}": 10}), fusionnées avec DEFAULT_TTLS ;
+                 0 désactive le cache d'un endpoint.
+    :param default_ttl: Durée de vie des endpoints absents de `ttls` (0 : pas de cache).
+    :param max_entries: Nombre maximal d'entrées.
+    :param max_bytes: Taille cumulée maximale des corps de réponse gardés en mémoire.
+    """
+    def __init__(self, ttls=None, default_ttl=0, max_entries=512, max_bytes=32 * 1024 * 1024, clock=time.monotonic):
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def ttl_for(self, url):
+        return self.ttls.get(endpoint_template(url), self.default_ttl)
+
+    @staticmethod
+    def key(token, url, params=None):
+        return token, url, tuple(sorted((params or {}).items()))
+
+    def lookup(self, key):
+        """
+        Retourne (entrée, fraîche) ou (None, False). L'entrée retournée ne doit pas être modifiée.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            fresh = entry.expires_at > self.clock()
+            if fresh:
+                self.hits += 1
+            elif entry.etag is None and entry.last_modified is None:
+                # Sans validateur, une entrée expirée ne sert plus à rien
+                self._remove(key)
+                self.misses += 1
+                return None, False
+            return entry, fresh
+
+    def store(self, key, url, payload, status_code, size, etag=None, last_modified=None):
+        ttl = self.ttl_for(url)
+        if ttl <= 0 or size > self.max_bytes:
+            return
+        origin, path = split_api_url(url)
+        entry = _Entry(origin, path, payload, status_code, size, self.clock() + ttl, etag, last_modified)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def refresh(self, key, url):
+        """
+        Prolonge une entrée revalidée par le serveur (réponse 304).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.expires_at = self.clock() + self.ttl_for(url)
+                self.revalidated += 1
+            return entry
+
+    def invalidate(self, url, prefixes=None):
+        """
+        Supprime les entrées de la même instance dont le chemin commence par l'un des `prefixes`
+        (par défaut, ceux rendus obsolètes par une écriture sur `url`). Retourne le nombre d'entrées supprimées.
+        """
+        origin, path = split_api_url(url)
+        prefixes = tuple(prefixes) if prefixes is not None else invalidated_prefixes(path)
+        if not prefixes:
+            return 0
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry.origin == origin and entry.path.startswith(prefixes)]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "revalidated": self.revalidated,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CacheMiddleware:
+    """
+    Étape de RequestPipeline : sert les GET depuis un ResponseCache, les revalide par
+    If-None-Match / If-Modified-Since et invalide les entrées liées après une écriture réussie.
+    À placer après l'étape d'authentification (ordre par défaut de RequestPipeline.use).
+    """
+    def __init__(self, cache):
+        self.cache = cache
+
+    def __call__(self, context, call_next):
+        if context.method != "GET":
+            payload, status_code = call_next(context)
+            if status_code < 400:
+                self.cache.invalidate(context.url)
+            return payload, status_code
+        if context.stream or self.cache.ttl_for(context.url) <= 0:
+            return call_next(context)
+
+        key = self.cache.key(context.token, context.url, context.kwargs.get("params"))
+        entry, fresh = self.cache.lookup(key)
+        if fresh:
+            return copy.deepcopy(entry.payload), entry.status_code
+        if entry is not None:
+            validators = {}
+            if entry.etag is not None:
+                validators["If-None-Match"] = entry.etag
+            if entry.last_modified is not None:
+                validators["If-Modified-Since"] = entry.last_modified
+            context.kwargs = {**context.kwargs, "headers": {**context.kwargs.get("headers", {}), **validators}}
+
+        payload, status_code = call_next(context)
+        if status_code == 304 and entry is not None:
+            entry = self.cache.refresh(key, context.url) or entry
+            return copy.deepcopy(entry.payload), entry.status_code
+        response = context.response
+        if status_code == 200 and response is not None:
+            self.cache.store(
+                key, context.url, copy.deepcopy(payload), status_code, len(response.content),
+                etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified")
+            )
+        return payload, status_code
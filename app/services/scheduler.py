@@ -0,0 +1,198 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from .rate_limit import endpoint_family
+
+INTERACTIVE = "interactive"
+DEFAULT = "default"
+BACKGROUND = "background"
+
+_priority = contextvars.ContextVar("request_priority", default=None)
+
+
+@contextmanager
+def request_priority(priority_class):
+    """
+    Force la classe de priorité des requêtes envoyées dans le bloc (thread ou tâche asyncio courante).
+    """
+    token = _priority.set(priority_class)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def classify_by_endpoint(url):
+    """
+    Classe par défaut : chats interactifs, documents et embeddings en arrière-plan, le reste entre les deux.
+    """
+    family = endpoint_family(url)
+    if family == "chat":
+        return INTERACTIVE
+    if family in ("documents", "embeddings"):
+        return BACKGROUND
+    return DEFAULT
+
+
+class _Waiter:
+    __slots__ = ("priority_class", "wake", "state", "queued_at")
+
+    def __init__(self, priority_class, wake):
+        self.priority_class = priority_class
+        self.wake = wake
+        self.state = "waiting"
+        self.queued_at = time.perf_counter()
+
+
+class _Grant:
+    __slots__ = ("_scheduler",)
+
+    def __init__(self, scheduler):
+        self._scheduler = scheduler
+
+    def release(self):
+        scheduler, self._scheduler = self._scheduler, None
+        if scheduler is not None:
+            scheduler._release()
+
+
+class _ClassStats:
+    __slots__ = ("dispatched", "queued", "wait_total", "wait_max")
+
+    def __init__(self):
+        self.dispatched = 0
+        self.queued = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def as_dict(self):
+        return {
+            "dispatched": self.dispatched,
+            "queued": self.queued,
+            "wait_total": self.wait_total,
+            "wait_max": self.wait_max
+        }
+
+
+class RequestScheduler:
+    """
+    Ordonnanceur de requêtes devant le transport : au plus `max_in_flight` requêtes partent en même temps,
+    les autres attendent et sont servies par file équitable pondérée (WFQ) entre classes de priorité.
+    Avec les poids par défaut, un chat interactif en attente passe devant l'ingestion en cours, sans
+    affamer complètement l'arrière-plan. Partagé entre threads et boucles asyncio.
+
+    :param max_in_flight: Nombre de requêtes simultanées autorisées.
+    :param weights: Poids des classes {classe: poids} ; une classe de poids w reçoit w fois plus de places.
+    :param classify: Fonction url -> classe utilisée hors d'un bloc request_priority().
+    """
+    def __init__(self, max_in_flight=8, weights=None, classify=classify_by_endpoint):
+        self.max_in_flight = max_in_flight
+        self.weights = dict(weights or {INTERACTIVE: 16, DEFAULT: 4, BACKGROUND: 1})
+        self.classify = classify
+        self._lock = threading.Lock()
+        self._heap = []
+        self._sequence = itertools.count()
+        self._virtual_time = 0.0
+        self._finish = {}
+        self._in_flight = 0
+        self._stats = {}
+
+    def priority_of(self, url):
+        priority_class = _priority.get() or self.classify(url)
+        if priority_class not in self.weights:
+            raise ValueError(f"Unknown priority class: {priority_class}")
+        return priority_class
+
+    def _tag(self, priority_class):
+        # Temps de fin virtuel : une classe lourde avance lentement, elle est donc servie plus souvent
+        tag = max(self._virtual_time, self._finish.get(priority_class, 0.0)) + 1.0 / self.weights[priority_class]
+        self._finish[priority_class] = tag
+        return tag
+
+    def _granted(self, waiter):
+        waited = time.perf_counter() - waiter.queued_at
+        stats = self._stats.setdefault(waiter.priority_class, _ClassStats())
+        stats.dispatched += 1
+        stats.wait_total += waited
+        stats.wait_max = max(stats.wait_max, waited)
+
+    def _enqueue(self, url, wake):
+        """
+        Retourne None si la requête peut partir tout de suite, sinon le _Waiter mis en file.
+        """
+        priority_class = self.priority_of(url)
+        waiter = _Waiter(priority_class, wake)
+        with self._lock:
+            tag = self._tag(priority_class)
+            if self._in_flight < self.max_in_flight and not self._heap:
+                self._in_flight += 1
+                self._virtual_time = tag
+                self._granted(waiter)
+                return None
+            heapq.heappush(self._heap, (tag, next(self._sequence), waiter))
+            self._stats.setdefault(priority_class, _ClassStats()).queued += 1
+            return waiter
+
+    def _release(self):
+        with self._lock:
+            while self._heap:
+                tag, _, waiter = heapq.heappop(self._heap)
+                self._stats[waiter.priority_class].queued -= 1
+                if waiter.state != "waiting":
+                    continue
+                # La place passe directement à la requête suivante
+                waiter.state = "granted"
+                self._virtual_time = tag
+                self._granted(waiter)
+                waiter.wake()
+                return
+            self._in_flight -= 1
+
+    def acquire(self, url):
+        """
+        Attend (en bloquant le thread) une place pour `url` ; retourne un objet dont release() rend la place.
+        """
+        event = threading.Event()
+        waiter = self._enqueue(url, event.set)
+        if waiter is not None:
+            event.wait()
+        return _Grant(self)
+
+    async def acquire_async(self, url):
+        """
+        Équivalent asynchrone de acquire() ; une tâche annulée pendant l'attente quitte la file.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        waiter = self._enqueue(url, wake)
+        if waiter is not None:
+            try:
+                await future
+            except asyncio.CancelledError:
+                with self._lock:
+                    granted = waiter.state == "granted"
+                    waiter.state = "cancelled"
+                if granted:
+                    self._release()
+                raise
+        return _Grant(self)
+
+    @property
+    def in_flight(self):
+        with self._lock:
+            return self._in_flight
+
+    def stats(self):
+        """
+        Statistiques par classe : {classe: {"dispatched", "queued", "wait_total", "wait_max"}}.
+        """
+        with self._lock:
+            return {priority_class: stats.as_dict() for priority_class, stats in self._stats.items()}
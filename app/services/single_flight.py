@@ -0,0 +1,114 @@
+import asyncio
+import copy
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Regroupe les appels identiques simultanés (threads) : le premier appel d'une clé l'exécute,
+    les suivants attendent son résultat au lieu de refaire la requête. Chaque appelant reçoit
+    sa propre copie du résultat décodé.
+    """
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """
+        Retourne fn() ; si un appel de même clé est en cours, attend et partage son résultat
+        (ou son exception).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        # La clé n'est plus enregistrée : `waiters` ne bouge plus
+        return copy.deepcopy(call.result) if call.waiters else call.result
+
+    def stats(self):
+        with self._lock:
+            return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._calls)}
+
+
+class AsyncSingleFlight:
+    """
+    Équivalent asyncio de SingleFlight : l'appel partagé s'exécute dans une tâche à part, si bien que
+    l'annulation d'un appelant n'interrompt pas les autres.
+    """
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._tasks = {}
+
+    async def do(self, key, fn):
+        """
+        Retourne await fn() ; si un appel de même clé est en cours dans la même boucle, partage son résultat.
+        """
+        loop_key = (key, id(asyncio.get_running_loop()))
+        call = self._tasks.get(loop_key)
+        if call is None:
+            call = self._tasks[loop_key] = [asyncio.ensure_future(self._run(loop_key, fn)), 0]
+            self.calls += 1
+        else:
+            call[1] += 1
+            self.coalesced += 1
+        result = await asyncio.shield(call[0])
+        return copy.deepcopy(result) if call[1] else result
+
+    async def _run(self, loop_key, fn):
+        try:
+            return await fn()
+        finally:
+            # Retirée avant la fin de la tâche : aucun appelant ne peut plus la rejoindre
+            self._tasks.pop(loop_key, None)
+
+    def stats(self):
+        return {"calls": self.calls, "coalesced": self.coalesced, "in_flight": len(self._tasks)}
+
+
+class SingleFlightMiddleware:
+    """
+    Étape de RequestPipeline : regroupe les GET identiques (token, URL, paramètres) en cours.
+    À placer après CacheMiddleware pour ne regrouper que les absences du cache.
+    """
+    def __init__(self, single_flight=None):
+        self.single_flight = single_flight or SingleFlight()
+
+    def __call__(self, context, call_next):
+        if context.method != "GET" or context.stream:
+            return call_next(context)
+        params = tuple(sorted((context.kwargs.get("params") or {}).items()))
+        return self.single_flight.do((context.token, context.url, params), lambda: call_next(context))
@@ -0,0 +1,514 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+import requests
+from urllib3.exceptions import ReadTimeoutError
+
+
+class StreamEvent:
+    """
+    Événement décodé d'un flux stream-chat. `data` contient le JSON brut du frame.
+    """
+    type = "event"
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}({self.data!r})"
+
+
+class TextDeltaEvent(StreamEvent):
+    type = "text"
+    __slots__ = ()
+
+    @property
+    def text(self):
+        return self.data.get("textResponse") or ""
+
+
+class SourcesEvent(StreamEvent):
+    type = "sources"
+    __slots__ = ()
+
+    @property
+    def sources(self):
+        return self.data.get("sources") or []
+
+
+class CloseEvent(StreamEvent):
+    type = "close"
+    __slots__ = ()
+
+
+class ErrorEvent(StreamEvent):
+    """
+    Erreur ou interruption (type "abort") signalée par le serveur, ou frame JSON illisible.
+    """
+    type = "error"
+    __slots__ = ()
+
+    @property
+    def error(self):
+        error = self.data.get("error")
+        if isinstance(error, str) and error:
+            return error
+        return self.data.get("textResponse") or "Stream aborted"
+
+
+class StatusEvent(StreamEvent):
+    type = "status"
+    __slots__ = ()
+
+
+def events_from_frame(data):
+    """
+    Transforme le JSON d'un frame AnythingLLM en événements typés (un frame peut en porter plusieurs).
+    """
+    if data.get("type") == "abort" or data.get("error"):
+        return [ErrorEvent(data)]
+    events = []
+    if data.get("textResponse") and data.get("type") in (None, "textResponseChunk", "textResponse"):
+        events.append(TextDeltaEvent(data))
+    if data.get("sources"):
+        events.append(SourcesEvent(data))
+    if data.get("close") or data.get("type") == "finalizeResponseStream":
+        events.append(CloseEvent(data))
+    if not events:
+        events.append(StatusEvent(data))
+    return events
+
+
+class SSEParser:
+    """
+    Parseur SSE incrémental : les octets reçus sont accumulés dans un buffer réutilisé et seuls
+    les champs `data:` complets sont décodés.
+    """
+    def __init__(self):
+        self._buffer = bytearray()
+        self._scan = 0
+        self._data = []
+
+    def feed(self, chunk):
+        """
+        Ajoute des octets au buffer et retourne la liste des événements complets.
+        """
+        buffer = self._buffer
+        buffer += chunk
+        events = []
+        start = 0
+        while True:
+            end = buffer.find(b"\n", self._scan)
+            if end == -1:
+                break
+            line_end = end - 1 if end > start and buffer[end - 1] == 0x0D else end
+            if line_end == start:
+                # Ligne vide : fin du frame
+                events.extend(self._dispatch())
+            elif buffer.startswith(b"data:", start):
+                value_start = start + 5
+                if value_start < line_end and buffer[value_start] == 0x20:
+                    value_start += 1
+                self._data.append(bytes(memoryview(buffer)[value_start:line_end]))
+            start = end + 1
+            self._scan = start
+        if start:
+            del buffer[:start]
+            self._scan -= start
+        return events
+
+    def close(self):
+        """
+        Vide le dernier frame si le flux se termine sans ligne vide.
+        """
+        if self._buffer.startswith(b"data:"):
+            self.feed(b"\n")
+        return self._dispatch()
+
+    def _dispatch(self):
+        if not self._data:
+            return []
+        payload = b"\n".join(self._data)
+        self._data = []
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            return [ErrorEvent({"error": f"Invalid stream frame: {payload[:200]!r}"})]
+        if not isinstance(data, dict):
+            return [StatusEvent({"data": data})]
+        return events_from_frame(data)
+
+
+class StreamMetrics:
+    """
+    Mesures d'un flux : temps jusqu'au premier token et débit. Chaque TextDeltaEvent compte pour un token.
+    """
+    def __init__(self, started_at=None):
+        self.started_at = started_at if started_at is not None else time.perf_counter()
+        self.first_token_at = None
+        self.finished_at = None
+        self.tokens = 0
+        self.characters = 0
+
+    def record(self, event):
+        if isinstance(event, TextDeltaEvent):
+            if self.first_token_at is None:
+                self.first_token_at = time.perf_counter()
+            self.tokens += 1
+            self.characters += len(event.text)
+
+    def finish(self):
+        if self.finished_at is None:
+            self.finished_at = time.perf_counter()
+
+    @property
+    def time_to_first_token(self):
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    @property
+    def tokens_per_second(self):
+        if self.first_token_at is None:
+            return None
+        end = self.finished_at if self.finished_at is not None else time.perf_counter()
+        elapsed = end - self.first_token_at
+        # Le premier token démarre la mesure, le débit porte sur les suivants
+        if elapsed <= 0 or self.tokens < 2:
+            return None
+        return (self.tokens - 1) / elapsed
+
+    def as_dict(self):
+        return {
+            "time_to_first_token": self.time_to_first_token,
+            "tokens_per_second": self.tokens_per_second,
+            "tokens": self.tokens,
+            "characters": self.characters
+        }
+
+
+# Fin du flux dans les buffers d'événements
+_END = object()
+
+
+def idle_timeout_event(idle_timeout):
+    return ErrorEvent({"type": "abort", "error": f"Stream idle for more than {idle_timeout}s"})
+
+
+def slow_consumer_event(stall_timeout):
+    return ErrorEvent({"type": "abort", "error": f"Stream cancelled: consumer stalled for more than {stall_timeout}s"})
+
+
+class _EventBuffer:
+    """
+    File bornée entre le thread qui lit la réponse et le consommateur. `finish` ajoute les derniers
+    événements sans tenir compte de la borne pour que le consommateur voie toujours la fin du flux.
+    """
+    def __init__(self, size):
+        self.size = size
+        self._items = deque()
+        self._done = False
+        self._condition = threading.Condition()
+
+    def put(self, event, timeout):
+        """
+        Retourne False si le consommateur n'a pas libéré de place avant `timeout` (ou a abandonné le flux).
+        """
+        with self._condition:
+            if not self._condition.wait_for(lambda: len(self._items) < self.size or self._done, timeout):
+                return False
+            if self._done:
+                return False
+            self._items.append(event)
+            self._condition.notify_all()
+            return True
+
+    def finish(self, events=()):
+        with self._condition:
+            if not self._done:
+                self._items.extend(events)
+                self._done = True
+            self._condition.notify_all()
+
+    def get(self):
+        with self._condition:
+            self._condition.wait_for(lambda: self._items or self._done)
+            if not self._items:
+                return _END
+            event = self._items.popleft()
+            self._condition.notify_all()
+            return event
+
+
+class ChatEventStream:
+    """
+    Poignée sur une réponse stream-chat de requests : itérateur d'événements typés, fermé à la fin du flux,
+    à la sortie d'un bloc `with`, par close() ou par cancel() (la connexion est coupée, ce qui arrête
+    la génération côté serveur).
+
+    :param idle_timeout: Délai maximal entre deux morceaux (appliqué comme timeout de lecture par le service) ;
+                         au-delà, le flux se termine par un ErrorEvent.
+    :param buffer_size: Si donné, un thread lit la réponse dans un buffer d'au plus `buffer_size` événements.
+    :param stall_timeout: Avec buffer_size, délai pendant lequel le buffer peut rester plein avant
+                          l'annulation du flux (None : le lecteur attend le consommateur).
+    """
+    def __init__(self, response, started_at=None, chunk_size=None, idle_timeout=None, buffer_size=None, stall_timeout=None):
+        self.response = response
+        self.status_code = response.status_code
+        self.metrics = StreamMetrics(started_at)
+        self.chunk_size = chunk_size
+        self.idle_timeout = idle_timeout
+        self.buffer_size = buffer_size
+        self.stall_timeout = stall_timeout
+        self.cancelled = False
+        self.timed_out = False
+        self.closed = False
+        self._close_lock = threading.Lock()
+
+    def __iter__(self):
+        events = self._iter_buffered() if self.buffer_size else self._read_events()
+        for event in events:
+            self.metrics.record(event)
+            yield event
+
+    def _read_events(self):
+        parser = SSEParser()
+        try:
+            for chunk in self.response.iter_content(chunk_size=self.chunk_size):
+                yield from parser.feed(chunk)
+            yield from parser.close()
+        except requests.exceptions.ConnectionError as error:
+            if self.cancelled:
+                return
+            if not (error.args and isinstance(error.args[0], ReadTimeoutError)):
+                raise
+            self.timed_out = True
+            yield idle_timeout_event(self.idle_timeout)
+        except Exception:
+            # Réponse fermée par cancel() depuis un autre thread pendant une lecture
+            if not self.cancelled:
+                raise
+        finally:
+            self.metrics.finish()
+            self.close()
+
+    def _iter_buffered(self):
+        buffer = _EventBuffer(self.buffer_size)
+
+        def pump():
+            final = []
+            try:
+                for event in self._read_events():
+                    if not buffer.put(event, self.stall_timeout):
+                        if not self.cancelled:
+                            final.append(slow_consumer_event(self.stall_timeout))
+                        self.cancel()
+                        break
+            except Exception as error:
+                final.append(ErrorEvent({"type": "abort", "error": f"Stream failed: {error}"}))
+            finally:
+                buffer.finish(final)
+
+        threading.Thread(target=pump, name="chat-event-stream", daemon=True).start()
+        try:
+            while True:
+                event = buffer.get()
+                if event is _END:
+                    return
+                yield event
+        finally:
+            # Consommateur parti avant la fin : le lecteur s'arrête et la connexion est coupée
+            buffer.finish()
+            self.cancel()
+
+    def close(self):
+        """
+        Ferme la réponse (sans effet si elle est déjà fermée).
+        """
+        with self._close_lock:
+            if self.closed:
+                return
+            self.closed = True
+        self.metrics.finish()
+        self.response.close()
+
+    def cancel(self):
+        """
+        Abandonne le flux : la connexion est coupée et l'itération s'arrête sans erreur.
+        """
+        if not self.closed:
+            self.cancelled = True
+        self.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cancel()
+
+    def text(self):
+        """
+        Consomme le flux et retourne la réponse texte complète.
+        """
+        return "".join(event.text for event in self if isinstance(event, TextDeltaEvent))
+
+
+class _AsyncEventBuffer:
+    """
+    Équivalent asyncio de _EventBuffer.
+    """
+    def __init__(self, size):
+        self.size = size
+        self._items = deque()
+        self._done = False
+        self._condition = asyncio.Condition()
+
+    async def put(self, event, timeout):
+        async with self._condition:
+            try:
+                await asyncio.wait_for(self._condition.wait_for(lambda: len(self._items) < self.size or self._done), timeout)
+            except asyncio.TimeoutError:
+                return False
+            if self._done:
+                return False
+            self._items.append(event)
+            self._condition.notify_all()
+            return True
+
+    async def finish(self, events=()):
+        async with self._condition:
+            if not self._done:
+                self._items.extend(events)
+                self._done = True
+            self._condition.notify_all()
+
+    async def get(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self._items or self._done)
+            if not self._items:
+                return _END
+            event = self._items.popleft()
+            self._condition.notify_all()
+            return event
+
+
+class AsyncChatEventStream:
+    """
+    Équivalent async de ChatEventStream sur une réponse httpx ouverte par AsyncHttpTransport :
+    `async with`, aclose() et cancel() libèrent la connexion et la place de concurrence.
+    L'idle_timeout s'applique à l'attente de chaque morceau ; avec buffer_size, une tâche lit la
+    réponse dans un buffer borné (mêmes paramètres que ChatEventStream).
+    """
+    def __init__(self, response, transport, started_at=None, idle_timeout=None, buffer_size=None, stall_timeout=None):
+        self.response = response
+        self.transport = transport
+        self.status_code = response.status_code
+        self.metrics = StreamMetrics(started_at)
+        self.idle_timeout = idle_timeout
+        self.buffer_size = buffer_size
+        self.stall_timeout = stall_timeout
+        self.cancelled = False
+        self.timed_out = False
+        self.closed = False
+        self._reader = None
+
+    async def __aiter__(self):
+        events = self._iter_buffered() if self.buffer_size else self._read_events()
+        try:
+            async for event in events:
+                self.metrics.record(event)
+                yield event
+        finally:
+            await events.aclose()
+
+    async def _read_events(self):
+        parser = SSEParser()
+        chunks = self.response.aiter_bytes().__aiter__()
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), self.idle_timeout)
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    self.timed_out = True
+                    yield idle_timeout_event(self.idle_timeout)
+                    return
+                for event in parser.feed(chunk):
+                    yield event
+            for event in parser.close():
+                yield event
+        except Exception:
+            # Réponse fermée par cancel() pendant une lecture
+            if not self.cancelled:
+                raise
+        finally:
+            await self.aclose()
+
+    async def _iter_buffered(self):
+        buffer = _AsyncEventBuffer(self.buffer_size)
+
+        async def pump():
+            final = []
+            events = self._read_events()
+            try:
+                async for event in events:
+                    if not await buffer.put(event, self.stall_timeout):
+                        if not self.cancelled:
+                            final.append(slow_consumer_event(self.stall_timeout))
+                        self.cancelled = True
+                        break
+            except Exception as error:
+                final.append(ErrorEvent({"type": "abort", "error": f"Stream failed: {error}"}))
+            finally:
+                await events.aclose()
+                await buffer.finish(final)
+
+        self._reader = asyncio.ensure_future(pump())
+        try:
+            while True:
+                event = await buffer.get()
+                if event is _END:
+                    return
+                yield event
+        finally:
+            await buffer.finish()
+            await self.cancel()
+
+    async def aclose(self):
+        """
+        Ferme la réponse et libère la place de concurrence (sans effet si c'est déjà fait).
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self.metrics.finish()
+        await self.transport.close_stream(self.response)
+
+    async def cancel(self):
+        """
+        Abandonne le flux : la connexion est coupée et l'itération s'arrête sans erreur.
+        """
+        if not self.closed:
+            self.cancelled = True
+        reader = self._reader
+        if reader is not None and not reader.done() and reader is not asyncio.current_task():
+            reader.cancel()
+            await asyncio.gather(reader, return_exceptions=True)
+        await self.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.cancel()
+
+    async def text(self):
+        parts = []
+        async for event in self:
+            if isinstance(event, TextDeltaEvent):
+                parts.append(event.text)
+        return "".join(parts)
@@ -0,0 +1,190 @@
+import asyncio
+from collections import deque
+from .async_services import AsyncWorkspaceService, AsyncWorkspaceThreadService
+from .sse import TextDeltaEvent, slow_consumer_event
+
+
+class MultiplexedEvent:
+    """
+    Événement d'un flux multiplexé, étiqueté par l'identifiant du flux. Chaque flux se termine par un
+    MultiplexedEvent `done` : `status_code` vaut 200 si le flux s'est ouvert, sinon `response` contient l'erreur.
+    """
+    __slots__ = ("stream_id", "event", "done", "status_code", "response", "cancelled")
+
+    def __init__(self, stream_id, event=None, done=False, status_code=200, response=None, cancelled=False):
+        self.stream_id = stream_id
+        self.event = event
+        self.done = done
+        self.status_code = status_code
+        self.response = response
+        self.cancelled = cancelled
+
+    @property
+    def delta(self):
+        return self.event.text if isinstance(self.event, TextDeltaEvent) else None
+
+    def __repr__(self):
+        if self.done:
+            return f"MultiplexedEvent({self.stream_id!r}, done=True, status_code={self.status_code}, cancelled={self.cancelled})"
+        return f"MultiplexedEvent({self.stream_id!r}, {self.event!r})"
+
+
+class _Channel:
+    __slots__ = ("stream_id", "events", "space", "task", "scheduled")
+
+    def __init__(self, stream_id):
+        self.stream_id = stream_id
+        self.events = deque()
+        self.space = asyncio.Event()
+        self.space.set()
+        self.task = None
+        self.scheduled = False
+
+
+class AsyncStreamMultiplexer:
+    """
+    Exécute de nombreux stream-chat sur une seule boucle asyncio et fusionne leurs événements dans un
+    seul itérateur async de MultiplexedEvent.
+
+    Chaque flux a son propre buffer d'au plus `buffer_size` événements : quand il est plein, sa lecture
+    s'arrête (la connexion applique la contre-pression au serveur) sans bloquer les autres flux.
+    L'itérateur sert les flux prêts à tour de rôle, au plus `quantum` événements à la fois, pour qu'un flux
+    rapide ne retarde pas les autres.
+
+    :param max_concurrency: Nombre maximal de flux ouverts simultanément (les suivants attendent leur tour).
+    :param idle_timeout: Délai maximal entre deux morceaux d'un flux (voir AsyncChatEventStream).
+    :param stall_timeout: Délai pendant lequel le buffer d'un flux peut rester plein avant son annulation
+                          (None : le flux attend le consommateur).
+    """
+    def __init__(self, workspace_service=None, thread_service=None, auth_service=None, transport=None,
+                 max_concurrency=64, buffer_size=32, quantum=8, idle_timeout=None, stall_timeout=None):
+        self.workspace_service = workspace_service or AsyncWorkspaceService(auth_service=auth_service, transport=transport)
+        self.thread_service = thread_service or AsyncWorkspaceThreadService(
+            auth_service=auth_service or self.workspace_service.auth_service,
+            transport=transport or self.workspace_service.transport
+        )
+        self.buffer_size = buffer_size
+        self.quantum = quantum
+        self.idle_timeout = idle_timeout
+        self.stall_timeout = stall_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._channels = {}
+        self._ready = deque()
+        self._wakeup = asyncio.Event()
+        self._closed = False
+
+    def add(self, stream_id, open_stream):
+        """
+        Ajoute un flux. `open_stream` est une coroutine function sans argument qui retourne
+        (AsyncChatEventStream, status_code), comme les méthodes stream_chat_* des services async.
+        Peut être appelé pendant l'itération.
+        """
+        if self._closed:
+            raise RuntimeError("Multiplexer is closed")
+        if stream_id in self._channels:
+            raise ValueError(f"Stream {stream_id!r} already exists")
+        channel = _Channel(stream_id)
+        self._channels[stream_id] = channel
+        channel.task = asyncio.ensure_future(self._pump(channel, open_stream))
+        return stream_id
+
+    def add_thread_chat(self, stream_id, slug, thread_slug, message, mode, user_id, token):
+        return self.add(stream_id, lambda: self.thread_service.stream_chat_with_thread(
+            slug, thread_slug, message, mode, user_id, token, idle_timeout=self.idle_timeout
+        ))
+
+    def add_workspace_chat(self, stream_id, slug, chat_data, token):
+        return self.add(stream_id, lambda: self.workspace_service.stream_chat_with_workspace(
+            slug, chat_data, token, idle_timeout=self.idle_timeout
+        ))
+
+    async def cancel(self, stream_id):
+        """
+        Annule un flux : sa connexion est fermée et il se termine par un MultiplexedEvent `done` et `cancelled`.
+        """
+        channel = self._channels.get(stream_id)
+        if channel is None or channel.task.done():
+            return
+        channel.task.cancel()
+        await asyncio.gather(channel.task, return_exceptions=True)
+
+    async def _pump(self, channel, open_stream):
+        final = MultiplexedEvent(channel.stream_id, done=True)
+        try:
+            async with self._semaphore:
+                stream, status_code = await open_stream()
+                if status_code != 200:
+                    final.status_code, final.response = status_code, stream
+                    return
+                async with stream:
+                    async for event in stream:
+                        if not await self._wait_for_space(channel):
+                            self._push(channel, MultiplexedEvent(channel.stream_id, slow_consumer_event(self.stall_timeout)))
+                            final.cancelled = True
+                            return
+                        self._push(channel, MultiplexedEvent(channel.stream_id, event))
+        except asyncio.CancelledError:
+            final.cancelled = True
+        except Exception as error:
+            final.status_code, final.response = 500, {"error": "Stream failed", "details": str(error)}
+        finally:
+            # Le marqueur de fin ignore la borne du buffer pour que le consommateur voie toujours la fin du flux
+            self._push(channel, final)
+
+    async def _wait_for_space(self, channel):
+        while len(channel.events) >= self.buffer_size:
+            channel.space.clear()
+            try:
+                await asyncio.wait_for(channel.space.wait(), self.stall_timeout)
+            except asyncio.TimeoutError:
+                return False
+        return True
+
+    def _push(self, channel, item):
+        channel.events.append(item)
+        if not channel.scheduled:
+            channel.scheduled = True
+            self._ready.append(channel)
+        self._wakeup.set()
+
+    async def __aiter__(self):
+        while not self._closed:
+            if not self._ready:
+                if not self._channels:
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            channel = self._ready.popleft()
+            for _ in range(self.quantum):
+                if not channel.events:
+                    break
+                item = channel.events.popleft()
+                if len(channel.events) < self.buffer_size:
+                    channel.space.set()
+                if item.done:
+                    del self._channels[channel.stream_id]
+                yield item
+            if channel.events:
+                self._ready.append(channel)
+            else:
+                channel.scheduled = False
+
+    async def aclose(self):
+        """
+        Annule tous les flux en cours et termine l'itération.
+        """
+        self._closed = True
+        tasks = [channel.task for channel in self._channels.values() if not channel.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._channels.clear()
+        self._ready.clear()
+        self._wakeup.set()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
@@ -1,144 +1,174 @@
-import requests
+import codecs
+import csv
+import json
 import os
-from dotenv import load_dotenv
-from .authentification import AuthentificationService
-
-class SystemSettingsService:
-    def __init__(self, auth_service=None):
-        load_dotenv()
-        self.auth_service = auth_service or AuthentificationService()
-        self.base_url = os.getenv("BASE_URL")
-        
+from .json_stream import iter_json_items
+from .pipeline import BaseService
+
+EXPORT_TYPES = ("csv", "json", "jsonl", "jsonAlpaca")
+
+
+def _iter_text_lines(chunks):
+    """
+    Lignes (fins de ligne comprises) d'un flux d'octets UTF-8, pour csv.reader qui gère
+    les champs entre guillemets sur plusieurs lignes. Seul "\n" termine une ligne : str.splitlines
+    couperait aussi sur U+2028, U+0085, "\x0c"..., caractères valides dans le texte d'une conversation.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    for chunk in chunks:
+        lines = (pending + decoder.decode(chunk)).split("\n")
+        # La dernière ligne peut continuer dans le morceau suivant
+        pending = lines.pop()
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+def iter_export_records(chunks, export_type):
+    """
+    Décode au fil de l'eau un export de conversations reçu par morceaux d'octets et produit un
+    enregistrement par conversation : dict pour json, jsonAlpaca et jsonl, dict par ligne (en-têtes CSV) pour csv.
+    """
+    if export_type in ("json", "jsonAlpaca"):
+        yield from iter_json_items(chunks, ("*",))
+    elif export_type == "jsonl":
+        for line in _iter_text_lines(chunks):
+            if line.strip():
+                yield json.loads(line)
+    elif export_type == "csv":
+        yield from csv.DictReader(_iter_text_lines(chunks))
+    else:
+        raise ValueError(f"Unsupported export type: {export_type}")
+
+
+def iter_export_file(source, export_type, chunk_size=64 * 1024):
+    """
+    Relit un export enregistré par export_chats_to (chemin ou fichier binaire) enregistrement par enregistrement.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as file:
+            yield from iter_export_records(iter(lambda: file.read(chunk_size), b""), export_type)
+    else:
+        yield from iter_export_records(iter(lambda: source.read(chunk_size), b""), export_type)
+
+
+def _check_export_type(export_type):
+    if export_type not in EXPORT_TYPES:
+        raise ValueError(f"Unsupported export type: {export_type} (expected one of {', '.join(EXPORT_TYPES)})")
+
+
+class SystemSettingsService(BaseService):
+    def __init__(self, auth_service=None, transport=None, upload_index=None, pipeline=None):
+        super().__init__(auth_service, transport, pipeline)
+        # Index d'uploads (UploadIndex) à invalider quand des documents sont supprimés
+        self.upload_index = upload_index
+
     def dump_settings(self, token):
         """
         GET /v1/system/env-dump
         Exporte tous les paramètres actuels vers un fichier de stockage.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/system/env-dump"
-        headers = {"Authorization": f"Bearer {token}"}
-
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        return self._call("GET", "/v1/system/env-dump", token)
 
     def get_system_settings(self, token):
         """
         GET /v1/system
         Récupère tous les paramètres système actuellement définis.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/system"
-        headers = {"Authorization": f"Bearer {token}"}
-
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        return self._call("GET", "/v1/system", token)
 
     def get_vector_count(self, token):
         """
         GET /v1/system/vector-count
         Retourne le nombre de vecteurs dans la base de données de vecteurs connectée.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/system/vector-count"
-        headers = {"Authorization": f"Bearer {token}"}
-
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        return self._call("GET", "/v1/system/vector-count", token)
 
     def update_system_setting(self, update_data, token):
         """
         POST /v1/system/update-env
         Met à jour un paramètre ou une préférence du système.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/system/update-env"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-
-        try:
-            response = requests.post(url, headers=headers, json=update_data)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        return self._call("POST", "/v1/system/update-env", token, json=update_data)
 
     def export_chats(self, export_type, token):
         """
         GET /v1/system/export-chats
         Exporte toutes les conversations du système dans un format spécifique.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
+        return self._call("GET", "/v1/system/export-chats", token, params={"type": export_type})
+
+    def iter_export_chats(self, export_type, token, chunk_size=64 * 1024):
+        """
+        GET /v1/system/export-chats
+        Variante de export_chats décodée au fil de l'eau : retourne un itérateur des conversations
+        exportées (voir iter_export_records) et le code HTTP. La connexion est libérée quand
+        l'itérateur est épuisé ou fermé.
+        """
+        _check_export_type(export_type)
+
+        def decode(response, context):
+            try:
+                yield from iter_export_records(response.iter_content(chunk_size), export_type)
+            finally:
+                response.close()
+
+        return self._call("GET", "/v1/system/export-chats", token, params={"type": export_type}, stream=True, decode=decode)
+
+    def export_chats_to(self, export_type, destination, token, chunk_size=64 * 1024, progress_callback=None):
+        """
+        GET /v1/system/export-chats
+        Écrit l'export tel que reçu, par morceaux de `chunk_size` octets, dans `destination` : un chemin
+        (écrit dans un fichier temporaire renommé à la fin, jamais laissé à moitié écrit) ou un objet
+        fichier binaire. La mémoire utilisée ne dépend pas de la taille de l'export.
+
+        :param progress_callback: Fonction appelée avec le nombre d'octets écrits après chaque morceau.
+        :return: ({"type", "bytes", "path"}, status_code) ; "path" vaut None pour un objet fichier.
+        """
+        _check_export_type(export_type)
+
+        def decode(response, context):
+            try:
+                if isinstance(destination, (str, os.PathLike)):
+                    return self._write_export_file(response, destination, chunk_size, progress_callback, export_type)
+                written = self._write_export(response, destination, chunk_size, progress_callback)
+                return {"type": export_type, "bytes": written, "path": None}
+            finally:
+                response.close()
 
-        url = f"{self.base_url}/v1/system/export-chats"
-        headers = {"Authorization": f"Bearer {token}"}
-        params = {"type": export_type}
+        return self._call("GET", "/v1/system/export-chats", token, params={"type": export_type}, stream=True, decode=decode)
 
+    def _write_export_file(self, response, path, chunk_size, progress_callback, export_type):
+        partial_path = f"{os.fspath(path)}.part"
         try:
-            response = requests.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+            with open(partial_path, "wb") as file:
+                written = self._write_export(response, file, chunk_size, progress_callback)
+            os.replace(partial_path, path)
+        except BaseException:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise
+        return {"type": export_type, "bytes": written, "path": os.fspath(path)}
+
+    @staticmethod
+    def _write_export(response, sink, chunk_size, progress_callback):
+        written = 0
+        for chunk in response.iter_content(chunk_size):
+            sink.write(chunk)
+            written += len(chunk)
+            if progress_callback is not None:
+                progress_callback(written)
+        return written
 
     def remove_documents(self, document_names, token):
         """
         DELETE /v1/system/remove-documents
         Supprime définitivement des documents spécifiques du système.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/system/remove-documents"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-        data = {"names": document_names}
-
-        try:
-            response = requests.delete(url, headers=headers, json=data)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        response, status_code = self._call("DELETE", "/v1/system/remove-documents", token, json={"names": document_names})
+        if self.upload_index is not None and status_code < 400:
+            self.upload_index.invalidate_locations(self.base_url or "", document_names)
+        return response, status_code
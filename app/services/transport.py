@@ -0,0 +1,257 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from .resilience import CircuitOpenError
+
+# Durée de la dernière ouverture de connexion (DNS + TCP + TLS) dans le thread courant
+_connect_timing = threading.local()
+
+
+def _release_all(slots):
+    for slot in reversed(slots):
+        slot.release()
+
+
+def _time_new_connections(pool):
+    """
+    Chronomètre l'ouverture des nouvelles connexions du pool urllib3 (une seule fois par pool).
+    """
+    if getattr(pool, "_timed_connections", False) or not hasattr(pool, "_new_conn"):
+        return
+    new_conn = pool._new_conn
+
+    def timed_new_conn():
+        conn = new_conn()
+        connect = conn.connect
+
+        def timed_connect():
+            started_at = time.perf_counter()
+            try:
+                return connect()
+            finally:
+                _connect_timing.seconds = time.perf_counter() - started_at
+        conn.connect = timed_connect
+        return conn
+    pool._new_conn = timed_new_conn
+    pool._timed_connections = True
+
+
+class PoolStatsAdapter(HTTPAdapter):
+    """
+    Adaptateur HTTP qui compte les connexions réutilisées (hits) ou ouvertes (misses) dans le pool.
+    """
+    def __init__(self, stats, **kwargs):
+        self.stats = stats
+        super().__init__(**kwargs)
+
+    def _get_pool(self, request, verify, cert, proxies):
+        if hasattr(self, "get_connection_with_tls_context"):
+            return self.get_connection_with_tls_context(request, verify, proxies=proxies, cert=cert)
+        return self.get_connection(request.url, proxies)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        try:
+            pool = self._get_pool(request, verify, cert, proxies)
+        except Exception:
+            # Laisser l'adaptateur remonter l'erreur (URL invalide, proxy...) normalement
+            pool = None
+        before = pool.num_connections if pool is not None else 0
+        if pool is not None:
+            _time_new_connections(pool)
+        try:
+            return super().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+        finally:
+            if pool is not None:
+                self.stats.record(reused=pool.num_connections == before)
+
+
+class PoolStats:
+    """
+    Compteurs thread-safe de réutilisation des connexions.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record(self, reused):
+        with self._lock:
+            if reused:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+
+class HttpTransport:
+    """
+    Transport HTTP partagé entre les services : session keep-alive avec pool de connexions par hôte.
+
+    :param pool_connections: Nombre de pools (hôtes) conservés en cache.
+    :param pool_maxsize: Nombre maximal de connexions gardées ouvertes par hôte.
+    :param timeout: Timeout par défaut, en secondes ou tuple (connexion, lecture).
+    :param pool_block: Si True, attend qu'une connexion se libère au lieu d'en ouvrir une en plus.
+    :param retry_policy: RetryPolicy appliquée à chaque requête (None pour ne jamais rejouer).
+    :param circuit_breaker: CircuitBreaker par hôte (None pour le désactiver).
+    :param rate_limiter: RateLimiter par famille d'endpoints et par token (None pour ne pas limiter).
+    :param scheduler: RequestScheduler qui ordonne les requêtes par priorité (None pour l'ordre d'arrivée).
+    :param instrumentation: Instrumentation qui reçoit les mesures de chaque requête (None pour ne rien mesurer).
+    """
+    def __init__(self, pool_connections=10, pool_maxsize=10, timeout=(5, 120), pool_block=False,
+                 retry_policy=None, circuit_breaker=None, rate_limiter=None, scheduler=None, instrumentation=None):
+        self.timeout = timeout
+        self.retry_policy = retry_policy
+        self.circuit_breaker = circuit_breaker
+        self.rate_limiter = rate_limiter
+        self.scheduler = scheduler
+        self.instrumentation = instrumentation
+        self.retries = 0
+        self.stats = PoolStats()
+        self.session = requests.Session()
+        adapter = PoolStatsAdapter(
+            self.stats,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @property
+    def pool_hits(self):
+        return self.stats.hits
+
+    @property
+    def pool_misses(self):
+        return self.stats.misses
+
+    def add_response_hook(self, hook):
+        """
+        Enregistre un hook appelé avec chaque réponse reçue par la session (une seule fois par hook).
+        """
+        hooks = self.session.hooks["response"]
+        if hook not in hooks:
+            hooks.append(hook)
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        if all(option is None for option in (self.retry_policy, self.circuit_breaker, self.rate_limiter, self.scheduler)):
+            return self._session_request(method, url, **kwargs)
+
+        attempt = 1
+        while True:
+            try:
+                response = self._send(method, url, **kwargs)
+            except CircuitOpenError:
+                raise
+            except requests.exceptions.RequestException as e:
+                if self.retry_policy is None:
+                    raise
+                connect_error = isinstance(e, requests.exceptions.ConnectTimeout)
+                delay = self.retry_policy.delay_for_error(attempt, method, connect_error=connect_error)
+                if delay is None:
+                    raise
+            else:
+                delay = self.retry_policy.delay_for_response(attempt, method, response) if self.retry_policy else None
+                if delay is None:
+                    return response
+                response.close()
+            self.retries += 1
+            if self.instrumentation is not None:
+                self.instrumentation.record_retry(method, url, attempt, delay)
+            attempt += 1
+            time.sleep(delay)
+
+    def _send(self, method, url, **kwargs):
+        slots = []
+        try:
+            if self.rate_limiter is not None:
+                slots.append(self.rate_limiter.acquire(url, kwargs.get("headers")))
+            if self.scheduler is not None:
+                slots.append(self.scheduler.acquire(url))
+            response = self._send_checked(method, url, **kwargs)
+        except BaseException:
+            _release_all(slots)
+            raise
+        if kwargs.get("stream") and slots:
+            # Réponse lue en flux : les places restent occupées jusqu'à la fermeture de la réponse
+            close = response.close
+
+            def release_on_close():
+                try:
+                    close()
+                finally:
+                    _release_all(slots)
+            response.close = release_on_close
+        else:
+            _release_all(slots)
+        return response
+
+    def _send_checked(self, method, url, **kwargs):
+        if self.circuit_breaker is None:
+            return self._session_request(method, url, **kwargs)
+        host = self.circuit_breaker.host_of(url)
+        probe = self.circuit_breaker.before_request(host)
+        try:
+            response = self._session_request(method, url, **kwargs)
+        except requests.exceptions.RequestException:
+            self.circuit_breaker.record_failure(host)
+            raise
+        except BaseException:
+            # Interruption ou erreur inattendue : l'essai ne doit pas laisser le circuit bloqué
+            if probe:
+                self.circuit_breaker.release_probe(host)
+            raise
+        self.circuit_breaker.record_response(host, response.status_code)
+        return response
+
+    def _session_request(self, method, url, **kwargs):
+        instrumentation = self.instrumentation
+        if instrumentation is None:
+            return self.session.request(method, url, **kwargs)
+        _connect_timing.seconds = None
+        started_at = time.perf_counter()
+        try:
+            response = self.session.request(method, url, **kwargs)
+        except requests.exceptions.RequestException as e:
+            instrumentation.record_request(
+                method, url, time.perf_counter() - started_at, error=str(e), connect=_connect_timing.seconds
+            )
+            raise
+        duration = time.perf_counter() - started_at
+        # elapsed : de l'envoi à la réception des en-têtes ; sans stream, le corps est déjà téléchargé
+        ttfb = response.elapsed.total_seconds()
+        stream = kwargs.get("stream", False)
+        instrumentation.record_request(
+            method, url, duration,
+            status_code=response.status_code,
+            connect=_connect_timing.seconds,
+            ttfb=ttfb,
+            download=None if stream else max(0.0, duration - ttfb),
+            bytes_sent=int(response.request.headers.get("Content-Length") or 0),
+            bytes_received=int(response.headers.get("Content-Length") or 0) if stream else len(response.content)
+        )
+        return instrumentation.instrument_decode(method, url, response)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
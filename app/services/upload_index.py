@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class UploadIndex:
+    """
+    Index local persistant (SQLite) : empreinte du contenu -> réponse d'upload du serveur.
+    Permet de ne pas ré-uploader un fichier ou un texte déjà parsé par la même instance.
+
+    :param path: Fichier SQLite (UPLOAD_INDEX_PATH par défaut, ":memory:" pour un index non persistant).
+    """
+    def __init__(self, path=None):
+        self.path = path or os.getenv("UPLOAD_INDEX_PATH", ".upload_index.sqlite3")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS uploads ("
+                "scope TEXT NOT NULL, content_hash TEXT NOT NULL, source TEXT, response TEXT NOT NULL, "
+                "created_at REAL NOT NULL, PRIMARY KEY (scope, content_hash))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS upload_locations ("
+                "scope TEXT NOT NULL, content_hash TEXT NOT NULL, location TEXT NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_upload_locations ON upload_locations (scope, location)")
+
+    @staticmethod
+    def hash_file(file_path, chunk_size=1024 * 1024):
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(chunk_size), b""):
+                digest.update(chunk)
+        return f"file:{digest.hexdigest()}"
+
+    @staticmethod
+    def hash_text(text_content, metadata=None):
+        digest = hashlib.sha256(text_content.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(json.dumps(metadata or {}, sort_keys=True).encode("utf-8"))
+        return f"text:{digest.hexdigest()}"
+
+    @staticmethod
+    def locations_of(response):
+        documents = response.get("documents") if isinstance(response, dict) else None
+        return [doc["location"] for doc in documents or [] if isinstance(doc, dict) and doc.get("location")]
+
+    def get(self, scope, content_hash):
+        """
+        Retourne la réponse d'upload enregistrée pour ce contenu, ou None.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response FROM uploads WHERE scope = ? AND content_hash = ?", (scope, content_hash)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, scope, content_hash, response, source=None):
+        locations = self.locations_of(response)
+        # Sans emplacement de document, la réponse ne permet pas de retrouver le document côté serveur
+        if not locations:
+            return
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO uploads (scope, content_hash, source, response, created_at) VALUES (?, ?, ?, ?, ?)",
+                (scope, content_hash, source, json.dumps(response), time.time())
+            )
+            self._conn.execute("DELETE FROM upload_locations WHERE scope = ? AND content_hash = ?", (scope, content_hash))
+            self._conn.executemany(
+                "INSERT INTO upload_locations (scope, content_hash, location) VALUES (?, ?, ?)",
+                [(scope, content_hash, location) for location in locations]
+            )
+
+    def invalidate(self, scope, content_hash):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM uploads WHERE scope = ? AND content_hash = ?", (scope, content_hash))
+            self._conn.execute("DELETE FROM upload_locations WHERE scope = ? AND content_hash = ?", (scope, content_hash))
+
+    def invalidate_locations(self, scope, locations):
+        """
+        Oublie les contenus dont un document a été supprimé ou déplacé côté serveur.
+        Retourne le nombre d'entrées supprimées.
+        """
+        removed = 0
+        with self._lock, self._conn:
+            for location in locations:
+                hashes = [row[0] for row in self._conn.execute(
+                    "SELECT content_hash FROM upload_locations WHERE scope = ? AND location = ?", (scope, location)
+                )]
+                for content_hash in hashes:
+                    removed += self._conn.execute(
+                        "DELETE FROM uploads WHERE scope = ? AND content_hash = ?", (scope, content_hash)
+                    ).rowcount
+                    self._conn.execute(
+                        "DELETE FROM upload_locations WHERE scope = ? AND content_hash = ?", (scope, content_hash)
+                    )
+        return removed
+
+    def clear(self, scope=None):
+        with self._lock, self._conn:
+            if scope is None:
+                self._conn.execute("DELETE FROM uploads")
+                self._conn.execute("DELETE FROM upload_locations")
+            else:
+                self._conn.execute("DELETE FROM uploads WHERE scope = ?", (scope,))
+                self._conn.execute("DELETE FROM upload_locations WHERE scope = ?", (scope,))
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM uploads").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,188 @@
+import json
+import os
+import numpy as np
+
+
+class VectorIndex:
+    """
+    Index vectoriel en mémoire pour la recherche locale par similarité (cosinus ou produit scalaire).
+    Les vecteurs sont stockés dans une matrice float32 contiguë ; la recherche top-k est vectorisée.
+
+    :param dim: Dimension des vecteurs (déduite du premier ajout si None).
+    :param metric: "cosine" (vecteurs normalisés à l'ajout) ou "dot".
+    """
+    def __init__(self, dim=None, metric="cosine", initial_capacity=1024):
+        if metric not in ("cosine", "dot"):
+            raise ValueError(f"Unknown metric: {metric}")
+        self.dim = dim
+        self.metric = metric
+        self._initial_capacity = initial_capacity
+        self._vectors = np.empty((0, dim or 0), dtype=np.float32)
+        self._size = 0
+        self._ids = []
+        self._rows = {}
+
+    def __len__(self):
+        return self._size
+
+    def __contains__(self, id_):
+        return id_ in self._rows
+
+    @property
+    def ids(self):
+        return list(self._ids)
+
+    @property
+    def vectors(self):
+        return self._vectors[:self._size]
+
+    def _prepare(self, vectors, infer_dim=False):
+        # Seul un ajout non vide fixe la dimension de l'index ; une requête est seulement vérifiée
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim == 1:
+            vectors = vectors.reshape(1, -1)
+        if vectors.shape[0] == 0:
+            return vectors.reshape(0, self.dim or 0)
+        if self.dim is None and infer_dim:
+            self.dim = vectors.shape[1]
+        if self.dim is not None and vectors.shape[1] != self.dim:
+            raise ValueError(f"Expected vectors of dimension {self.dim}, got {vectors.shape[1]}")
+        if self.metric == "cosine":
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            vectors = vectors / norms
+        return vectors
+
+    def _reserve(self, extra):
+        needed = self._size + extra
+        # Un index chargé par mmap est en lecture seule : il est copié en mémoire à la première modification
+        if needed <= self._vectors.shape[0] and self._vectors.flags.writeable and self._vectors.shape[1] == self.dim:
+            return
+        capacity = max(needed, self._vectors.shape[0] * 2, self._initial_capacity)
+        grown = np.empty((capacity, self.dim), dtype=np.float32)
+        if self._size:
+            grown[:self._size] = self._vectors[:self._size]
+        self._vectors = grown
+
+    def add(self, ids, vectors):
+        """
+        Ajoute (ou remplace) des vecteurs associés à des identifiants.
+        """
+        ids = list(ids)
+        vectors = self._prepare(vectors, infer_dim=True)
+        if len(ids) != vectors.shape[0]:
+            raise ValueError(f"{len(ids)} ids for {vectors.shape[0]} vectors")
+        if not ids:
+            return
+
+        replaced = [(i, self._rows[id_]) for i, id_ in enumerate(ids) if id_ in self._rows]
+        if replaced:
+            self._reserve(0)
+            for i, row in replaced:
+                self._vectors[row] = vectors[i]
+            replaced_positions = {i for i, _ in replaced}
+            keep = [i for i in range(len(ids)) if i not in replaced_positions]
+            ids = [ids[i] for i in keep]
+            vectors = vectors[keep]
+
+        # Dédoublonner les ids du lot lui-même : le dernier vecteur l'emporte
+        last = {id_: i for i, id_ in enumerate(ids)}
+        if len(last) != len(ids):
+            keep = sorted(last.values())
+            ids = [ids[i] for i in keep]
+            vectors = vectors[keep]
+
+        self._reserve(len(ids))
+        start = self._size
+        self._vectors[start:start + len(ids)] = vectors
+        for offset, id_ in enumerate(ids):
+            self._rows[id_] = start + offset
+        self._ids.extend(ids)
+        self._size += len(ids)
+
+    def add_embeddings(self, response, ids=None):
+        """
+        Ajoute le résultat de OpenAICompatibleService.get_embeddings (JSON ou as_numpy=True).
+        Sans `ids`, les index de la réponse sont utilisés comme identifiants.
+        """
+        if "embeddings" in response:
+            vectors = response["embeddings"]
+            default_ids = response.get("ids") or range(len(vectors))
+        else:
+            data = sorted(response.get("data") or [], key=lambda item: item.get("index", 0))
+            vectors = [item["embedding"] for item in data]
+            default_ids = [item.get("index", i) for i, item in enumerate(data)]
+        self.add(ids if ids is not None else default_ids, vectors)
+
+    def remove(self, ids):
+        """
+        Supprime des vecteurs : la dernière ligne prend la place de la ligne supprimée.
+        Retourne le nombre de vecteurs supprimés.
+        """
+        removed = 0
+        for id_ in ids:
+            row = self._rows.pop(id_, None)
+            if row is None:
+                continue
+            self._reserve(0)
+            last = self._size - 1
+            if row != last:
+                moved_id = self._ids[last]
+                self._vectors[row] = self._vectors[last]
+                self._ids[row] = moved_id
+                self._rows[moved_id] = row
+            self._ids.pop()
+            self._size -= 1
+            removed += 1
+        return removed
+
+    def search(self, query, k=10):
+        """
+        Retourne les k plus proches voisins [(id, score), ...] ; pour une matrice de requêtes,
+        une liste de résultats par requête.
+        """
+        single = np.asarray(query).ndim == 1
+        queries = self._prepare(query)
+        if self._size == 0:
+            return [] if single else [[] for _ in range(queries.shape[0])]
+
+        scores = queries @ self.vectors.T
+        k = min(k, self._size)
+        if k < self._size:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(self._size), (queries.shape[0], self._size))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        results = [
+            [(self._ids[row], float(score)) for row, score in zip(rows, row_scores)]
+            for rows, row_scores in zip(top, top_scores)
+        ]
+        return results[0] if single else results
+
+    def save(self, directory):
+        """
+        Enregistre l'index dans `directory` (vectors.npy + ids.json).
+        """
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "vectors.npy"), self.vectors)
+        with open(os.path.join(directory, "ids.json"), "w", encoding="utf-8") as f:
+            json.dump({"dim": self.dim, "metric": self.metric, "ids": self._ids}, f)
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """
+        Charge un index enregistré ; avec mmap=True les vecteurs sont lus à la demande depuis le fichier.
+        """
+        with open(os.path.join(directory, "ids.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        index = cls(dim=meta["dim"], metric=meta["metric"])
+        vectors = np.load(os.path.join(directory, "vectors.npy"), mmap_mode="r" if mmap else None)
+        index._vectors = vectors
+        index._size = vectors.shape[0]
+        index._ids = meta["ids"]
+        index._rows = {id_: row for row, id_ in enumerate(index._ids)}
+        return index
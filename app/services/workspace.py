@@ -1,221 +1,117 @@
-import requests
-import os
-from dotenv import load_dotenv
-from .authentification import AuthentificationService
+from .json_stream import iter_response_items
+from .pipeline import BaseService
+from .sse import ChatEventStream
 
-class WorkspaceService:
-    def __init__(self, auth_service=None):
-        load_dotenv()
-        self.auth_service = auth_service or AuthentificationService()
-        self.base_url = os.getenv("BASE_URL")
 
+def _event_stream(response, context):
+    return ChatEventStream(response, started_at=context.started_at)
+
+
+def _stream_options(transport, idle_timeout=None, buffer_size=None, stall_timeout=None):
+    """
+    Options de _call pour un flux stream-chat : l'idle_timeout remplace le timeout de lecture du transport.
+    """
+    if idle_timeout is None and buffer_size is None:
+        return {"stream": True, "decode": _event_stream}
+
+    def decode(response, context):
+        return ChatEventStream(
+            response, started_at=context.started_at, idle_timeout=idle_timeout,
+            buffer_size=buffer_size, stall_timeout=stall_timeout
+        )
+
+    options = {"stream": True, "decode": decode}
+    if idle_timeout is not None:
+        timeout = getattr(transport, "timeout", None)
+        options["timeout"] = (timeout[0] if isinstance(timeout, tuple) else timeout, idle_timeout)
+    return options
+
+
+class WorkspaceService(BaseService):
     def create_workspace(self, name, token):
         """
         POST /v1/workspace/new
         Create a new workspace with the specified name.
         """
-        auth_response, status_code = self.auth_service.auth(token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/workspace/new"
-        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-        data = {"name": name}
-
-        try:
-            response = requests.post(url, headers=headers, json=data)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        return self._call("POST", "/v1/workspace/new", token, json={"name": name})
 
     def list_workspaces(self, token):
         """
         GET /v1/workspaces
         List all current workspaces.
         """
-        auth_response, status_code = self.auth_service.auth(token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/workspaces"
-        headers = {"Authorization": f"Bearer {token}"}
-
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        return self._call("GET", "/v1/workspaces", token)
 
     def get_workspace_by_slug(self, slug, token):
         """
         GET /v1/workspace/{slug}
         Retrieve a workspace by its unique slug.
         """
-        auth_response, status_code = self.auth_service.auth(token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/workspace/{slug}"
-        headers = {"Authorization": f"Bearer {token}"}
-
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        return self._call("GET", f"/v1/workspace/{slug}", token)
 
     def delete_workspace(self, slug, token):
         """
         DELETE /v1/workspace/{slug}
         Delete a workspace by its unique slug.
         """
-        auth_response, status_code = self.auth_service.auth(token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/workspace/{slug}"
-        headers = {"Authorization": f"Bearer {token}"}
-
-        try:
-            response = requests.delete(url, headers=headers)
-            response.raise_for_status()
-            return {"message": "Workspace deleted successfully"}, response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        return self._call("DELETE", f"/v1/workspace/{slug}", token, success_payload={"message": "Workspace deleted successfully"})
 
     def update_workspace(self, slug, update_data, token):
         """
         POST /v1/workspace/{slug}/update
         Update a workspace's settings by its unique slug.
         """
-        auth_response, status_code = self.auth_service.auth(token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/workspace/{slug}/update"
-        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-
-        try:
-            response = requests.post(url, headers=headers, json=update_data)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        return self._call("POST", f"/v1/workspace/{slug}/update", token, json=update_data)
 
     def get_workspace_chats(self, slug, token):
         """
         GET /v1/workspace/{slug}/chats
         Retrieve chats associated with a specific workspace slug.
         """
-        auth_response, status_code = self.auth_service.auth(token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/workspace/{slug}/chats"
-        headers = {"Authorization": f"Bearer {token}"}
+        return self._call("GET", f"/v1/workspace/{slug}/chats", token)
 
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+    def iter_workspace_chats(self, slug, token, chunk_size=64 * 1024):
+        """
+        GET /v1/workspace/{slug}/chats
+        Same as get_workspace_chats, but decodes the body incrementally and returns an iterator
+        over the chat records ("history" items) with the status code.
+        """
+        return self._call(
+            "GET", f"/v1/workspace/{slug}/chats", token, stream=True,
+            decode=lambda response, context: iter_response_items(response, ("history", "*"), chunk_size)
+        )
 
     def update_workspace_embeddings(self, slug, embeddings_data, token):
         """
         POST /v1/workspace/{slug}/update-embeddings
         Update embeddings by adding or removing documents for a workspace.
         """
-        auth_response, status_code = self.auth_service.auth(token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/workspace/{slug}/update-embeddings"
-        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-
-        try:
-            response = requests.post(url, headers=headers, json=embeddings_data)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        return self._call("POST", f"/v1/workspace/{slug}/update-embeddings", token, json=embeddings_data)
 
     def update_workspace_pin(self, slug, pin_data, token):
         """
         POST /v1/workspace/{slug}/update-pin
         Update pin status for a document in the workspace.
         """
-        auth_response, status_code = self.auth_service.auth(token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/workspace/{slug}/update-pin"
-        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+        return self._call("POST", f"/v1/workspace/{slug}/update-pin", token, json=pin_data)
 
-        try:
-            response = requests.post(url, headers=headers, json=pin_data)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
-
-    def chat_with_workspace(self, slug, chat_data, token):
+    def chat_with_workspace(self, slug, chat_data, token, timeout=None):
         """
         POST /v1/workspace/{slug}/chat
         Execute a chat with the specified workspace.
+        An optional timeout (seconds or (connect, read) tuple) overrides the transport default for this call.
         """
-        auth_response, status_code = self.auth_service.auth(token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/workspace/{slug}/chat"
-        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-
-        try:
-            response = requests.post(url, headers=headers, json=chat_data)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        options = {"timeout": timeout} if timeout is not None else {}
+        return self._call("POST", f"/v1/workspace/{slug}/chat", token, json=chat_data, **options)
 
-    def stream_chat_with_workspace(self, slug, chat_data, token):
+    def stream_chat_with_workspace(self, slug, chat_data, token, idle_timeout=None, buffer_size=None, stall_timeout=None):
         """
         POST /v1/workspace/{slug}/stream-chat
         Execute a streamable chat with the specified workspace.
+        Returns a ChatEventStream yielding typed events (text deltas, sources, close, error).
+        idle_timeout, buffer_size and stall_timeout are passed to the ChatEventStream handle.
         """
-        auth_response, status_code = self.auth_service.auth(token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/workspace/{slug}/stream-chat"
-        headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
-
-        try:
-            response = requests.post(url, headers=headers, json=chat_data, stream=True)
-            response.raise_for_status()
-            return response.iter_lines(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        return self._call(
+            "POST", f"/v1/workspace/{slug}/stream-chat", token, json=chat_data,
+            **_stream_options(self.transport, idle_timeout, buffer_size, stall_timeout)
+        )
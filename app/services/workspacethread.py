@@ -1,160 +1,81 @@
-import requests
-import os
-from dotenv import load_dotenv
-from .authentification import AuthentificationService
+from .json_stream import iter_response_items
+from .pipeline import BaseService
+from .workspace import _stream_options
 
-class WorkspaceThreadService:
-    def __init__(self, auth_service=None):
-        load_dotenv()
-        self.auth_service = auth_service or AuthentificationService()
-        self.base_url = os.getenv("BASE_URL")
 
+class WorkspaceThreadService(BaseService):
     def create_thread(self, slug, user_id, token):
         """
         POST /v1/workspace/{slug}/thread/new
         Crée un nouveau thread dans l'espace de travail.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/workspace/{slug}/thread/new"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
         data = {"userId": user_id} if user_id else {}
-
-        try:
-            response = requests.post(url, headers=headers, json=data)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        return self._call("POST", f"/v1/workspace/{slug}/thread/new", token, json=data)
 
     def update_thread(self, slug, thread_slug, new_name, token):
         """
         POST /v1/workspace/{slug}/thread/{threadSlug}/update
         Met à jour le nom d'un thread dans un espace de travail.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/workspace/{slug}/thread/{thread_slug}/update"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
-        data = {"name": new_name}
-
-        try:
-            response = requests.post(url, headers=headers, json=data)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        return self._call("POST", f"/v1/workspace/{slug}/thread/{thread_slug}/update", token, json={"name": new_name})
 
     def delete_thread(self, slug, thread_slug, token):
         """
         DELETE /v1/workspace/{slug}/thread/{threadSlug}
         Supprime un thread d'un espace de travail.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/workspace/{slug}/thread/{thread_slug}"
-        headers = {"Authorization": f"Bearer {token}"}
-
-        try:
-            response = requests.delete(url, headers=headers)
-            response.raise_for_status()
-            return {"message": "Thread deleted successfully"}, response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        return self._call(
+            "DELETE", f"/v1/workspace/{slug}/thread/{thread_slug}", token,
+            success_payload={"message": "Thread deleted successfully"}
+        )
 
     def get_thread_chats(self, slug, thread_slug, token):
         """
         GET /v1/workspace/{slug}/thread/{threadSlug}/chats
         Récupère les chats d'un thread dans un espace de travail.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
+        return self._call("GET", f"/v1/workspace/{slug}/thread/{thread_slug}/chats", token)
 
-        url = f"{self.base_url}/v1/workspace/{slug}/thread/{thread_slug}/chats"
-        headers = {"Authorization": f"Bearer {token}"}
-
-        try:
-            response = requests.get(url, headers=headers)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+    def iter_thread_chats(self, slug, thread_slug, token, chunk_size=64 * 1024):
+        """
+        GET /v1/workspace/{slug}/thread/{threadSlug}/chats
+        Variante de get_thread_chats décodée au fil de l'eau : retourne un itérateur des messages
+        ("history") et le code HTTP.
+        """
+        return self._call(
+            "GET", f"/v1/workspace/{slug}/thread/{thread_slug}/chats", token, stream=True,
+            decode=lambda response, context: iter_response_items(response, ("history", "*"), chunk_size)
+        )
 
     def chat_with_thread(self, slug, thread_slug, message, mode, user_id, token):
         """
         POST /v1/workspace/{slug}/thread/{threadSlug}/chat
         Envoie un message pour converser avec un thread dans un espace de travail.
         """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
-
-        url = f"{self.base_url}/v1/workspace/{slug}/thread/{thread_slug}/chat"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
         data = {
             "message": message,
             "mode": mode,
             "userId": user_id
         }
+        return self._call("POST", f"/v1/workspace/{slug}/thread/{thread_slug}/chat", token, json=data)
 
-        try:
-            response = requests.post(url, headers=headers, json=data)
-            response.raise_for_status()
-            return response.json(), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
-
-    def stream_chat_with_thread(self, slug, thread_slug, message, mode, user_id, token):
+    def stream_chat_with_thread(self, slug, thread_slug, message, mode, user_id, token,
+                                idle_timeout=None, buffer_size=None, stall_timeout=None):
         """
         POST /v1/workspace/{slug}/thread/{threadSlug}/stream-chat
         Envoie un message en mode chat en continu avec un thread dans un espace de travail.
-        """
-        auth_response, status_code = self.auth_service.auth(Authorization=token)
-        if status_code != 200:
-            return {"error": "Authentication failed", "details": auth_response}, status_code
+        Retourne un ChatEventStream qui produit des événements typés (texte, sources, fin, erreur).
 
-        url = f"{self.base_url}/v1/workspace/{slug}/thread/{thread_slug}/stream-chat"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json"
-        }
+        :param idle_timeout: Délai maximal entre deux morceaux du flux, en secondes.
+        :param buffer_size: Taille du buffer d'événements (voir ChatEventStream).
+        :param stall_timeout: Délai accordé à un consommateur lent avant l'annulation du flux.
+        """
         data = {
             "message": message,
             "mode": mode,
             "userId": user_id
         }
-
-        try:
-            response = requests.post(url, headers=headers, json=data, stream=True)
-            response.raise_for_status()
-            return response.iter_lines(decode_unicode=True), response.status_code
-        except requests.exceptions.HTTPError as http_err:
-            return {"error": "HTTP error occurred", "details": str(http_err)}, response.status_code
-        except requests.exceptions.RequestException as req_err:
-            return {"error": "Request exception occurred", "details": str(req_err)}, 500
+        return self._call(
+            "POST", f"/v1/workspace/{slug}/thread/{thread_slug}/stream-chat", token,
+            json=data, **_stream_options(self.transport, idle_timeout, buffer_size, stall_timeout)
+        )
@@ -0,0 +1,79 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# app/test/local_server.py
+
+
+class RouteHandler(BaseHTTPRequestHandler):
+    """
+    Base des handlers des serveurs de test : HTTP/1.1 (connexions persistantes), journal désactivé
+    et aides pour lire la requête et écrire la réponse. Chaque fichier de test n'écrit que ses routes.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def read_body(self):
+        return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+    def send_body(self, body, status=200, content_type="application/json", headers=None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, payload, status=200, headers=None):
+        self.send_body(json.dumps(payload).encode(), status, headers=headers)
+
+    def start_chunked(self, content_type="text/event-stream"):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def send_chunk(self, data):
+        # Un chunk HTTP par appel, envoyé immédiatement (comme le serveur SSE d'AnythingLLM)
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def end_chunked(self):
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalServerMixin:
+    """
+    Démarre un ThreadingHTTPServer local pour la classe de test (setUpClass) et l'arrête à la fin.
+    `cls.server` est le serveur (état partagé avec le handler via self.server), `cls.base_url` son URL.
+
+    handler: sous-classe de RouteHandler.
+    base_path: préfixe ajouté à base_url ("/api" pour les services, "" pour les tests du transport).
+    """
+    handler = None
+    base_path = "/api"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), cls.handler)
+        # Les requêtes abandonnées par un test (annulation, timeout) ne bloquent pas l'arrêt du serveur
+        cls.server.block_on_close = False
+        cls.configure_server(cls.server)
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_address[1]}{cls.base_path}"
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def configure_server(cls, server):
+        """
+        Initialise l'état partagé du serveur (liste d'appels, verrou...).
+        """
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
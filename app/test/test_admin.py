@@ -14,7 +14,7 @@ class TestAdminService(unittest.TestCase):
         cls.token = os.getenv("TOKEN")
         cls.id_user = None
 
-    @patch('requests.request')
+    @patch('requests.Session.request')
     def test_handle_request_successful(self, mock_request):
         mock_response = Mock()
         mock_response.json.return_value = {"message": "Success"}
@@ -26,7 +26,7 @@ class TestAdminService(unittest.TestCase):
         self.assertEqual(status_code, 200)
         self.assertEqual(response, {"message": "Success"})
 
-    @patch('requests.request')
+    @patch('requests.Session.request')
     def test_handle_request_http_error_with_valid_json(self, mock_request):
         mock_response = Mock()
         mock_response.json.return_value = {"message": "Invalid request"}
@@ -38,7 +38,7 @@ class TestAdminService(unittest.TestCase):
         self.assertEqual(status_code, 400)
         self.assertEqual(response, {"error": "HTTP Error: Invalid request"})
 
-    @patch('requests.request')
+    @patch('requests.Session.request')
     def test_handle_request_http_error_with_invalid_json(self, mock_request):
         mock_response = Mock()
         mock_response.json.side_effect = ValueError("Invalid JSON")
@@ -51,7 +51,7 @@ class TestAdminService(unittest.TestCase):
         self.assertEqual(status_code, 500)
         self.assertEqual(response, {"error": "HTTP Error: Invalid JSON response"})
 
-    @patch('requests.request')
+    @patch('requests.Session.request')
     def test_handle_request_connection_error(self, mock_request):
         mock_request.side_effect = requests.exceptions.RequestException("Connection error")
 
@@ -59,7 +59,7 @@ class TestAdminService(unittest.TestCase):
         self.assertEqual(status_code, 500)
         self.assertEqual(response, {"error": "Request failed: Connection error"})
 
-    @patch('requests.get')
+    @patch('requests.Session.request')
     def test_is_multi_user_mode(self, mock_get):
         mock_response = Mock()
         mock_response.json.return_value = {"isMultiUser": True}
@@ -71,7 +71,7 @@ class TestAdminService(unittest.TestCase):
         self.assertEqual(status_code, 200)
         self.assertEqual(response, {"isMultiUser": True})
 
-    @patch('requests.post')
+    @patch('requests.Session.request')
     def test_create_user(self, mock_post):
         mock_response = Mock()
         mock_response.json.return_value = {"id": 1, "username": "newuser"}
@@ -85,7 +85,7 @@ class TestAdminService(unittest.TestCase):
         self.assertEqual(response["user"]["username"], "newuser")
         TestAdminService.id_user = response["user"]["id"]
 
-    @patch('requests.post')
+    @patch('requests.Session.request')
     def test_update_user(self, mock_post):
         mock_response = Mock()
         mock_response.json.return_value = {"id": 1, "username": "updateduser"}
@@ -97,7 +97,7 @@ class TestAdminService(unittest.TestCase):
         self.assertEqual(status_code, 200)
         
 
-    @patch('requests.delete')
+    @patch('requests.Session.request')
     def test_delete_user(self, mock_delete):
         mock_response = Mock()
         mock_response.json.return_value = {"message": "User deleted"}
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from services.async_transport import AsyncHttpTransport
+from services.async_services import AsyncAuthentificationService, AsyncDocumentService, AsyncWorkspaceService
+from test.local_server import LocalServerMixin, RouteHandler
+
+# app/test/test_async_services.py
+
+class _Handler(RouteHandler):
+    def do_GET(self):
+        self.server.calls.append(self.path)
+        if self.headers.get("Authorization") == "Bearer garbled_token":
+            return self.send_body(b"<html>proxy</html>", content_type="text/html")
+        if self.headers.get("Authorization") != "Bearer valid_token":
+            return self.send_json({"message": "Invalid API Key"}, 403)
+        self.send_json({"authenticated": True})
+
+    def do_POST(self):
+        self.server.calls.append(self.path)
+        body = self.read_body()
+        if self.path.endswith("/stream-chat"):
+            frames = b"".join(
+                b"data: " + json.dumps({"type": "textResponseChunk", "textResponse": word}).encode() + b"\n\n"
+                for word in ("Hello", " world")
+            )
+            self.send_body(frames, content_type="text/event-stream")
+        elif self.path.endswith("/upload"):
+            self.send_json({"success": True, "size": len(body)})
+        elif self.path.endswith("/invalid/chat"):
+            self.send_body(b"<html>proxy</html>", content_type="text/html")
+        elif self.path.endswith("/missing/chat"):
+            self.send_json({"message": "Workspace not found"}, 404)
+        else:
+            self.send_json({"textResponse": json.loads(body)["message"]})
+
+
+class TestAsyncServices(LocalServerMixin, unittest.IsolatedAsyncioTestCase):
+    handler = _Handler
+    base_path = ""
+
+    @classmethod
+    def configure_server(cls, server):
+        server.calls = []
+
+    async def asyncSetUp(self):
+        self.server.calls.clear()
+        self.transport = AsyncHttpTransport(max_concurrency=4)
+        self.auth_service = AsyncAuthentificationService(transport=self.transport)
+        base_url = self.base_url
+        self.auth_service.base_url = base_url
+        self.workspace_service = AsyncWorkspaceService(auth_service=self.auth_service)
+        self.workspace_service.base_url = base_url
+        self.document_service = AsyncDocumentService(auth_service=self.auth_service)
+        self.document_service.base_url = base_url
+
+    async def asyncTearDown(self):
+        await self.transport.aclose()
+
+    async def test_concurrent_chats_share_auth(self):
+        results = await asyncio.gather(*[
+            self.workspace_service.chat_with_workspace("demo", {"message": f"q{i}", "mode": "chat"}, "valid_token")
+            for i in range(10)
+        ])
+        self.assertEqual([r[1] for r in results], [200] * 10)
+        self.assertEqual(results[3][0], {"textResponse": "q3"})
+        self.assertLessEqual(self.server.calls.count("/v1/auth"), 10)
+        self.assertIs(self.workspace_service.transport, self.transport)
+
+    async def test_auth_services_share_one_invalidation_hook(self):
+        other = AsyncAuthentificationService(transport=self.transport)
+        self.assertEqual(len(self.transport.client.event_hooks["response"]), 1)
+        for auth_service in (self.auth_service, other):
+            auth_service.token_cache.store("Bearer revoked_token", ({"authenticated": True}, 200))
+        # Le 403 reçu en aval invalide le token dans tous les caches du transport
+        await self.transport.get(f"{self.base_url}/v1/workspaces", headers={"Authorization": "Bearer revoked_token"})
+        self.assertIsNone(self.auth_service.token_cache.get("Bearer revoked_token"))
+        self.assertIsNone(other.token_cache.get("Bearer revoked_token"))
+
+    async def test_invalid_token(self):
+        response, status_code = await self.workspace_service.list_workspaces("bad_token")
+        self.assertEqual(status_code, 403)
+        self.assertEqual(response["error"], "Authentication failed")
+
+    async def test_http_error(self):
+        response, status_code = await self.workspace_service.chat_with_workspace("missing", {"message": "q"}, "valid_token")
+        self.assertEqual(status_code, 404)
+        self.assertEqual(response["error"], "HTTP error occurred")
+
+    async def test_invalid_json_matches_the_sync_pipeline(self):
+        response, status_code = await self.workspace_service.chat_with_workspace("invalid", {"message": "q"}, "valid_token")
+        self.assertEqual(status_code, 502)
+        self.assertEqual(response["error"], "Invalid response")
+
+    async def test_invalid_auth_body_is_a_decode_error(self):
+        response, status_code = await self.workspace_service.list_workspaces("garbled_token")
+        self.assertEqual(status_code, 502)
+        self.assertEqual(response["details"]["error"], "Invalid authentication response")
+
+    async def test_upload_file(self):
+        with tempfile.NamedTemporaryFile(delete=False) as tmp:
+            tmp.write(b"x" * 1000)
+        try:
+            response, status_code = await self.document_service.upload_file(tmp.name, "valid_token")
+        finally:
+            os.remove(tmp.name)
+        self.assertEqual(status_code, 200)
+        self.assertGreater(response["size"], 1000)
+
+    async def test_upload_missing_file(self):
+        response, status_code = await self.document_service.upload_file("/nonexistent/file.pdf", "valid_token")
+        self.assertEqual(status_code, 500)
+        self.assertIn("Unexpected error during file upload", response["error"])
+
+    async def test_stream_chat(self):
+        stream, status_code = await self.workspace_service.stream_chat_with_workspace("demo", {"message": "q"}, "valid_token")
+        self.assertEqual(status_code, 200)
+        received = [event.text async for event in stream if event.type == "text"]
+        self.assertEqual(received, ["Hello", " world"])
+        self.assertIsNotNone(stream.metrics.time_to_first_token)
+
+    async def test_connection_error(self):
+        self.workspace_service.base_url = "http://127.0.0.1:1"
+        response, status_code = await self.workspace_service.list_workspaces("valid_token")
+        self.assertEqual(status_code, 500)
+        self.assertEqual(response["error"], "Request exception occurred")
+
+
+if __name__ == '__main__':
+    unittest.main()
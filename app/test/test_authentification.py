@@ -1,7 +1,11 @@
+import gc
 import unittest
+import weakref
 import requests
 from unittest.mock import patch, Mock
 from services.authentification import AuthentificationService
+from services.transport import HttpTransport
+from services.workspace import WorkspaceService
 
 # app/test/test_authentification.py
 
@@ -9,13 +13,13 @@ class TestAuthentificationService(unittest.TestCase):
     def setUp(self):
         self.auth_service = AuthentificationService()
 
-    @patch('requests.get')
+    @patch('requests.Session.request')
     def test_no_authorization_token(self, mock_get):
         response, status_code = self.auth_service.auth()
         self.assertEqual(status_code, 403)
         self.assertEqual(response, {"error": "No authorization token provided."})
 
-    @patch('requests.get')
+    @patch('requests.Session.request')
     def test_successful_authentication(self, mock_get):
         mock_response = Mock()
         mock_response.json.return_value = {"message": "Success"}
@@ -27,7 +31,7 @@ class TestAuthentificationService(unittest.TestCase):
         self.assertEqual(status_code, 200)
         self.assertEqual(response, {"message": "Success"})
 
-    @patch('requests.get')
+    @patch('requests.Session.request')
     def test_http_error_with_valid_json(self, mock_get):
         mock_response = Mock()
         mock_response.json.return_value = {"message": "Invalid API Key"}
@@ -39,7 +43,7 @@ class TestAuthentificationService(unittest.TestCase):
         self.assertEqual(status_code, 403)
         self.assertEqual(response, {"error": "Invalid API Key: Invalid API Key"})
 
-    @patch('requests.get')
+    @patch('requests.Session.request')
     def test_http_error_with_invalid_json(self, mock_get):
         mock_response = Mock()
         mock_response.json.side_effect = ValueError("Invalid JSON")
@@ -52,7 +56,19 @@ class TestAuthentificationService(unittest.TestCase):
         self.assertEqual(status_code, 500)
         self.assertEqual(response, {"error": "Authentication service error: Invalid JSON response"})
 
-    @patch('requests.get')
+    @patch('requests.Session.request')
+    def test_invalid_json_on_success(self, mock_get):
+        mock_response = Mock()
+        mock_response.json.side_effect = requests.exceptions.JSONDecodeError("Expecting value", "<html>", 0)
+        mock_response.status_code = 200
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+
+        response, status_code = self.auth_service.auth(Authorization="Bearer garbled_token")
+        self.assertEqual(status_code, 502)
+        self.assertEqual(response["error"], "Invalid authentication response")
+
+    @patch('requests.Session.request')
     def test_connection_error(self, mock_get):
         mock_get.side_effect = requests.exceptions.RequestException("Connection error")
 
@@ -60,5 +76,92 @@ class TestAuthentificationService(unittest.TestCase):
         self.assertEqual(status_code, 500)
         self.assertEqual(response, {"error": "Failed to connect to the authentication service: Connection error"})
 
+    @patch('requests.Session.request')
+    def test_valid_token_is_cached(self, mock_get):
+        mock_response = Mock()
+        mock_response.json.return_value = {"authenticated": True}
+        mock_response.status_code = 200
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+
+        for _ in range(3):
+            response, status_code = self.auth_service.auth(Authorization="valid_token")
+            self.assertEqual(status_code, 200)
+        self.assertEqual(mock_get.call_count, 1)
+        self.assertEqual(self.auth_service.cache_hits, 2)
+
+    @patch('requests.Session.request')
+    def test_invalid_token_is_negatively_cached(self, mock_get):
+        mock_response = Mock()
+        mock_response.json.return_value = {"message": "Invalid API Key"}
+        mock_response.status_code = 403
+        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("403 Client Error")
+        mock_get.return_value = mock_response
+
+        self.auth_service.auth(Authorization="invalid_token")
+        response, status_code = self.auth_service.auth(Authorization="invalid_token")
+        self.assertEqual(status_code, 403)
+        self.assertEqual(mock_get.call_count, 1)
+
+    @patch('requests.Session.request')
+    def test_connection_error_is_not_cached(self, mock_get):
+        mock_get.side_effect = requests.exceptions.RequestException("Connection error")
+
+        self.auth_service.auth(Authorization="valid_token")
+        self.auth_service.auth(Authorization="valid_token")
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('requests.Session.request')
+    def test_expired_token_is_revalidated(self, mock_get):
+        mock_response = Mock()
+        mock_response.json.return_value = {"authenticated": True}
+        mock_response.status_code = 200
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+
+        auth_service = AuthentificationService(cache_ttl=0)
+        auth_service.auth(Authorization="valid_token")
+        auth_service.auth(Authorization="valid_token")
+        self.assertEqual(mock_get.call_count, 2)
+
+    @patch('requests.Session.request')
+    def test_downstream_401_invalidates_token(self, mock_get):
+        mock_response = Mock()
+        mock_response.json.return_value = {"authenticated": True}
+        mock_response.status_code = 200
+        mock_response.raise_for_status.return_value = None
+        mock_get.return_value = mock_response
+
+        self.auth_service.auth(Authorization="valid_token")
+        downstream = Mock(status_code=401)
+        downstream.request.headers = {"Authorization": "Bearer valid_token"}
+        for hook in self.auth_service.transport.session.hooks["response"]:
+            hook(downstream)
+        self.auth_service.auth(Authorization="valid_token")
+        self.assertEqual(mock_get.call_count, 2)
+
+    def test_services_on_a_shared_transport_register_one_hook(self):
+        transport = HttpTransport()
+        services = [WorkspaceService(transport=transport) for _ in range(5)]
+        self.assertEqual(len(transport.session.hooks["response"]), 1)
+
+        for service in services:
+            service.auth_service.token_cache.store("Bearer valid_token", ({"authenticated": True}, 200))
+        downstream = Mock(status_code=403)
+        downstream.request.headers = {"Authorization": "Bearer valid_token"}
+        transport.session.hooks["response"][0](downstream)
+        self.assertTrue(all(service.auth_service.token_cache.get("Bearer valid_token") is None for service in services))
+        transport.close()
+
+    def test_hook_does_not_keep_auth_services_alive(self):
+        transport = HttpTransport()
+        auth_service = AuthentificationService(transport=transport)
+        cache = weakref.ref(auth_service.token_cache)
+        del auth_service
+        gc.collect()
+        self.assertIsNone(cache())
+        transport.close()
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
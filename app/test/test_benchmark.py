@@ -0,0 +1,32 @@
+import unittest
+from benchmarks import FakeAnythingLLMServer, FakeServerConfig, run_benchmarks
+from benchmarks.harness import SCENARIOS, compare, percentile
+
+# app/test/test_benchmark.py
+
+class TestBenchmarkHarness(unittest.TestCase):
+    def test_percentile(self):
+        self.assertEqual(percentile([4, 1, 3, 2], 50), 2.5)
+        self.assertEqual(percentile([1, 2, 3], 100), 3)
+        self.assertIsNone(percentile([], 99))
+
+    def test_every_scenario_runs_on_every_path(self):
+        with FakeAnythingLLMServer(FakeServerConfig(stream_chunks=4, embedding_dim=8)) as server:
+            report = run_benchmarks(server.base_url, requests=3, concurrency=2, upload_size=1024, trace_memory=False)
+        self.assertEqual(len(report["results"]), len(SCENARIOS) * 3)
+        for result in report["results"]:
+            self.assertEqual((result["scenario"], result["path"], result["errors"], result["requests"]),
+                             (result["scenario"], result["path"], 0, 3))
+            self.assertGreater(result["requests_per_second"], 0)
+            if result["scenario"] == "stream_chat":
+                self.assertIsNotNone(result["ttft_p50"])
+
+    def test_compare_reports_regressions(self):
+        before = {"results": [{"scenario": "chat", "path": "async", "requests_per_second": 100, "latency_p99": 0.1}]}
+        after = {"results": [{"scenario": "chat", "path": "async", "requests_per_second": 80, "latency_p99": 0.105}]}
+        regressions = compare(before, after, tolerance=0.1)
+        self.assertEqual([r["metric"] for r in regressions], ["requests_per_second"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,130 @@
+import json
+import os
+import unittest
+from unittest.mock import Mock, patch
+from services.chat_sync import ChatHistoryStore, ChatHistorySync
+from services.transport import HttpTransport
+from test.local_server import LocalServerMixin, RouteHandler
+
+# app/test/test_chat_sync.py
+
+def _messages(start, count):
+    messages = []
+    for chat_id in range(start, start + count):
+        messages.append({"role": "user", "content": f"question {chat_id}", "sentAt": 1700000000 + chat_id, "chatId": chat_id})
+        messages.append({"role": "assistant", "content": f"réponse {chat_id}", "sentAt": 1700000000 + chat_id, "chatId": chat_id, "sources": []})
+    return messages
+
+
+class _Handler(RouteHandler):
+    def do_GET(self):
+        self.server.calls.append(self.path)
+        histories = self.server.histories
+        if self.path in histories:
+            key = "chats" if "/embed/" in self.path else "history"
+            self.send_json({key: histories[self.path]})
+        elif self.path.endswith(("/cut/chats", "/dropped/chats")):
+            body = json.dumps({"history": _messages(0, 5)}).encode()
+            # /cut : corps JSON tronqué mais complet au niveau HTTP ; /dropped : connexion coupée avant la fin du corps
+            cut = body[:len(body) * 3 // 4]
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(cut) if self.path.endswith("/cut/chats") else len(body)))
+            self.end_headers()
+            self.wfile.write(cut)
+            self.close_connection = True
+        else:
+            self.send_json({"message": "not found"}, 404)
+
+
+class TestChatHistorySync(LocalServerMixin, unittest.TestCase):
+    handler = _Handler
+
+    def setUp(self):
+        self.server.calls = []
+        self.server.histories = {"/api/v1/workspace/docs/chats": _messages(0, 3)}
+        self.transport = HttpTransport()
+        auth_service = Mock()
+        auth_service.auth.return_value = ({"authenticated": True}, 200)
+        self.env = patch.dict(os.environ, {"BASE_URL": self.base_url})
+        self.env.start()
+        self.store = ChatHistoryStore(":memory:")
+        self.sync = ChatHistorySync(self.store, auth_service=auth_service, transport=self.transport, batch_size=4)
+
+    def tearDown(self):
+        self.env.stop()
+        self.store.close()
+        self.transport.close()
+
+    def test_only_new_records_are_appended(self):
+        summary, status_code = self.sync.sync_workspace("docs", "token")
+        self.assertEqual(status_code, 200)
+        self.assertEqual((summary["fetched"], summary["appended"], summary["position"]), (6, 6, 6))
+
+        summary, _ = self.sync.sync_workspace("docs", "token")
+        self.assertEqual((summary["fetched"], summary["appended"], summary["rebuilt"]), (6, 0, False))
+
+        self.server.histories["/api/v1/workspace/docs/chats"] += _messages(3, 2)
+        summary, _ = self.sync.sync_workspace("docs", "token")
+        self.assertEqual((summary["appended"], summary["position"]), (4, 10))
+        self.assertEqual(list(self.store.records(kind="workspace", scope="docs")), _messages(0, 5))
+
+    def test_local_store_answers_analytics_queries(self):
+        self.sync.sync_workspace("docs", "token")
+        rows = self.store.query(
+            "SELECT role, COUNT(*) FROM chat_records WHERE kind = 'workspace' GROUP BY role ORDER BY role"
+        )
+        self.assertEqual(rows, [("assistant", 3), ("user", 3)])
+        (last_chat,), = self.store.query("SELECT MAX(json_extract(record, '$.chatId')) FROM chat_records")
+        self.assertEqual(last_chat, 2)
+
+    def test_rewritten_history_is_rebuilt(self):
+        self.sync.sync_workspace("docs", "token")
+        self.server.histories["/api/v1/workspace/docs/chats"] = _messages(1, 2)
+        summary, _ = self.sync.sync_workspace("docs", "token")
+        self.assertTrue(summary["rebuilt"])
+        self.assertEqual(list(self.store.records(scope="docs")), _messages(1, 2))
+
+        self.server.histories["/api/v1/workspace/docs/chats"] = _messages(1, 1)
+        summary, _ = self.sync.sync_workspace("docs", "token")
+        self.assertEqual((summary["rebuilt"], summary["position"]), (True, 2))
+
+    def test_threads_and_embed_sessions_have_their_own_marks(self):
+        embed_chats = [{"id": 1, "prompt": "hello", "response": "hi", "createdAt": "2024-01-01T00:00:00Z"}]
+        self.server.histories.update({
+            "/api/v1/workspace/docs/thread/t1/chats": _messages(0, 1),
+            "/api/v1/embed/abc/chats/s1": embed_chats
+        })
+        self.assertEqual(self.sync.sync_thread("docs", "t1", "token")[0]["appended"], 2)
+        self.assertEqual(self.sync.sync_embed_session("abc", "s1", "token")[0]["appended"], 1)
+        self.assertEqual(self.store.high_water_mark(self.base_url, "thread", "docs/t1")[0], 2)
+        self.assertEqual(
+            self.store.query("SELECT content, sent_at FROM chat_records WHERE kind = 'embed_session'"),
+            [("hello", "2024-01-01T00:00:00Z")]
+        )
+
+    def test_errors_are_returned_without_touching_the_store(self):
+        response, status_code = self.sync.sync_workspace("missing", "token")
+        self.assertEqual(status_code, 404)
+        self.assertEqual(self.store.high_water_mark(self.base_url, "workspace", "missing"), (0, None))
+
+    def test_truncated_history_returns_an_error_and_keeps_written_batches(self):
+        response, status_code = self.sync.sync_workspace("cut", "token")
+        self.assertEqual(status_code, 502)
+        self.assertEqual(response["error"], "Invalid chat history response")
+        self.assertEqual(response["summary"]["position"], 4)
+        self.assertEqual(list(self.store.records(scope="cut")), _messages(0, 2))
+
+        # La synchronisation suivante reprend au marqueur
+        self.server.histories["/api/v1/workspace/cut/chats"] = _messages(0, 5)
+        summary, status_code = self.sync.sync_workspace("cut", "token")
+        self.assertEqual((status_code, summary["appended"], summary["position"]), (200, 6, 10))
+
+    def test_dropped_connection_returns_an_error(self):
+        response, status_code = self.sync.sync_workspace("dropped", "token")
+        self.assertEqual(status_code, 500)
+        self.assertEqual(response["error"], "Chat history download interrupted")
+        self.assertEqual(response["summary"]["position"], 0)
+
+if __name__ == "__main__":
+    unittest.main()
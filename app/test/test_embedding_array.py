@@ -0,0 +1,87 @@
+import base64
+import json
+import unittest
+from unittest.mock import Mock
+import numpy as np
+from services.embedding_array import decode_embeddings
+from services.openai_compatible_service import OpenAICompatibleService
+from services.embedding_cache import EmbeddingCache
+from services.embedding_batcher import EmbeddingBatcher
+
+# app/test/test_embedding_array.py
+
+class TestDecodeEmbeddings(unittest.TestCase):
+    def test_decode_matches_json(self):
+        vectors = [[0.125, -1.5, 3e-05], [2.0, 0.0, -0.25]]
+        body = json.dumps({
+            "object": "list",
+            "data": [{"object": "embedding", "embedding": v, "index": i} for i, v in enumerate(vectors)],
+            "model": "nomic-embed"
+        }).encode()
+        result = decode_embeddings(body)
+        self.assertEqual(result["ids"], [0, 1])
+        self.assertEqual(result["model"], "nomic-embed")
+        self.assertEqual(result["embeddings"].dtype, np.float32)
+        self.assertTrue(result["embeddings"].flags["C_CONTIGUOUS"])
+        np.testing.assert_allclose(result["embeddings"], np.array(vectors, dtype=np.float32))
+
+    def test_rows_are_sorted_by_index(self):
+        body = b'{"data":[{"index":1,"embedding":[1,1]},{"embedding":[0,0],"index":0}]}'
+        result = decode_embeddings(body)
+        self.assertEqual(result["ids"], [0, 1])
+        np.testing.assert_array_equal(result["embeddings"], [[0, 0], [1, 1]])
+
+    def test_base64_embeddings(self):
+        encoded = base64.b64encode(np.array([1.0, 2.0], dtype=np.float32).tobytes()).decode()
+        body = json.dumps({"data": [{"embedding": encoded, "index": 0}]}).encode()
+        np.testing.assert_array_equal(decode_embeddings(body)["embeddings"], [[1.0, 2.0]])
+
+    def test_inconsistent_dimensions(self):
+        with self.assertRaises(ValueError):
+            decode_embeddings(b'{"data":[{"embedding":[1,2],"index":0},{"embedding":[1],"index":1}]}')
+
+
+class TestGetEmbeddingsAsNumpy(unittest.TestCase):
+    def setUp(self):
+        self.auth_service = Mock()
+        self.auth_service.auth.return_value = ({"authenticated": True}, 200)
+        self.transport = Mock()
+        self.transport.post.return_value = Mock(
+            status_code=200,
+            content=b'{"object":"list","data":[{"object":"embedding","embedding":[0.5,1.5],"index":0}],"model":"m"}'
+        )
+
+    def test_direct_request(self):
+        service = OpenAICompatibleService(auth_service=self.auth_service, transport=self.transport)
+        response, status_code = service.get_embeddings(["hello"], "token", as_numpy=True)
+        self.assertEqual(status_code, 200)
+        self.assertEqual(response["embeddings"].shape, (1, 2))
+        self.transport.post.return_value.json.assert_not_called()
+
+    def test_with_cache(self):
+        self.transport.post.return_value.json.return_value = json.loads(self.transport.post.return_value.content)
+        service = OpenAICompatibleService(auth_service=self.auth_service, transport=self.transport, embedding_cache=EmbeddingCache())
+        service.get_embeddings(["hello"], "token")
+        response, status_code = service.get_embeddings(["hello", "hello"], "token", as_numpy=True)
+        self.assertEqual(response["embeddings"].shape, (2, 2))
+        self.assertEqual(response["ids"], [0, 1])
+
+    def test_empty_input(self):
+        service = OpenAICompatibleService(auth_service=self.auth_service, transport=self.transport, embedding_cache=EmbeddingCache())
+        response, status_code = service.get_embeddings([], "token", as_numpy=True)
+        self.assertEqual(status_code, 200)
+        self.assertEqual(response["embeddings"].shape, (0, 0))
+        self.assertEqual(response["ids"], [])
+        self.transport.post.assert_not_called()
+
+    def test_empty_input_with_batcher(self):
+        service = OpenAICompatibleService(
+            auth_service=self.auth_service, transport=self.transport, embedding_batcher=EmbeddingBatcher()
+        )
+        response, status_code = service.get_embeddings([], "token", as_numpy=True)
+        self.assertEqual(status_code, 200)
+        self.assertEqual(response["embeddings"].shape, (0, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+import threading
+import time
+import unittest
+from services.embedding_batcher import EmbeddingBatcher
+
+# app/test/test_embedding_batcher.py
+
+class FakeServer:
+    def __init__(self, delay=0.0, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.batches = []
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def send(self, batch):
+        with self.lock:
+            self.batches.append(list(batch))
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        if self.fail_on in batch:
+            return {"error": "HTTP error occurred"}, 503
+        return {"data": [{"embedding": [float(len(t))], "index": i} for i, t in reversed(list(enumerate(batch)))]}, 200
+
+
+class TestEmbeddingBatcher(unittest.TestCase):
+    def test_split_by_items_and_bytes(self):
+        batcher = EmbeddingBatcher(max_batch_items=3, max_batch_bytes=10)
+        self.assertEqual(batcher.split(["a", "b", "c", "d"]), [["a", "b", "c"], ["d"]])
+        self.assertEqual(batcher.split(["aaaa", "bbbb", "cccccccccccc", "d"]), [["aaaa", "bbbb"], ["cccccccccccc"], ["d"]])
+        batcher.close()
+
+    def test_batches_run_concurrently_and_keep_order(self):
+        server = FakeServer(delay=0.05)
+        batcher = EmbeddingBatcher(max_batch_items=2, max_concurrency=3, coalesce_window=0)
+        texts = ["x" * n for n in range(1, 10)]
+        vectors, status_code = batcher.embed(texts, server.send)
+        self.assertEqual(status_code, 200)
+        self.assertEqual(vectors, [[float(n)] for n in range(1, 10)])
+        self.assertEqual(len(server.batches), 5)
+        self.assertLessEqual(server.max_active, 3)
+        self.assertGreater(server.max_active, 1)
+        batcher.close()
+
+    def test_error_in_one_batch(self):
+        server = FakeServer(fail_on="bad")
+        batcher = EmbeddingBatcher(max_batch_items=1, coalesce_window=0)
+        response, status_code = batcher.embed(["ok", "bad", "ok"], server.send)
+        self.assertEqual(status_code, 503)
+        batcher.close()
+
+    def test_uncontended_call_is_sent_immediately(self):
+        server = FakeServer()
+        batcher = EmbeddingBatcher(coalesce_window=1.0)
+        started_at = time.monotonic()
+        self.assertEqual(batcher.embed(["abc"], server.send, key=("token", None)), ([[3.0]], 200))
+        self.assertLess(time.monotonic() - started_at, 0.5)
+        batcher.close()
+
+    def test_calls_arriving_during_a_request_are_coalesced(self):
+        server = FakeServer(delay=0.1)
+        batcher = EmbeddingBatcher(coalesce_window=1.0)
+        results = {}
+
+        def call(i):
+            results[i] = batcher.embed(["t" * i], server.send, key=("token", None))
+
+        threads = [threading.Thread(target=call, args=(i,)) for i in range(1, 9)]
+        threads[0].start()
+        time.sleep(0.02)
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Le premier appel part seul, les 7 suivants partent ensemble à la fin de sa requête
+        self.assertEqual(len(server.batches), 2)
+        self.assertEqual((server.batches[0], len(server.batches[1])), (["t"], 7))
+        self.assertEqual(batcher.coalesced_calls, 6)
+        for i in range(1, 9):
+            self.assertEqual(results[i], ([[float(i)]], 200))
+        batcher.close()
+
+    def test_interrupted_leader_releases_its_followers(self):
+        def send(batch):
+            if len(batch) > 1:
+                raise KeyboardInterrupt
+            time.sleep(0.1)
+            return FakeServer().send(batch)
+
+        batcher = EmbeddingBatcher(coalesce_window=1.0)
+        results = {}
+
+        def call(i):
+            try:
+                results[i] = batcher.embed(["t" * i], send, key="k")
+            except KeyboardInterrupt:
+                results[i] = "interrupted"
+
+        threads = [threading.Thread(target=call, args=(i,), daemon=True) for i in range(1, 4)]
+        threads[0].start()
+        time.sleep(0.02)
+        for thread in threads[1:]:
+            thread.start()
+        for thread in threads:
+            thread.join(2)
+        self.assertFalse(any(thread.is_alive() for thread in threads))
+        self.assertEqual(results[1], ([[1.0]], 200))
+        # Le meneur du second lot est interrompu, l'appel qui l'avait rejoint reçoit une erreur
+        self.assertIn("interrupted", (results[2], results[3]))
+        follower = results[3] if results[2] == "interrupted" else results[2]
+        self.assertEqual(follower[1], 500)
+        batcher.close()
+
+if __name__ == '__main__':
+    unittest.main()
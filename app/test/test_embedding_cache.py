@@ -0,0 +1,113 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock, patch
+from services.embedding_cache import EmbeddingCache
+from services.openai_compatible_service import OpenAICompatibleService
+
+# app/test/test_embedding_cache.py
+
+def fake_embedding(text):
+    return [float(len(text)), 0.5, -1.0]
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    def test_memory_lru_eviction(self):
+        cache = EmbeddingCache(max_memory_items=2)
+        cache.put_many("model", ["a", "b", "c"], [[1.0], [2.0], [3.0]])
+        self.assertIsNone(cache.get("model", "a"))
+        self.assertEqual(cache.get("model", "c"), [3.0])
+        self.assertIsNone(cache.get("other-model", "c"))
+
+    def test_disk_tier_survives_restart(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = EmbeddingCache(tmpdir)
+            cache.put_many("model", ["hello", "world"], [[0.25, 0.5], [1.0, 2.0]])
+            cache.put("model", "longer", [1.0, 2.0, 3.0])
+            cache.close()
+
+            reopened = EmbeddingCache(tmpdir, max_memory_items=10)
+            self.assertEqual(reopened.get_many("model", ["world", "hello", "missing", "longer"]),
+                             [[1.0, 2.0], [0.25, 0.5], None, [1.0, 2.0, 3.0]])
+            self.assertEqual(reopened.disk_hits, 3)
+            reopened.put("model", "new", [4.0, 5.0])
+            self.assertEqual(reopened.get("model", "hello"), [0.25, 0.5])
+            reopened.clear_memory()
+            self.assertEqual(reopened.get("model", "new"), [4.0, 5.0])
+            self.assertEqual(len(reopened), 4)
+            reopened.close()
+
+    def test_caches_sharing_a_directory_do_not_overlap_rows(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            # Deux instances = deux connexions à l'index, comme deux processus
+            caches = [EmbeddingCache(tmpdir), EmbeddingCache(tmpdir)]
+
+            def writer(cache, prefix):
+                for batch in range(20):
+                    texts = [f"{prefix}-{batch}-{i}" for i in range(5)]
+                    cache.put_many("model", texts, [fake_embedding(text) for text in texts])
+
+            threads = [threading.Thread(target=writer, args=(cache, prefix)) for cache, prefix in zip(caches, ("a", "bb"))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            reader = EmbeddingCache(tmpdir)
+            texts = [f"{prefix}-{batch}-{i}" for prefix in ("a", "bb") for batch in range(20) for i in range(5)]
+            self.assertEqual(reader.get_many("model", texts), [fake_embedding(text) for text in texts])
+            for cache in caches + [reader]:
+                cache.close()
+
+    def test_partial_row_left_by_a_crash_is_discarded(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            cache = EmbeddingCache(tmpdir)
+            cache.put("model", "first", [1.0, 2.0])
+            with open(os.path.join(tmpdir, "vectors_2.f32"), "ab") as data_file:
+                data_file.write(b"\x00" * 5)
+            cache.put("model", "second", [3.0, 4.0])
+            cache.clear_memory()
+            self.assertEqual(cache.get_many("model", ["first", "second"]), [[1.0, 2.0], [3.0, 4.0]])
+            cache.close()
+
+
+class TestCachedGetEmbeddings(unittest.TestCase):
+    def setUp(self):
+        auth_service = Mock()
+        auth_service.auth.return_value = ({"authenticated": True}, 200)
+        self.service = OpenAICompatibleService(auth_service=auth_service, transport=Mock(), embedding_cache=EmbeddingCache())
+
+    def _post(self, input_texts, token, model):
+        return {
+            "object": "list",
+            "data": [{"object": "embedding", "embedding": fake_embedding(t), "index": i} for i, t in enumerate(input_texts)],
+            "model": "server-model"
+        }, 200
+
+    def test_only_misses_are_requested(self):
+        with patch.object(self.service, "_post_embeddings", side_effect=self._post) as mock_post:
+            self.service.get_embeddings(["a", "bb"], "token")
+            response, status_code = self.service.get_embeddings(["ccc", "a", "ccc", "bb"], "token")
+        self.assertEqual(status_code, 200)
+        self.assertEqual(mock_post.call_args_list[1].args[0], ["ccc"])
+        self.assertEqual([item["embedding"] for item in response["data"]],
+                         [fake_embedding(t) for t in ["ccc", "a", "ccc", "bb"]])
+        self.assertEqual([item["index"] for item in response["data"]], [0, 1, 2, 3])
+
+    def test_fully_cached_call_sends_nothing(self):
+        with patch.object(self.service, "_post_embeddings", side_effect=self._post) as mock_post:
+            self.service.get_embeddings("a", "token")
+            response, status_code = self.service.get_embeddings("a", "token")
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(response["data"][0]["embedding"], fake_embedding("a"))
+
+    def test_errors_are_not_cached(self):
+        with patch.object(self.service, "_post_embeddings", return_value=({"error": "HTTP error occurred"}, 503)) as mock_post:
+            self.assertEqual(self.service.get_embeddings(["a"], "token")[1], 503)
+            self.assertEqual(self.service.get_embeddings(["a"], "token")[1], 503)
+        self.assertEqual(mock_post.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,144 @@
+import csv
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+from urllib.parse import parse_qs, urlsplit
+from services.systemsettings import SystemSettingsService, iter_export_file, iter_export_records
+from services.transport import HttpTransport
+from test.local_server import LocalServerMixin, RouteHandler
+
+# app/test/test_export_chats.py
+
+CHATS = [
+    {"id": index, "workspace": "docs", "prompt": f"question {index}", "response": "ligne 1\r\nligne 2, \"citée\" é"}
+    for index in range(200)
+]
+
+
+def _csv_export():
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=list(CHATS[0]))
+    writer.writeheader()
+    writer.writerows(CHATS)
+    return output.getvalue()
+
+
+EXPORTS = {
+    "json": json.dumps(CHATS),
+    "jsonAlpaca": json.dumps([{"instruction": chat["prompt"], "input": "", "output": chat["response"]} for chat in CHATS]),
+    "jsonl": "\n".join(json.dumps(chat) for chat in CHATS) + "\n",
+    "csv": _csv_export()
+}
+
+
+class _Handler(RouteHandler):
+    def do_GET(self):
+        export_type = parse_qs(urlsplit(self.path).query)["type"][0]
+        body = EXPORTS[export_type].encode()
+        truncated = self.server.truncate
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        # Corps annoncé plus long que ce qui est envoyé pour simuler une coupure réseau
+        self.send_header("Content-Length", str(len(body) + (1000 if truncated else 0)))
+        self.end_headers()
+        for offset in range(0, len(body), 1000):
+            self.wfile.write(body[offset:offset + 1000])
+        if truncated:
+            self.close_connection = True
+
+
+class TestExportChats(LocalServerMixin, unittest.TestCase):
+    handler = _Handler
+
+    @classmethod
+    def configure_server(cls, server):
+        server.truncate = False
+
+    def setUp(self):
+        self.server.truncate = False
+        self.directory = tempfile.mkdtemp()
+        self.transport = HttpTransport()
+        auth_service = Mock()
+        auth_service.auth.return_value = ({"authenticated": True}, 200)
+        self.env = patch.dict(os.environ, {"BASE_URL": self.base_url})
+        self.env.start()
+        self.service = SystemSettingsService(auth_service=auth_service, transport=self.transport)
+
+    def tearDown(self):
+        self.env.stop()
+        self.transport.close()
+        shutil.rmtree(self.directory)
+
+    def test_export_to_path_for_every_type(self):
+        for export_type, body in EXPORTS.items():
+            path = os.path.join(self.directory, f"chats.{export_type}")
+            progress = []
+            response, status_code = self.service.export_chats_to(export_type, path, "token", chunk_size=512, progress_callback=progress.append)
+            self.assertEqual(status_code, 200)
+            self.assertEqual(response, {"type": export_type, "bytes": len(body.encode()), "path": path})
+            with open(path, "rb") as file:
+                self.assertEqual(file.read(), body.encode())
+            self.assertEqual(progress[-1], len(body.encode()))
+            self.assertGreater(len(progress), 1)
+
+    def test_export_to_file_object(self):
+        sink = io.BytesIO()
+        response, status_code = self.service.export_chats_to("jsonl", sink, "token")
+        self.assertEqual((response["path"], status_code), (None, 200))
+        self.assertEqual(sink.getvalue(), EXPORTS["jsonl"].encode())
+
+    def test_interrupted_download_leaves_no_file(self):
+        self.server.truncate = True
+        path = os.path.join(self.directory, "chats.csv")
+        response, status_code = self.service.export_chats_to("csv", path, "token")
+        self.assertEqual(status_code, 500)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_records_from_the_server_and_from_a_saved_file(self):
+        records, status_code = self.service.iter_export_chats("csv", "token", chunk_size=7)
+        self.assertEqual(status_code, 200)
+        self.assertEqual([(int(record["id"]), record["response"]) for record in records], [(chat["id"], chat["response"]) for chat in CHATS])
+
+        path = os.path.join(self.directory, "chats.jsonl")
+        self.service.export_chats_to("jsonl", path, "token")
+        self.assertEqual(list(iter_export_file(path, "jsonl", chunk_size=13)), CHATS)
+
+    def test_unknown_type(self):
+        with self.assertRaises(ValueError):
+            self.service.export_chats_to("xml", io.BytesIO(), "token")
+        with self.assertRaises(ValueError):
+            list(iter_export_records([b""], "xml"))
+
+    def test_unicode_line_separators_inside_records(self):
+        records = [{"id": 1, "response": "avant\u2028après\u0085\x0c\x1cfin"}, {"id": 2, "response": "ok"}]
+        body = "\r\n".join(json.dumps(record, ensure_ascii=False) for record in records).encode()
+        chunks = [body[offset:offset + 5] for offset in range(0, len(body), 5)]
+        self.assertEqual(list(iter_export_records(chunks, "jsonl")), records)
+
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=["id", "response"])
+        writer.writeheader()
+        writer.writerows(records)
+        rows = list(iter_export_records([output.getvalue().encode()], "csv"))
+        self.assertEqual([row["response"] for row in rows], [record["response"] for record in records])
+
+    def test_numbers_split_between_chunks(self):
+        body = b'[{"id": 0.5, "score": 1e3}, {"id": -2, "score": 2.25}]'
+        for offset in range(1, len(body)):
+            self.assertEqual(
+                list(iter_export_records([body[:offset], body[offset:]], "json")),
+                [{"id": 0.5, "score": 1e3}, {"id": -2, "score": 2.25}]
+            )
+
+    def test_crlf_split_between_chunks(self):
+        body = b'a,b\r\n1,"x\r\ny"\r\n2,z\r\n'
+        chunks = [body[:4], body[4:13], body[13:]]
+        self.assertEqual(list(iter_export_records(chunks, "csv")), [{"a": "1", "b": "x\r\ny"}, {"a": "2", "b": "z"}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+from services.async_services import AsyncWorkspaceService
+from services.async_transport import AsyncHttpTransport
+from services.fan_out import AsyncChatFanOut, ChatFanOut
+from services.transport import HttpTransport
+from services.workspace import WorkspaceService
+from test.local_server import LocalServerMixin, RouteHandler
+
+# app/test/test_fan_out.py
+
+WORKSPACES = [{"slug": "fast-a", "name": "A"}, {"slug": "fast-b", "name": "B"}, {"slug": "slow-c", "name": "C"}]
+
+
+class _Handler(RouteHandler):
+    def do_GET(self):
+        self.send_json({"workspaces": WORKSPACES})
+
+    def do_POST(self):
+        self.read_body()
+        slug = self.path.split("/")[-2]
+        server = self.server
+        with server.lock:
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        # Les workspaces "slow-*" répondent après 1 s, les autres après 50 ms
+        time.sleep(1.0 if slug.startswith("slow") else 0.05)
+        with server.lock:
+            server.active -= 1
+            server.completed.append(slug)
+        try:
+            self.send_json({"textResponse": f"answer from {slug}"})
+        except OSError:
+            pass
+
+
+class _ServerTestMixin(LocalServerMixin):
+    handler = _Handler
+
+    @classmethod
+    def configure_server(cls, server):
+        server.lock = threading.Lock()
+
+    def reset_server(self):
+        # Attendre la fin des appels abandonnés par le test précédent
+        while getattr(self.server, "active", 0):
+            time.sleep(0.05)
+        self.server.active = 0
+        self.server.max_active = 0
+        self.server.completed = []
+
+
+class TestChatFanOut(_ServerTestMixin, unittest.TestCase):
+    def setUp(self):
+        self.reset_server()
+        self.transport = HttpTransport(pool_maxsize=20)
+        auth_service = Mock()
+        auth_service.auth.return_value = ({"authenticated": True}, 200)
+        self.env = patch.dict(os.environ, {"BASE_URL": self.base_url})
+        self.env.start()
+        self.fan_out = ChatFanOut(WorkspaceService(auth_service=auth_service, transport=self.transport), max_concurrency=3)
+
+    def tearDown(self):
+        self.env.stop()
+        self.transport.close()
+
+    def test_results_arrive_as_they_complete_with_bounded_concurrency(self):
+        slugs = [f"fast-{index}" for index in range(9)] + ["slow-z"]
+        results, status_code = self.fan_out.chat({"message": "hi"}, "token", slugs=slugs)
+        self.assertEqual(status_code, 200)
+        results = list(results)
+        self.assertEqual(len(results), 10)
+        self.assertTrue(all(result.ok for result in results))
+        self.assertEqual(results[-1].slug, "slow-z")
+        self.assertEqual(results[0].response, {"textResponse": f"answer from {results[0].slug}"})
+        self.assertLessEqual(self.server.max_active, 3)
+
+    def test_quorum_cancels_stragglers(self):
+        started_at = time.monotonic()
+        results, _ = self.fan_out.chat({"message": "hi"}, "token", slugs=["slow-1", "fast-a", "fast-b", "slow-2"], quorum=2)
+        results = list(results)
+        self.assertLess(time.monotonic() - started_at, 0.9)
+        self.assertEqual({result.slug for result in results if result.ok}, {"fast-a", "fast-b"})
+        self.assertEqual({result.slug for result in results if result.cancelled}, {"slow-1", "slow-2"})
+
+    def test_call_timeout_and_deadline(self):
+        results, _ = self.fan_out.chat({"message": "hi"}, "token", slugs=["fast-a", "slow-c"], call_timeout=0.3)
+        by_slug = {result.slug: result for result in results}
+        self.assertTrue(by_slug["fast-a"].ok)
+        self.assertTrue(by_slug["slow-c"].timed_out)
+        self.assertEqual(by_slug["slow-c"].status_code, 504)
+
+        results, _ = self.fan_out.chat({"message": "hi"}, "token", slugs=["fast-a", "slow-c"], deadline=0.3)
+        by_slug = {result.slug: result for result in results}
+        self.assertTrue(by_slug["fast-a"].ok)
+        self.assertTrue(by_slug["slow-c"].cancelled)
+
+    def test_workspace_filter(self):
+        results, _ = self.fan_out.chat({"message": "hi"}, "token", workspace_filter=lambda workspace: workspace["slug"].startswith("fast"))
+        self.assertEqual(sorted(result.slug for result in results), ["fast-a", "fast-b"])
+
+
+class TestAsyncChatFanOut(_ServerTestMixin, unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.reset_server()
+        self.transport = AsyncHttpTransport()
+        auth_service = Mock()
+        auth_service.auth = AsyncMock(return_value=({"authenticated": True}, 200))
+        self.env = patch.dict(os.environ, {"BASE_URL": self.base_url})
+        self.env.start()
+        self.fan_out = AsyncChatFanOut(AsyncWorkspaceService(auth_service=auth_service, transport=self.transport), max_concurrency=2)
+
+    async def asyncTearDown(self):
+        self.env.stop()
+        await self.transport.aclose()
+
+    async def test_quorum_cancels_in_flight_requests(self):
+        started_at = time.monotonic()
+        results, status_code = await self.fan_out.chat({"message": "hi"}, "token", workspace_filter=None, quorum=2)
+        self.assertEqual(status_code, 200)
+        results = [result async for result in results]
+        self.assertLess(time.monotonic() - started_at, 0.9)
+        self.assertEqual({result.slug for result in results if result.ok}, {"fast-a", "fast-b"})
+        self.assertEqual([result.slug for result in results if result.cancelled], ["slow-c"])
+        self.assertLessEqual(self.server.max_active, 2)
+
+    async def test_call_timeout(self):
+        results, _ = await self.fan_out.chat({"message": "hi"}, "token", slugs=["slow-c", "fast-a"], call_timeout=0.3)
+        by_slug = {result.slug: result async for result in results}
+        self.assertTrue(by_slug["fast-a"].ok)
+        self.assertTrue(by_slug["slow-c"].timed_out)
+
+    async def test_closing_early_cancels_remaining_calls(self):
+        results, _ = await self.fan_out.chat({"message": "hi"}, "token", slugs=["fast-a", "slow-c"])
+        first = await results.__anext__()
+        self.assertEqual(first.slug, "fast-a")
+        await results.aclose()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock
+from services.ingestion import DocumentIngestionService, IngestionResult, EmbeddingBatchResult
+
+# app/test/test_ingestion.py
+
+class TestDocumentIngestionService(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        for name in ("a.txt", "b.pdf", "c.exe", "sub/d.md"):
+            path = os.path.join(self.tmpdir.name, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(name)
+
+        self.document_service = Mock()
+        self.document_service.get_accepted_file_types.return_value = (
+            {"types": {"text/plain": [".txt", ".md"], "application/pdf": [".pdf"]}}, 200
+        )
+        self.active = 0
+        self.max_active = 0
+        lock = threading.Lock()
+
+        def upload_file(path, token):
+            with lock:
+                self.active += 1
+                self.max_active = max(self.max_active, self.active)
+            with lock:
+                self.active -= 1
+            name = os.path.basename(path)
+            return {"success": True, "documents": [{"location": f"custom-documents/{name}.json"}]}, 200
+
+        self.document_service.upload_file.side_effect = upload_file
+        self.workspace_service = Mock()
+        self.workspace_service.update_workspace_embeddings.return_value = ({"workspace": {}}, 200)
+        self.service = DocumentIngestionService(
+            auth_service=Mock(),
+            transport=Mock(),
+            document_service=self.document_service,
+            workspace_service=self.workspace_service,
+            max_workers=2
+        )
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_rejected_types_are_skipped(self):
+        results = list(self.service.ingest(self.tmpdir.name, "token"))
+        uploaded = sorted(os.path.basename(r.path) for r in results if not r.skipped)
+        skipped = [os.path.basename(r.path) for r in results if r.skipped]
+        self.assertEqual(uploaded, ["a.txt", "b.pdf", "d.md"])
+        self.assertEqual(skipped, ["c.exe"])
+        self.assertEqual(self.document_service.upload_file.call_count, 3)
+        self.assertLessEqual(self.max_active, 2)
+
+    def test_embeddings_are_updated_in_batches(self):
+        results = list(self.service.ingest(self.tmpdir.name, "token", workspace_slug="demo", embed_batch_size=2))
+        batches = [r for r in results if isinstance(r, EmbeddingBatchResult)]
+        self.assertEqual([len(b.locations) for b in batches], [2, 1])
+        self.assertEqual(self.workspace_service.update_workspace_embeddings.call_count, 2)
+        added = self.workspace_service.update_workspace_embeddings.call_args_list[0].args[1]["adds"]
+        self.assertTrue(all(location.startswith("custom-documents/") for location in added))
+
+    def test_failed_upload_is_reported(self):
+        self.document_service.upload_file.side_effect = None
+        self.document_service.upload_file.return_value = ({"error": "HTTP Error: too large"}, 413)
+        results = [r for r in self.service.ingest([os.path.join(self.tmpdir.name, "a.txt")], "token", workspace_slug="demo")]
+        self.assertEqual(len(results), 1)
+        self.assertIsInstance(results[0], IngestionResult)
+        self.assertFalse(results[0].ok)
+        self.workspace_service.update_workspace_embeddings.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import asyncio
+import json
+import unittest
+from services.async_transport import AsyncHttpTransport
+from services.authentification import AuthentificationService
+from services.instrumentation import Histogram, Instrumentation, endpoint_template
+from services.transport import HttpTransport
+from services.workspace import WorkspaceService
+from test.local_server import LocalServerMixin, RouteHandler
+
+# app/test/test_instrumentation.py
+
+class _Handler(RouteHandler):
+    def do_GET(self):
+        self.send_json({"authenticated": True})
+
+    def do_POST(self):
+        body = json.loads(self.read_body())
+        self.send_json({"textResponse": body["message"]})
+
+
+class TestEndpointTemplate(unittest.TestCase):
+    def test_identifiers_are_replaced(self):
+        self.assertEqual(endpoint_template("http://h/api/v1/workspace/docs/chat"), "/v1/workspace/{slug}/chat")
+        self.assertEqual(
+            endpoint_template("http://h/api/v1/workspace/docs/thread/t-1/stream-chat"),
+            "/v1/workspace/{slug}/thread/{thread_slug}/stream-chat"
+        )
+        self.assertEqual(endpoint_template("http://h/api/v1/workspace/new"), "/v1/workspace/new")
+        self.assertEqual(endpoint_template("http://h/api/v1/admin/users/12"), "/v1/admin/users/{id}")
+        self.assertEqual(endpoint_template("http://h/api/v1/document/upload"), "/v1/document/upload")
+        self.assertEqual(endpoint_template("http://h/api/v1/document/custom-documents"), "/v1/document/{name}")
+        self.assertEqual(endpoint_template("http://h/api/v1/embed/abc/chats/s1"), "/v1/embed/{embed_uuid}/chats/{session_uuid}")
+
+    def test_histogram_is_cumulative(self):
+        histogram = Histogram((0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 5):
+            histogram.observe(value)
+        self.assertEqual(list(histogram.cumulative()), [(0.1, 1), (1.0, 3), (float("inf"), 4)])
+        self.assertEqual(histogram.count, 4)
+
+
+class TestInstrumentedTransports(LocalServerMixin, unittest.TestCase):
+    handler = _Handler
+
+    def test_service_calls_are_measured(self):
+        instrumentation = Instrumentation()
+        events = []
+        instrumentation.add_hook(events.append)
+        with HttpTransport(instrumentation=instrumentation) as transport:
+            auth_service = AuthentificationService(transport=transport)
+            auth_service.base_url = self.base_url
+            workspace_service = WorkspaceService(auth_service=auth_service, transport=transport)
+            workspace_service.base_url = self.base_url
+            for _ in range(2):
+                response, status_code = workspace_service.chat_with_workspace("docs", {"message": "hi", "mode": "chat"}, "token")
+                self.assertEqual(status_code, 200)
+
+        snapshot = instrumentation.snapshot()
+        self.assertEqual(snapshot["auth_cache"], {"hit": 1, "miss": 1})
+        self.assertEqual(snapshot["requests"][("POST", "/v1/workspace/{slug}/chat", "200")], 2)
+        self.assertEqual(snapshot["requests"][("GET", "/v1/auth", "200")], 1)
+        self.assertGreater(snapshot["bytes_sent"][("POST", "/v1/workspace/{slug}/chat")], 0)
+        self.assertEqual(snapshot["phases"][("/v1/workspace/{slug}/chat", "decode")]["count"], 2)
+        self.assertEqual(snapshot["phases"][("/v1/auth", "connect")]["count"], 1)
+
+        kinds = [event["kind"] for event in events]
+        self.assertIn("auth_cache", kinds)
+        self.assertIn("decode", kinds)
+        request_event = next(event for event in events if event["kind"] == "request")
+        self.assertIsNotNone(request_event["ttfb"])
+
+        text = instrumentation.export_prometheus()
+        self.assertIn('anythingllm_requests_total{method="POST",endpoint="/v1/workspace/{slug}/chat",status="200"} 2', text)
+        self.assertIn('anythingllm_auth_cache_total{result="hit"} 1', text)
+        self.assertIn('le="+Inf"', text)
+
+    def test_network_errors_are_counted(self):
+        instrumentation = Instrumentation()
+        with HttpTransport(instrumentation=instrumentation, timeout=1) as transport:
+            with self.assertRaises(Exception):
+                transport.get("http://127.0.0.1:9/api/v1/auth")
+        self.assertEqual(instrumentation.snapshot()["requests"], {("GET", "/v1/auth", "error"): 1})
+
+    def test_async_phases(self):
+        instrumentation = Instrumentation()
+
+        async def run():
+            async with AsyncHttpTransport(instrumentation=instrumentation) as transport:
+                response = await transport.post(f"{self.base_url}/v1/workspace/docs/chat", json={"message": "hi"})
+                return response.json()
+
+        self.assertEqual(asyncio.run(run()), {"textResponse": "hi"})
+        snapshot = instrumentation.snapshot()
+        for phase in ("connect", "ttfb", "download", "decode"):
+            self.assertEqual(snapshot["phases"][("/v1/workspace/{slug}/chat", phase)]["count"], 1, phase)
+
+
+if __name__ == "__main__":
+    unittest.main()
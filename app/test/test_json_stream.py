@@ -0,0 +1,150 @@
+import json
+import os
+import tracemalloc
+import unittest
+from unittest.mock import Mock, patch
+from services.documents import DocumentService
+from services.embed import EmbedService
+from services.json_stream import iter_json_items
+from services.systemsettings import SystemSettingsService
+from services.transport import HttpTransport
+from services.workspace import WorkspaceService
+from test.local_server import LocalServerMixin, RouteHandler
+
+# app/test/test_json_stream.py
+
+DOCUMENTS = {
+    "localFiles": {
+        "name": "documents",
+        "type": "folder",
+        "items": [
+            {"name": "custom-documents", "type": "folder", "items": [{"name": f"doc-{i}.json", "title": f"Doc {i}"} for i in range(3)]},
+            {"name": "empty", "type": "folder", "items": []}
+        ]
+    }
+}
+CHATS = [{"id": i, "prompt": f"question {i}", "response": "réponse"} for i in range(5)]
+BODIES = {
+    "/api/v1/documents": json.dumps(DOCUMENTS),
+    "/api/v1/workspace/docs/chats": json.dumps({"history": CHATS}),
+    "/api/v1/embed/abc/chats": json.dumps({"chats": CHATS}),
+    "/api/v1/system/export-chats?type=json": json.dumps(CHATS),
+    "/api/v1/system/export-chats?type=jsonl": "\n".join(json.dumps(chat) for chat in CHATS) + "\n"
+}
+
+
+class _Handler(RouteHandler):
+    def do_GET(self):
+        body = BODIES.get(self.path)
+        if body is None:
+            self.send_body(b"", 404)
+            return
+        body = body.encode()
+        # Corps envoyé en morceaux de 7 octets pour couper les valeurs JSON
+        self.start_chunked("application/json")
+        for offset in range(0, len(body), 7):
+            self.send_chunk(body[offset:offset + 7])
+        self.end_chunked()
+
+
+class TestIterJsonItems(unittest.TestCase):
+    def chunked(self, value, size):
+        raw = json.dumps(value, ensure_ascii=False).encode()
+        return [raw[offset:offset + size] for offset in range(0, len(raw), size)]
+
+    def test_items_at_path_for_any_chunk_size(self):
+        value = {"skip": {"nested": [1, "]}\\\"", {"a": None}]}, "history": [{"text": "é€"}, 12345, True, None, "x"]}
+        for size in (1, 2, 5, 1000):
+            self.assertEqual(list(iter_json_items(self.chunked(value, size), ("history", "*"))), value["history"])
+
+    def test_numbers_split_at_every_offset(self):
+        for raw in (b'{"history": [0.5, 2]}', b'{"history": [1e3, -12, 2.5E-4]}', b'{"history": [-0.25 , 7]}',
+                    b'{"skip": 3.75, "history": [{"n": 10.5}, 42]}', b'123.5e1'):
+            expected = json.loads(raw)
+            path = ("history", "*") if b"history" in raw else ()
+            if path:
+                expected = expected["history"]
+            for offset in range(1, len(raw)):
+                items = list(iter_json_items([raw[:offset], raw[offset:]], path))
+                self.assertEqual(items, expected if path else [expected], (raw, offset))
+
+    def test_parents_expose_scalar_fields(self):
+        items = list(iter_json_items(self.chunked(DOCUMENTS, 3), ("localFiles", "items", "*", "items", "*"), with_parents=True))
+        self.assertEqual([parents[-1]["name"] for parents, _ in items], ["custom-documents"] * 3)
+        self.assertEqual(items[0][1], {"name": "doc-0.json", "title": "Doc 0"})
+
+    def test_missing_path_and_truncated_body(self):
+        self.assertEqual(list(iter_json_items([b'{"history": null}'], ("history", "*"))), [])
+        self.assertEqual(list(iter_json_items([b'{"other": [1]}'], ("history", "*"))), [])
+        with self.assertRaises(ValueError):
+            list(iter_json_items([b'{"history": [1, {"a": '], ("history", "*")))
+
+    def test_memory_is_bounded_by_one_item(self):
+        def chunks():
+            yield b'{"history": ['
+            for index in range(20000):
+                yield (b"," if index else b"") + json.dumps({"id": index, "text": "x" * 200}).encode()
+            yield b"]}"
+
+        tracemalloc.start()
+        count = sum(1 for _ in iter_json_items(chunks(), ("history", "*")))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertEqual(count, 20000)
+        # Le document complet fait environ 4,5 Mo
+        self.assertLess(peak, 1024 * 1024)
+
+
+class TestIteratorServices(LocalServerMixin, unittest.TestCase):
+    handler = _Handler
+
+    def setUp(self):
+        self.transport = HttpTransport()
+        self.auth_service = Mock()
+        self.auth_service.auth.return_value = ({"authenticated": True}, 200)
+        self.env = patch.dict(os.environ, {"BASE_URL": self.base_url})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.transport.close()
+
+    def test_iter_documents(self):
+        service = DocumentService(auth_service=self.auth_service, transport=self.transport)
+        documents, status_code = service.iter_documents("token")
+        self.assertEqual(status_code, 200)
+        self.assertEqual([(folder, document["name"]) for folder, document in documents], [
+            ("custom-documents", "doc-0.json"), ("custom-documents", "doc-1.json"), ("custom-documents", "doc-2.json")
+        ])
+
+    def test_chat_iterators(self):
+        workspace_service = WorkspaceService(auth_service=self.auth_service, transport=self.transport)
+        embed_service = EmbedService(auth_service=self.auth_service, transport=self.transport)
+        chats, status_code = workspace_service.iter_workspace_chats("docs", "token")
+        self.assertEqual((list(chats), status_code), (CHATS, 200))
+        chats, status_code = embed_service.iter_chats_for_embed("abc", "token")
+        self.assertEqual((list(chats), status_code), (CHATS, 200))
+
+    def test_iter_export_chats(self):
+        service = SystemSettingsService(auth_service=self.auth_service, transport=self.transport)
+        for export_type in ("json", "jsonl"):
+            chats, status_code = service.iter_export_chats(export_type, "token")
+            self.assertEqual((list(chats), status_code), (CHATS, 200))
+        with self.assertRaises(ValueError):
+            service.iter_export_chats("xml", "token")
+
+    def test_closing_the_iterator_releases_the_connection(self):
+        service = WorkspaceService(auth_service=self.auth_service, transport=self.transport)
+        chats, _ = service.iter_workspace_chats("docs", "token")
+        self.assertEqual(next(chats), CHATS[0])
+        chats.close()
+        self.assertEqual(list(service.iter_workspace_chats("docs", "token")[0]), CHATS)
+
+    def test_http_errors_are_returned(self):
+        service = WorkspaceService(auth_service=self.auth_service, transport=self.transport)
+        response, status_code = service.iter_workspace_chats("missing", "token")
+        self.assertEqual((response["error"], status_code), ("HTTP error occurred", 404))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import asyncio
+import os
+import threading
+import tempfile
+import unittest
+from email.parser import BytesParser
+from email.policy import HTTP
+import requests
+from services.multipart import MultipartFileEncoder
+
+# app/test/test_multipart.py
+
+class TestMultipartFileEncoder(unittest.TestCase):
+    def setUp(self):
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            tmp.write(os.urandom(300 * 1024 + 17))
+        self.path = tmp.name
+        with open(self.path, "rb") as f:
+            self.content = f.read()
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def _parse(self, encoder, body):
+        message = BytesParser(policy=HTTP).parsebytes(
+            f"Content-Type: {encoder.content_type}\r\n\r\n".encode() + body
+        )
+        return list(message.iter_parts())
+
+    def test_body_is_valid_multipart(self):
+        encoder = MultipartFileEncoder("file", self.path, chunk_size=32 * 1024)
+        chunks = list(encoder)
+        body = b"".join(chunks)
+        self.assertEqual(len(body), len(encoder))
+        self.assertLessEqual(max(len(chunk) for chunk in chunks), 32 * 1024)
+        parts = self._parse(encoder, body)
+        self.assertEqual(len(parts), 1)
+        self.assertEqual(parts[0].get_filename(), os.path.basename(self.path))
+        self.assertEqual(parts[0].get_content_type(), "application/pdf")
+        self.assertEqual(parts[0].get_payload(decode=True), self.content)
+
+    def test_mmap_gives_same_body(self):
+        read_body = b"".join(MultipartFileEncoder("file", self.path))
+        encoder = MultipartFileEncoder("file", self.path, use_mmap=True)
+        mmap_body = b"".join(encoder)
+        self.assertEqual(len(read_body), len(mmap_body))
+        self.assertIn(self.content, mmap_body)
+
+    def test_progress_callback(self):
+        progress = []
+        encoder = MultipartFileEncoder("file", self.path, chunk_size=100 * 1024, progress_callback=lambda sent, total: progress.append((sent, total)))
+        list(encoder)
+        self.assertEqual(progress[-1], (len(encoder), len(encoder)))
+        self.assertEqual(len(progress), 2 + 4)
+
+    def test_requests_sends_content_length(self):
+        encoder = MultipartFileEncoder("file", self.path)
+        prepared = requests.Request("POST", "http://localhost/v1/document/upload", data=encoder, headers=encoder.headers).prepare()
+        self.assertEqual(prepared.headers["Content-Length"], str(len(encoder)))
+        self.assertNotIn("Transfer-Encoding", prepared.headers)
+        self.assertIs(prepared.body, encoder)
+
+
+    def test_async_chunks_are_read_off_the_event_loop(self):
+        threads = set()
+        encoder = MultipartFileEncoder("file", self.path, progress_callback=lambda sent, total: threads.add(threading.get_ident()))
+
+        async def collect():
+            return b"".join([chunk async for chunk in encoder.aiter_chunks()])
+
+        body = asyncio.run(collect())
+        self.assertNotIn(threading.get_ident(), threads)
+        self.assertEqual(body, b"".join(encoder))
+
+if __name__ == '__main__':
+    unittest.main()
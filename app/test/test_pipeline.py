@@ -0,0 +1,159 @@
+import json
+import os
+import unittest
+from unittest.mock import Mock, patch
+from services.instrumentation import Instrumentation
+from services.pipeline import AuthMiddleware, MetricsMiddleware, MessageErrors, RequestPipeline, RetryMiddleware
+from services.resilience import RetryPolicy
+from services.transport import HttpTransport
+from services.admin import AdminService
+from services.documents import DocumentService
+from services.workspace import WorkspaceService
+from services.workspacethread import WorkspaceThreadService
+from test.local_server import LocalServerMixin, RouteHandler
+
+# app/test/test_pipeline.py
+
+class _Handler(RouteHandler):
+    def _reply(self):
+        self.server.calls.append((self.command, self.path, self.headers.get("Authorization")))
+        self.read_body()
+        # /flaky échoue une fois sur deux (503 + Retry-After: 0) ; /missing répond toujours 404
+        flaky_attempts = sum(1 for _, path, _ in self.server.calls if path == "/api/v1/flaky")
+        if self.path == "/api/v1/missing":
+            status, payload = 404, {"message": "not found"}
+        elif self.path == "/api/v1/flaky" and flaky_attempts % 2 == 1:
+            status, payload = 503, {"message": "unavailable"}
+        elif self.path == "/api/v1/invalid":
+            status, payload = 200, None
+        else:
+            status, payload = 200, {"path": self.path}
+        body = b"not json" if payload is None else json.dumps(payload).encode()
+        self.send_body(body, status, headers={"Retry-After": "0"} if status == 503 else None)
+
+    do_GET = _reply
+    do_POST = _reply
+    do_DELETE = _reply
+
+
+class TestRequestPipeline(LocalServerMixin, unittest.TestCase):
+    handler = _Handler
+
+    @classmethod
+    def configure_server(cls, server):
+        server.calls = []
+
+    def setUp(self):
+        self.server.calls.clear()
+        self.transport = HttpTransport()
+        self.auth_service = Mock()
+        self.auth_service.auth.return_value = ({"authenticated": True}, 200)
+        self.env = patch.dict(os.environ, {"BASE_URL": self.base_url})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.transport.close()
+
+    def test_service_calls_authenticate_then_send_bearer_token(self):
+        service = WorkspaceService(auth_service=self.auth_service, transport=self.transport)
+        response, status_code = service.get_workspace_by_slug("docs", "token")
+        self.assertEqual((response, status_code), ({"path": "/api/v1/workspace/docs"}, 200))
+        self.auth_service.auth.assert_called_once_with(Authorization="token")
+        self.assertEqual(self.server.calls, [("GET", "/api/v1/workspace/docs", "Bearer token")])
+
+    def test_failed_authentication_stops_the_call(self):
+        self.auth_service.auth.return_value = ({"message": "invalid"}, 403)
+        service = WorkspaceService(auth_service=self.auth_service, transport=self.transport)
+        response, status_code = service.list_workspaces("bad")
+        self.assertEqual(status_code, 403)
+        self.assertEqual(response, {"error": "Authentication failed", "details": {"message": "invalid"}})
+        self.assertEqual(self.server.calls, [])
+
+    def test_admin_and_document_services_authenticate_in_the_pipeline(self):
+        seen = []
+
+        def recording(context, call_next):
+            seen.append(context.authenticate)
+            return call_next(context)
+
+        pipeline = RequestPipeline(self.transport, self.auth_service, [recording, AuthMiddleware(self.auth_service)])
+        self.auth_service.auth.return_value = ({"message": "invalid"}, 403)
+        for call in (AdminService(pipeline=pipeline).list_users, DocumentService(pipeline=pipeline).list_documents):
+            response, status_code = call("bad")
+            self.assertEqual((response, status_code), ({"error": "Authentication failed", "details": {"message": "invalid"}}, 403))
+        self.assertEqual(seen, [True, True])
+        self.assertEqual(self.auth_service.auth.call_count, 2)
+        self.assertEqual(self.server.calls, [])
+
+    def test_error_formats(self):
+        pipeline = RequestPipeline(self.transport, self.auth_service)
+        response, status_code = pipeline.send("GET", f"{self.base_url}/v1/missing", "token")
+        self.assertEqual(status_code, 404)
+        self.assertEqual(response["error"], "HTTP error occurred")
+
+        response, status_code = pipeline.send("GET", f"{self.base_url}/v1/missing", "token", errors=MessageErrors)
+        self.assertEqual((response, status_code), ({"error": "HTTP Error: not found"}, 404))
+
+        response, status_code = pipeline.send("GET", "http://127.0.0.1:1/v1/down", "token")
+        self.assertEqual(status_code, 500)
+        self.assertEqual(response["error"], "Request exception occurred")
+
+    def test_success_payload_replaces_decoding(self):
+        service = WorkspaceThreadService(auth_service=self.auth_service, transport=self.transport)
+        response, status_code = service.delete_thread("docs", "t1", "token")
+        self.assertEqual((response, status_code), ({"message": "Thread deleted successfully"}, 200))
+
+    def test_custom_decode_errors_are_reported(self):
+        pipeline = RequestPipeline(self.transport, self.auth_service)
+
+        def decode(response, context):
+            raise ValueError("bad payload")
+
+        response, status_code = pipeline.send(
+            "GET", f"{self.base_url}/v1/workspaces", "token", decode=decode, decode_error="Invalid workspaces"
+        )
+        self.assertEqual((response, status_code), ({"error": "Invalid workspaces", "details": "bad payload"}, 502))
+
+    def test_invalid_json_is_a_decode_error_and_is_not_retried(self):
+        sleeps = []
+        pipeline = RequestPipeline(self.transport, self.auth_service)
+        pipeline.use(RetryMiddleware(RetryPolicy(jitter=False), sleep=sleeps.append))
+        response, status_code = pipeline.send("GET", f"{self.base_url}/v1/invalid", "token")
+        self.assertEqual(status_code, 502)
+        self.assertEqual(response["error"], "Invalid response")
+        self.assertEqual((sleeps, len(self.server.calls)), ([], 1))
+
+    def test_shared_pipeline_runs_extra_middlewares_in_order(self):
+        order = []
+
+        def tracing(name):
+            def middleware(context, call_next):
+                order.append(name)
+                return call_next(context)
+            return middleware
+
+        pipeline = RequestPipeline(self.transport, self.auth_service).use(tracing("first")).use(tracing("second"))
+        workspaces = WorkspaceService(pipeline=pipeline)
+        admin = AdminService(pipeline=pipeline)
+        self.assertIs(workspaces.transport, self.transport)
+        workspaces.list_workspaces("token")
+        admin.list_invites("token")
+        self.assertEqual(order, ["first", "second", "first", "second"])
+
+    def test_retry_and_metrics_middlewares(self):
+        instrumentation = Instrumentation()
+        sleeps = []
+        pipeline = RequestPipeline(self.transport, self.auth_service)
+        pipeline.use(MetricsMiddleware(instrumentation)).use(RetryMiddleware(RetryPolicy(jitter=False), sleep=sleeps.append))
+        response, status_code = pipeline.send("GET", f"{self.base_url}/v1/flaky", "token")
+        self.assertEqual(status_code, 200)
+        self.assertEqual(sleeps, [0.0])
+        self.assertEqual(len(self.server.calls), 2)
+        calls = instrumentation.snapshot()["calls"]
+        self.assertEqual(sum(entry["count"] for entry in calls.values()), 1)
+        self.assertIn("anythingllm_call_duration_seconds", instrumentation.export_prometheus())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from services.async_transport import AsyncHttpTransport
+from services.rate_limit import RateLimit, RateLimiter, TokenBucket, endpoint_family
+from services.transport import HttpTransport
+from test.local_server import LocalServerMixin, RouteHandler
+
+# app/test/test_rate_limit.py
+
+class _Handler(RouteHandler):
+    def do_POST(self):
+        self.read_body()
+        with self.server.lock:
+            self.server.in_flight += 1
+            self.server.max_in_flight = max(self.server.max_in_flight, self.server.in_flight)
+        time.sleep(0.05)
+        with self.server.lock:
+            self.server.in_flight -= 1
+        self.send_json({"textResponse": "ok"})
+
+
+class TestRateLimiter(LocalServerMixin, unittest.TestCase):
+    handler = _Handler
+    base_path = ""
+
+    @classmethod
+    def configure_server(cls, server):
+        server.lock = threading.Lock()
+
+    def setUp(self):
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+
+    def test_endpoint_family(self):
+        self.assertEqual(endpoint_family("http://h/api/v1/workspace/a/chat"), "chat")
+        self.assertEqual(endpoint_family("http://h/api/v1/workspace/a/thread/t/stream-chat"), "chat")
+        self.assertEqual(endpoint_family("http://h/api/v1/openai/chat/completions"), "chat")
+        self.assertEqual(endpoint_family("http://h/v1/workspace/a/chats"), "default")
+        self.assertEqual(endpoint_family("http://h/v1/openai/embeddings"), "embeddings")
+        self.assertEqual(endpoint_family("http://h/v1/document/upload"), "documents")
+        self.assertEqual(endpoint_family("http://h/v1/admin/users"), "admin")
+        self.assertEqual(endpoint_family("http://localhost:8000/api/v1/document/upload"), "documents")
+
+    def test_token_bucket_spaces_requests(self):
+        bucket = TokenBucket(rate=10, burst=2)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 0.1, delta=0.02)
+        self.assertAlmostEqual(bucket.reserve(), 0.2, delta=0.02)
+
+    def test_unknown_family_is_rejected(self):
+        with self.assertRaises(ValueError):
+            RateLimiter({"chats": RateLimit(rate=1)})
+
+    def test_rate_is_per_token(self):
+        limiter = RateLimiter({"chat": RateLimit(rate=5, burst=1)})
+        url = f"{self.base_url}/v1/workspace/a/chat"
+        limiter.acquire(url, {"Authorization": "Bearer one"}).release()
+        self.assertLess(limiter.acquire(url, {"Authorization": "Bearer two"}).wait_time, 0.05)
+        self.assertGreater(limiter.acquire(url, {"Authorization": "Bearer one"}).wait_time, 0.1)
+        stats = limiter.stats()["chat"]
+        self.assertEqual(stats["acquired"], 3)
+        self.assertEqual(stats["waiting"], 0)
+        self.assertGreater(stats["wait_max"], 0.1)
+
+    def test_max_in_flight_caps_concurrent_requests(self):
+        limiter = RateLimiter({"chat": RateLimit(max_in_flight=2)})
+        with HttpTransport(pool_maxsize=8, rate_limiter=limiter) as transport:
+            url = f"{self.base_url}/v1/workspace/a/chat"
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                statuses = list(executor.map(
+                    lambda _: transport.post(url, json={}, headers={"Authorization": "Bearer t"}).status_code, range(8)
+                ))
+        self.assertEqual(statuses, [200] * 8)
+        self.assertEqual(self.server.max_in_flight, 2)
+        self.assertGreater(limiter.stats()["chat"]["wait_total"], 0)
+
+    def test_async_max_in_flight(self):
+        limiter = RateLimiter(default=RateLimit(max_in_flight=3))
+
+        async def run():
+            async with AsyncHttpTransport(rate_limiter=limiter) as transport:
+                url = f"{self.base_url}/v1/workspace/a/update"
+                responses = await asyncio.gather(*[transport.post(url, json={}) for _ in range(9)])
+                return [response.status_code for response in responses]
+
+        self.assertEqual(asyncio.run(run()), [200] * 9)
+        self.assertEqual(self.server.max_in_flight, 3)
+        self.assertEqual(limiter.stats()["default"]["acquired"], 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,164 @@
+import asyncio
+import time
+import unittest
+import httpx
+import requests
+from services.async_transport import AsyncCircuitOpenError, AsyncHttpTransport
+from services.resilience import CircuitBreaker, CircuitOpenError, RetryPolicy
+from services.transport import HttpTransport
+from test.local_server import LocalServerMixin, RouteHandler
+
+# app/test/test_resilience.py
+
+class _Handler(RouteHandler):
+    def _reply(self):
+        self.server.calls.append((self.command, self.path))
+        self.read_body()
+        if self.path == "/slow":
+            time.sleep(1)
+        # /flaky/N échoue N fois (503 + Retry-After: 0) puis répond 200 ; /down répond toujours 503
+        failures = int(self.path.rsplit("/", 1)[1]) if self.path.startswith("/flaky/") else None
+        attempts = sum(1 for _, path in self.server.calls if path == self.path)
+        if self.path == "/down" or (failures is not None and attempts <= failures):
+            status, payload = 503, {"message": "unavailable"}
+        else:
+            status, payload = 200, {"attempts": attempts}
+        self.send_json(payload, status, headers={"Retry-After": "0"} if status == 503 else None)
+
+    do_GET = _reply
+    do_POST = _reply
+
+
+class _ServerTestMixin(LocalServerMixin):
+    handler = _Handler
+    base_path = ""
+
+    @classmethod
+    def configure_server(cls, server):
+        server.calls = []
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_backoff_is_exponential_and_capped(self):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=5, jitter=False)
+        self.assertEqual([policy.backoff(attempt) for attempt in range(1, 5)], [1, 2, 4, 5])
+        jittered = RetryPolicy(backoff_factor=1, max_backoff=5)
+        self.assertTrue(all(0 <= jittered.backoff(3) <= 4 for _ in range(20)))
+
+    def test_parse_retry_after(self):
+        self.assertEqual(RetryPolicy.parse_retry_after("7"), 7.0)
+        self.assertEqual(RetryPolicy.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+        self.assertIsNone(RetryPolicy.parse_retry_after("soon"))
+        self.assertIsNone(RetryPolicy.parse_retry_after(None))
+
+    def test_non_idempotent_methods_only_retry_connect_errors(self):
+        policy = RetryPolicy(jitter=False)
+        self.assertIsNone(policy.delay_for_error(1, "POST"))
+        self.assertIsNotNone(policy.delay_for_error(1, "POST", connect_error=True))
+        self.assertIsNotNone(policy.delay_for_error(1, "GET"))
+        self.assertIsNone(policy.delay_for_error(3, "GET"))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    def test_opens_after_threshold_and_probes_after_timeout(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0)
+        breaker.record_failure("api")
+        breaker.before_request("api")
+        breaker.record_failure("api")
+        self.assertEqual(breaker.state("api"), CircuitBreaker.HALF_OPEN)
+        # Une seule requête d'essai passe, la suivante échoue immédiatement
+        breaker.before_request("api")
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request("api")
+        breaker.record_success("api")
+        self.assertEqual(breaker.state("api"), CircuitBreaker.CLOSED)
+
+    def test_interrupted_probe_is_released(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure("api")
+        self.assertTrue(breaker.before_request("api"))
+        breaker.release_probe("api")
+        # Pas d'échec compté : un nouvel essai passe immédiatement
+        self.assertTrue(breaker.before_request("api"))
+        with self.assertRaises(CircuitOpenError):
+            breaker.before_request("api")
+
+    def test_open_circuit_fails_fast(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+        breaker.record_response("api", 503)
+        with self.assertRaises(CircuitOpenError) as ctx:
+            breaker.before_request("api")
+        self.assertIsInstance(ctx.exception, requests.exceptions.RequestException)
+        breaker.before_request("other-host")
+
+
+class TestHttpTransportPolicy(_ServerTestMixin, unittest.TestCase):
+    def setUp(self):
+        self.server.calls.clear()
+
+    def test_transient_errors_are_retried(self):
+        with HttpTransport(retry_policy=RetryPolicy(max_attempts=3, jitter=False)) as transport:
+            response = transport.get(f"{self.base_url}/flaky/2")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.json(), {"attempts": 3})
+            self.assertEqual(transport.retries, 2)
+
+    def test_post_is_not_retried(self):
+        with HttpTransport(retry_policy=RetryPolicy(jitter=False)) as transport:
+            response = transport.post(f"{self.base_url}/flaky/1", json={})
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(len(self.server.calls), 1)
+
+    def test_long_retry_after_is_not_waited(self):
+        policy = RetryPolicy(max_retry_after=10)
+        response = requests.Response()
+        response.status_code = 429
+        response.headers["Retry-After"] = "120"
+        self.assertIsNone(policy.delay_for_response(1, "GET", response))
+
+    def test_breaker_stops_calling_a_down_host(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+        with HttpTransport(circuit_breaker=breaker) as transport:
+            for _ in range(2):
+                self.assertEqual(transport.get(f"{self.base_url}/down").status_code, 503)
+            with self.assertRaises(CircuitOpenError):
+                transport.get(f"{self.base_url}/flaky/0")
+        self.assertEqual(len(self.server.calls), 2)
+
+
+class TestAsyncHttpTransportPolicy(_ServerTestMixin, unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.server.calls.clear()
+
+    async def test_transient_errors_are_retried(self):
+        async with AsyncHttpTransport(max_concurrency=1, retry_policy=RetryPolicy(jitter=False)) as transport:
+            response = await transport.get(f"{self.base_url}/flaky/1")
+            self.assertEqual(response.json(), {"attempts": 2})
+            self.assertEqual(transport.retries, 1)
+            # La place de concurrence a bien été rendue
+            self.assertEqual(transport._semaphore._value, 1)
+
+    async def test_breaker_raises_httpx_error(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+        async with AsyncHttpTransport(max_concurrency=1, circuit_breaker=breaker) as transport:
+            await transport.get(f"{self.base_url}/down")
+            with self.assertRaises(AsyncCircuitOpenError) as ctx:
+                await transport.get(f"{self.base_url}/down")
+            self.assertIsInstance(ctx.exception, httpx.RequestError)
+            self.assertEqual(transport._semaphore._value, 1)
+
+    async def test_cancelled_probe_lets_the_next_call_probe(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        async with AsyncHttpTransport(circuit_breaker=breaker) as transport:
+            await transport.get(f"{self.base_url}/down")
+            probe = asyncio.ensure_future(transport.get(f"{self.base_url}/slow"))
+            await asyncio.sleep(0.2)
+            probe.cancel()
+            await asyncio.gather(probe, return_exceptions=True)
+            response = await transport.get(f"{self.base_url}/flaky/0")
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(breaker.state(breaker.host_of(self.base_url)), CircuitBreaker.CLOSED)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import os
+import unittest
+from unittest.mock import Mock, patch
+from services.pipeline import RequestPipeline
+from services.response_cache import CacheMiddleware, ResponseCache, invalidated_prefixes, split_api_url
+from services.transport import HttpTransport
+from services.admin import AdminService
+from services.openai_compatible_service import OpenAICompatibleService
+from services.usermanagement import UserManagementService
+from services.workspace import WorkspaceService
+from test.local_server import LocalServerMixin, RouteHandler
+
+# app/test/test_response_cache.py
+
+class _Handler(RouteHandler):
+    def _reply(self):
+        self.server.calls.append((self.command, self.path))
+        self.read_body()
+        version = self.server.version
+        etag = f'"v{version}"'
+        if self.command == "GET" and self.headers.get("If-None-Match") == etag:
+            self.send_body(b"", 304, headers={"ETag": etag})
+            return
+        if self.command != "GET":
+            self.server.version += 1
+        self.send_json({"path": self.path, "version": version}, headers={"ETag": etag})
+
+    do_GET = _reply
+    do_POST = _reply
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_paths_and_invalidation_rules(self):
+        self.assertEqual(split_api_url("http://host:3001/api/v1/workspaces"), ("http://host:3001/api", "/v1/workspaces"))
+        self.assertIn("/v1/openai/models", invalidated_prefixes("/v1/workspace/docs/update"))
+        self.assertEqual(invalidated_prefixes("/v1/workspace/docs/chat"), ("/v1/workspace/docs/chats",))
+        self.assertIn("/v1/document", invalidated_prefixes("/v1/document/move-files"))
+        self.assertIn("/v1/users", invalidated_prefixes("/v1/admin/users/new"))
+        self.assertEqual(invalidated_prefixes("/v1/auth"), ())
+
+    def test_lru_eviction_by_entries_and_bytes(self):
+        cache = ResponseCache(default_ttl=60, max_entries=2, max_bytes=100)
+        for name in ("a", "b"):
+            cache.store(name, f"http://host/api/v1/{name}", {"name": name}, 200, 10)
+        cache.lookup("a")
+        cache.store("c", "http://host/api/v1/c", {"name": "c"}, 200, 10)
+        self.assertEqual(cache.lookup("b"), (None, False))
+        self.assertTrue(cache.lookup("a")[1])
+        cache.store("big", "http://host/api/v1/big", {}, 200, 95)
+        self.assertEqual(len(cache), 1)
+        cache.store("huge", "http://host/api/v1/huge", {}, 200, 101)
+        self.assertEqual(cache.lookup("huge"), (None, False))
+        self.assertEqual(cache.stats()["evictions"], 3)
+
+    def test_ttl_per_endpoint(self):
+        cache = ResponseCache(ttls={"/v1/workspace/{slug}": 5})
+        self.assertEqual(cache.ttl_for("http://host/api/v1/workspace/docs"), 5)
+        self.assertEqual(cache.ttl_for("http://host/api/v1/workspaces"), 30)
+        self.assertEqual(cache.ttl_for("http://host/api/v1/workspace/docs/chats"), 0)
+
+
+class TestCacheMiddleware(LocalServerMixin, unittest.TestCase):
+    handler = _Handler
+
+    @classmethod
+    def configure_server(cls, server):
+        server.calls = []
+
+    def setUp(self):
+        self.server.calls = []
+        self.server.version = 1
+        self.transport = HttpTransport()
+        self.auth_service = Mock()
+        self.auth_service.auth.return_value = ({"authenticated": True}, 200)
+        self.clock = _Clock()
+        self.cache = ResponseCache(ttls={"/v1/users": 30}, clock=self.clock)
+        self.pipeline = RequestPipeline(self.transport, self.auth_service).use(CacheMiddleware(self.cache))
+        self.env = patch.dict(os.environ, {"BASE_URL": self.base_url})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.transport.close()
+
+    def test_fresh_entries_skip_the_round_trip(self):
+        service = WorkspaceService(pipeline=self.pipeline)
+        first = service.list_workspaces("token")
+        first[0]["version"] = "mutated"
+        second = service.list_workspaces("token")
+        self.assertEqual(second, ({"path": "/api/v1/workspaces", "version": 1}, 200))
+        self.assertEqual(len(self.server.calls), 1)
+        # Un autre token ne partage pas l'entrée
+        service.list_workspaces("other")
+        self.assertEqual(len(self.server.calls), 2)
+
+    def test_expired_entries_are_revalidated_with_etag(self):
+        service = WorkspaceService(pipeline=self.pipeline)
+        service.get_workspace_by_slug("docs", "token")
+        self.clock.now = 31
+        response, status_code = service.get_workspace_by_slug("docs", "token")
+        self.assertEqual((response["version"], status_code), (1, 200))
+        self.assertEqual(self.cache.stats()["revalidated"], 1)
+        self.assertEqual(len(self.server.calls), 2)
+        # La revalidation prolonge l'entrée
+        service.get_workspace_by_slug("docs", "token")
+        self.assertEqual(len(self.server.calls), 2)
+
+    def test_writes_invalidate_related_entries_across_services(self):
+        workspaces = WorkspaceService(pipeline=self.pipeline)
+        openai = OpenAICompatibleService(pipeline=self.pipeline)
+        workspaces.list_workspaces("token")
+        openai.list_models("token")
+        workspaces.update_workspace("docs", {"name": "Docs"}, "token")
+        response, _ = workspaces.list_workspaces("token")
+        self.assertEqual(response["version"], 2)
+        openai.list_models("token")
+        self.assertEqual([method for method, _ in self.server.calls], ["GET", "GET", "POST", "GET", "GET"])
+
+    def test_create_user_invalidates_user_lists(self):
+        users = UserManagementService(pipeline=self.pipeline)
+        admin = AdminService(pipeline=self.pipeline)
+        users.list_users("token")
+        users.list_users("token")
+        admin.create_user("alice", "secret", "default", "token")
+        response, _ = users.list_users("token")
+        self.assertEqual(response["version"], 2)
+        self.assertEqual(len(self.server.calls), 3)
+
+    def test_uncached_endpoints_pass_through(self):
+        service = WorkspaceService(pipeline=self.pipeline)
+        service.get_workspace_chats("docs", "token")
+        service.get_workspace_chats("docs", "token")
+        self.assertEqual(len(self.server.calls), 2)
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+import unittest
+from services.async_transport import AsyncHttpTransport
+from services.scheduler import BACKGROUND, INTERACTIVE, RequestScheduler, request_priority
+from services.transport import HttpTransport
+from test.local_server import LocalServerMixin, RouteHandler
+
+# app/test/test_scheduler.py
+
+CHAT_URL = "http://backend/api/v1/workspace/a/thread/t/chat"
+UPLOAD_URL = "http://backend/api/v1/document/upload"
+
+
+class _Handler(RouteHandler):
+    def do_POST(self):
+        self.read_body()
+        self.send_json({"path": self.path})
+
+
+class TestRequestScheduler(unittest.TestCase):
+    def _queue_in_order(self, scheduler, urls, order):
+        """
+        Met en file un thread par URL, dans l'ordre donné, et retourne les threads.
+        """
+        threads = []
+        for index, url in enumerate(urls):
+            def run(url=url, index=index):
+                grant = scheduler.acquire(url)
+                order.append(index)
+                grant.release()
+            thread = threading.Thread(target=run)
+            thread.start()
+            threads.append(thread)
+            while sum(stats["queued"] for stats in scheduler.stats().values()) < index + 1:
+                time.sleep(0.001)
+        return threads
+
+    def test_interactive_requests_jump_the_queue(self):
+        scheduler = RequestScheduler(max_in_flight=1)
+        first = scheduler.acquire(UPLOAD_URL)
+        order = []
+        threads = self._queue_in_order(scheduler, [UPLOAD_URL, UPLOAD_URL, UPLOAD_URL, CHAT_URL], order)
+        first.release()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(order[0], 3)
+        self.assertEqual(scheduler.in_flight, 0)
+        self.assertEqual(scheduler.stats()[INTERACTIVE]["dispatched"], 1)
+        self.assertEqual(scheduler.stats()[BACKGROUND]["dispatched"], 4)
+
+    def test_background_is_not_starved(self):
+        scheduler = RequestScheduler(max_in_flight=1, weights={INTERACTIVE: 2, "default": 1, BACKGROUND: 1})
+        first = scheduler.acquire(UPLOAD_URL)
+        order = []
+        urls = [CHAT_URL] * 6 + [UPLOAD_URL] * 3
+        threads = self._queue_in_order(scheduler, urls, order)
+        first.release()
+        for thread in threads:
+            thread.join()
+        # Poids 2:1 : les envois d'arrière-plan sont intercalés entre les chats
+        served = ["chat" if index < 6 else "upload" for index in order]
+        self.assertIn("upload", served[:3])
+        self.assertEqual(served.count("upload"), 3)
+
+    def test_request_priority_overrides_classification(self):
+        scheduler = RequestScheduler()
+        self.assertEqual(scheduler.priority_of(UPLOAD_URL), BACKGROUND)
+        with request_priority(INTERACTIVE):
+            self.assertEqual(scheduler.priority_of(UPLOAD_URL), INTERACTIVE)
+        with request_priority("urgent"), self.assertRaises(ValueError):
+            scheduler.priority_of(UPLOAD_URL)
+
+    def test_cancelled_waiter_leaves_the_queue(self):
+        async def run():
+            scheduler = RequestScheduler(max_in_flight=1)
+            grant = await scheduler.acquire_async(CHAT_URL)
+            waiting = asyncio.ensure_future(scheduler.acquire_async(UPLOAD_URL))
+            await asyncio.sleep(0.01)
+            waiting.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiting
+            grant.release()
+            return scheduler.in_flight
+
+        self.assertEqual(asyncio.run(run()), 0)
+
+
+class TestSchedulerTransports(LocalServerMixin, unittest.TestCase):
+    handler = _Handler
+    base_path = ""
+
+    def test_sync_and_async_transports_share_the_scheduler(self):
+        scheduler = RequestScheduler(max_in_flight=2)
+        with HttpTransport(scheduler=scheduler) as transport:
+            self.assertEqual(transport.post(f"{self.base_url}/v1/workspace/a/chat", json={}).status_code, 200)
+            response = transport.post(f"{self.base_url}/v1/workspace/a/stream-chat", json={}, stream=True)
+            self.assertEqual(scheduler.in_flight, 1)
+            response.close()
+            self.assertEqual(scheduler.in_flight, 0)
+
+        async def run():
+            async with AsyncHttpTransport(scheduler=scheduler) as transport:
+                responses = await asyncio.gather(*[
+                    transport.post(f"{self.base_url}/v1/document/upload", json={}) for _ in range(6)
+                ])
+                return [response.status_code for response in responses]
+
+        self.assertEqual(asyncio.run(run()), [200] * 6)
+        self.assertEqual(scheduler.in_flight, 0)
+        self.assertEqual(scheduler.stats()[BACKGROUND]["dispatched"], 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
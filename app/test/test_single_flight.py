@@ -0,0 +1,139 @@
+import asyncio
+import os
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock, Mock, patch
+from services.async_services import AsyncWorkspaceService
+from services.async_transport import AsyncHttpTransport
+from services.pipeline import RequestPipeline
+from services.single_flight import AsyncSingleFlight, SingleFlight, SingleFlightMiddleware
+from services.transport import HttpTransport
+from services.workspace import WorkspaceService
+from test.local_server import LocalServerMixin, RouteHandler
+
+# app/test/test_single_flight.py
+
+class _Handler(RouteHandler):
+    def _reply(self):
+        self.server.calls.append((self.command, self.path))
+        self.read_body()
+        # Réponse lente pour laisser les appels simultanés se chevaucher
+        time.sleep(0.2)
+        self.send_json({"path": self.path})
+
+    do_GET = _reply
+    do_POST = _reply
+
+
+class _ServerTestMixin(LocalServerMixin):
+    handler = _Handler
+
+    @classmethod
+    def configure_server(cls, server):
+        server.calls = []
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        single_flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        executions = []
+
+        def fetch():
+            executions.append(1)
+            started.set()
+            release.wait()
+            return {"items": [1, 2]}
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            leader = executor.submit(single_flight.do, "key", fetch)
+            started.wait()
+            followers = [executor.submit(single_flight.do, "key", fetch) for _ in range(4)]
+            while single_flight.coalesced < 4:
+                time.sleep(0.01)
+            release.set()
+            results = [leader.result()] + [future.result() for future in followers]
+        self.assertEqual(len(executions), 1)
+        self.assertTrue(all(result == {"items": [1, 2]} for result in results))
+        # Chaque appelant a sa propre copie
+        self.assertEqual(len({id(result) for result in results}), 5)
+        self.assertEqual(single_flight.stats(), {"calls": 1, "coalesced": 4, "in_flight": 0})
+
+    def test_errors_are_shared_and_key_is_released(self):
+        single_flight = SingleFlight()
+        with self.assertRaises(RuntimeError):
+            single_flight.do("key", Mock(side_effect=RuntimeError("boom")))
+        self.assertEqual(single_flight.do("key", lambda: 1), 1)
+
+
+class TestSingleFlightMiddleware(_ServerTestMixin, unittest.TestCase):
+    def setUp(self):
+        self.server.calls.clear()
+        self.transport = HttpTransport(pool_maxsize=20)
+        auth_service = Mock()
+        auth_service.auth.return_value = ({"authenticated": True}, 200)
+        self.pipeline = RequestPipeline(self.transport, auth_service).use(SingleFlightMiddleware())
+        self.env = patch.dict(os.environ, {"BASE_URL": self.base_url})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        self.transport.close()
+
+    def test_identical_gets_from_many_threads_make_one_request(self):
+        service = WorkspaceService(pipeline=self.pipeline)
+        with ThreadPoolExecutor(max_workers=20) as executor:
+            results = list(executor.map(lambda _: service.get_workspace_by_slug("docs", "token"), range(20)))
+        self.assertTrue(all(result == ({"path": "/api/v1/workspace/docs"}, 200) for result in results))
+        self.assertEqual(self.server.calls, [("GET", "/api/v1/workspace/docs")])
+
+    def test_different_tokens_and_writes_are_not_coalesced(self):
+        service = WorkspaceService(pipeline=self.pipeline)
+        calls = [
+            lambda: service.get_workspace_by_slug("docs", "a"),
+            lambda: service.get_workspace_by_slug("docs", "b"),
+            lambda: service.update_workspace("docs", {}, "a"),
+            lambda: service.update_workspace("docs", {}, "a")
+        ]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda call: call(), calls))
+        self.assertEqual(len(self.server.calls), 4)
+
+
+class TestAsyncSingleFlight(_ServerTestMixin, unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server.calls.clear()
+        self.transport = AsyncHttpTransport()
+        self.auth_service = Mock()
+        self.auth_service.auth = AsyncMock(return_value=({"authenticated": True}, 200))
+        self.env = patch.dict(os.environ, {"BASE_URL": self.base_url})
+        self.env.start()
+
+    async def asyncTearDown(self):
+        self.env.stop()
+        await self.transport.aclose()
+
+    async def test_identical_gets_share_one_request(self):
+        single_flight = AsyncSingleFlight()
+        service = AsyncWorkspaceService(auth_service=self.auth_service, transport=self.transport, single_flight=single_flight)
+        results = await asyncio.gather(*[service.get_workspace_by_slug("docs", "token") for _ in range(50)])
+        self.assertTrue(all(result == ({"path": "/api/v1/workspace/docs"}, 200) for result in results))
+        self.assertEqual(len(self.server.calls), 1)
+        self.assertEqual(single_flight.stats(), {"calls": 1, "coalesced": 49, "in_flight": 0})
+
+    async def test_cancelled_caller_does_not_cancel_the_shared_call(self):
+        single_flight = AsyncSingleFlight()
+        service = AsyncWorkspaceService(auth_service=self.auth_service, transport=self.transport, single_flight=single_flight)
+        first = asyncio.ensure_future(service.get_workspace_by_slug("docs", "token"))
+        second = asyncio.ensure_future(service.get_workspace_by_slug("docs", "token"))
+        await asyncio.sleep(0.05)
+        first.cancel()
+        self.assertEqual(await second, ({"path": "/api/v1/workspace/docs"}, 200))
+        self.assertEqual(len(self.server.calls), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import json
+import unittest
+from unittest.mock import Mock
+from services.sse import SSEParser, ChatEventStream, TextDeltaEvent, SourcesEvent, CloseEvent, ErrorEvent
+
+# app/test/test_sse.py
+
+def frame(**data):
+    return b"data: " + json.dumps(data).encode() + b"\n\n"
+
+
+class TestSSEParser(unittest.TestCase):
+    def test_frames_split_across_chunks(self):
+        payload = frame(type="textResponseChunk", textResponse="Bon") + frame(type="textResponseChunk", textResponse="jour")
+        parser = SSEParser()
+        events = []
+        for i in range(0, len(payload), 7):
+            events.extend(parser.feed(payload[i:i + 7]))
+        self.assertEqual([e.text for e in events], ["Bon", "jour"])
+
+    def test_crlf_and_final_frame(self):
+        parser = SSEParser()
+        events = parser.feed(b'data: {"type":"textResponseChunk","textResponse":"a","sources":[{"title":"doc"}],"close":true}\r\n\r\n')
+        self.assertEqual([type(e) for e in events], [TextDeltaEvent, SourcesEvent, CloseEvent])
+        self.assertEqual(events[1].sources, [{"title": "doc"}])
+
+    def test_abort_and_invalid_frames(self):
+        parser = SSEParser()
+        events = parser.feed(frame(type="abort", textResponse=None, error="LLM unavailable", close=True))
+        events += parser.feed(b"data: {not json\n\n")
+        self.assertIsInstance(events[0], ErrorEvent)
+        self.assertEqual(events[0].error, "LLM unavailable")
+        self.assertIsInstance(events[1], ErrorEvent)
+
+    def test_unterminated_last_frame(self):
+        parser = SSEParser()
+        self.assertEqual(parser.feed(b'data: {"type":"finalizeResponseStream","close":true}'), [])
+        self.assertIsInstance(parser.close()[0], CloseEvent)
+
+
+class TestChatEventStream(unittest.TestCase):
+    def test_stream_metrics_and_close(self):
+        response = Mock(status_code=200)
+        response.iter_content.return_value = iter([
+            frame(type="textResponseChunk", textResponse="Hello"),
+            frame(type="textResponseChunk", textResponse=" world"),
+            frame(type="finalizeResponseStream", close=True)
+        ])
+        stream = ChatEventStream(response)
+        self.assertEqual(stream.text(), "Hello world")
+        self.assertEqual(stream.metrics.tokens, 2)
+        self.assertIsNotNone(stream.metrics.time_to_first_token)
+        response.close.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
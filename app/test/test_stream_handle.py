@@ -0,0 +1,163 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+from services.async_services import AsyncWorkspaceService
+from services.async_transport import AsyncHttpTransport
+from services.sse import ErrorEvent
+from services.transport import HttpTransport
+from services.workspace import WorkspaceService
+from test.local_server import LocalServerMixin, RouteHandler
+
+# app/test/test_stream_handle.py
+
+def frame(**data):
+    return b"data: " + json.dumps(data).encode() + b"\n\n"
+
+
+class _Handler(RouteHandler):
+    def do_POST(self):
+        self.read_body()
+        slug = self.path.split("/")[-2]
+        self.start_chunked()
+        try:
+            if slug == "short":
+                for text in "abc":
+                    self.send_chunk(frame(type="textResponseChunk", textResponse=text))
+                self.send_chunk(frame(type="finalizeResponseStream", close=True))
+            elif slug == "stall":
+                self.send_chunk(frame(type="textResponseChunk", textResponse="a"))
+                time.sleep(1.5)
+                self.send_chunk(frame(type="finalizeResponseStream", close=True))
+            else:
+                # Flux sans fin : s'arrête quand le client coupe la connexion
+                for index in range(2000):
+                    self.send_chunk(frame(type="textResponseChunk", textResponse=f"{index} "))
+                    time.sleep(0.005)
+            self.end_chunked()
+        except OSError:
+            self.server.disconnected.set()
+            self.close_connection = True
+
+
+class _ServerTestMixin(LocalServerMixin):
+    handler = _Handler
+
+    def reset_server(self):
+        self.server.disconnected = threading.Event()
+
+
+class TestChatEventStreamHandle(_ServerTestMixin, unittest.TestCase):
+    def setUp(self):
+        self.reset_server()
+        self.transport = HttpTransport()
+        auth_service = Mock()
+        auth_service.auth.return_value = ({"authenticated": True}, 200)
+        self.env = patch.dict(os.environ, {"BASE_URL": self.base_url})
+        self.env.start()
+        self.service = WorkspaceService(auth_service=auth_service, transport=self.transport)
+
+    def tearDown(self):
+        self.env.stop()
+        self.transport.close()
+
+    def test_context_manager_closes_the_connection(self):
+        stream, status_code = self.service.stream_chat_with_workspace("endless", {"message": "hi"}, "token")
+        self.assertEqual(status_code, 200)
+        with stream:
+            first = next(iter(stream))
+        self.assertEqual(first.text, "0 ")
+        self.assertTrue(stream.closed)
+        self.assertTrue(self.server.disconnected.wait(2))
+
+    def test_cancel_from_another_thread(self):
+        stream, _ = self.service.stream_chat_with_workspace("endless", {"message": "hi"}, "token")
+        threading.Timer(0.2, stream.cancel).start()
+        started_at = time.monotonic()
+        events = list(stream)
+        self.assertLess(time.monotonic() - started_at, 2)
+        self.assertTrue(stream.cancelled)
+        self.assertGreater(len(events), 0)
+        self.assertNotIsInstance(events[-1], ErrorEvent)
+
+    def test_idle_timeout_ends_the_stream_with_an_error(self):
+        started_at = time.monotonic()
+        stream, _ = self.service.stream_chat_with_workspace("stall", {"message": "hi"}, "token", idle_timeout=0.3)
+        events = list(stream)
+        self.assertLess(time.monotonic() - started_at, 1.2)
+        self.assertTrue(stream.timed_out)
+        self.assertEqual(events[0].text, "a")
+        self.assertIsInstance(events[-1], ErrorEvent)
+        self.assertIn("idle", events[-1].error)
+
+    def test_slow_consumer_is_cancelled(self):
+        stream, _ = self.service.stream_chat_with_workspace(
+            "endless", {"message": "hi"}, "token", buffer_size=5, stall_timeout=0.2
+        )
+        events = iter(stream)
+        next(events)
+        time.sleep(0.6)
+        rest = list(events)
+        self.assertTrue(stream.cancelled)
+        self.assertLessEqual(len(rest), 6)
+        self.assertIn("stalled", rest[-1].error)
+        self.assertTrue(self.server.disconnected.wait(2))
+
+    def test_buffered_stream_delivers_every_event(self):
+        stream, _ = self.service.stream_chat_with_workspace("short", {"message": "hi"}, "token", buffer_size=2)
+        self.assertEqual(stream.text(), "abc")
+        self.assertTrue(stream.closed)
+        self.assertFalse(stream.cancelled)
+
+
+class TestAsyncChatEventStreamHandle(_ServerTestMixin, unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.reset_server()
+        self.transport = AsyncHttpTransport(max_concurrency=1)
+        auth_service = Mock()
+        auth_service.auth = AsyncMock(return_value=({"authenticated": True}, 200))
+        self.env = patch.dict(os.environ, {"BASE_URL": self.base_url})
+        self.env.start()
+        self.service = AsyncWorkspaceService(auth_service=auth_service, transport=self.transport)
+
+    async def asyncTearDown(self):
+        self.env.stop()
+        await self.transport.aclose()
+
+    async def test_context_manager_releases_the_slot(self):
+        stream, _ = await self.service.stream_chat_with_workspace("endless", {"message": "hi"}, "token")
+        async with stream:
+            async for event in stream:
+                break
+        self.assertTrue(stream.closed)
+        self.assertTrue(stream.cancelled)
+        # La place de concurrence (max_concurrency=1) est libérée pour le flux suivant
+        stream, _ = await asyncio.wait_for(self.service.stream_chat_with_workspace("short", {"message": "hi"}, "token"), 2)
+        self.assertEqual(await stream.text(), "abc")
+
+    async def test_idle_timeout(self):
+        stream, _ = await self.service.stream_chat_with_workspace("stall", {"message": "hi"}, "token", idle_timeout=0.3)
+        events = [event async for event in stream]
+        self.assertTrue(stream.timed_out)
+        self.assertIsInstance(events[-1], ErrorEvent)
+        self.assertTrue(stream.closed)
+
+    async def test_slow_consumer_is_cancelled(self):
+        stream, _ = await self.service.stream_chat_with_workspace(
+            "endless", {"message": "hi"}, "token", buffer_size=5, stall_timeout=0.2
+        )
+        events = stream.__aiter__()
+        await events.__anext__()
+        await asyncio.sleep(0.6)
+        rest = [event async for event in events]
+        self.assertTrue(stream.cancelled)
+        self.assertLessEqual(len(rest), 6)
+        self.assertIn("stalled", rest[-1].error)
+        self.assertTrue(stream.closed)
+
+
+if __name__ == "__main__":
+    unittest.main()
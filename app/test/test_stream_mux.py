@@ -0,0 +1,124 @@
+import asyncio
+import json
+import os
+import threading
+import time
+import unittest
+from unittest.mock import AsyncMock, Mock, patch
+from services.async_transport import AsyncHttpTransport
+from services.stream_mux import AsyncStreamMultiplexer
+from test.local_server import LocalServerMixin, RouteHandler
+
+# app/test/test_stream_mux.py
+
+def frame(**data):
+    return b"data: " + json.dumps(data).encode() + b"\n\n"
+
+
+class _Handler(RouteHandler):
+    def do_POST(self):
+        self.read_body()
+        thread_slug = self.path.split("/")[-2]
+        if thread_slug == "missing":
+            self.send_json({"error": "Thread not found"}, 404)
+            return
+        self.start_chunked()
+        try:
+            if thread_slug.startswith("short"):
+                for text in "abc":
+                    self.send_chunk(frame(type="textResponseChunk", textResponse=text))
+                    time.sleep(0.01)
+            elif thread_slug.startswith("burst"):
+                for index in range(200):
+                    self.send_chunk(frame(type="textResponseChunk", textResponse=f"{index} "))
+            else:
+                # Flux sans fin : s'arrête quand le client coupe la connexion
+                for index in range(2000):
+                    self.send_chunk(frame(type="textResponseChunk", textResponse=f"{index} "))
+                    time.sleep(0.005)
+            self.send_chunk(frame(type="finalizeResponseStream", close=True))
+            self.end_chunked()
+        except OSError:
+            self.server.disconnected.set()
+            self.close_connection = True
+
+
+class TestAsyncStreamMultiplexer(LocalServerMixin, unittest.IsolatedAsyncioTestCase):
+    handler = _Handler
+
+    async def asyncSetUp(self):
+        self.server.disconnected = threading.Event()
+        self.transport = AsyncHttpTransport()
+        auth_service = Mock()
+        auth_service.auth = AsyncMock(return_value=({"authenticated": True}, 200))
+        self.env = patch.dict(os.environ, {"BASE_URL": self.base_url})
+        self.env.start()
+        self.auth_service = auth_service
+
+    async def asyncTearDown(self):
+        self.env.stop()
+        await self.transport.aclose()
+
+    def multiplexer(self, **options):
+        return AsyncStreamMultiplexer(auth_service=self.auth_service, transport=self.transport, **options)
+
+    async def test_events_are_tagged_and_merged(self):
+        async with self.multiplexer() as mux:
+            for index in range(3):
+                mux.add_thread_chat(index, "docs", f"short-{index}", "hi", "chat", 1, "token")
+            events = [event async for event in mux]
+        for index in range(3):
+            own = [event for event in events if event.stream_id == index]
+            self.assertEqual("".join(event.delta for event in own if event.delta), "abc")
+            self.assertTrue(own[-1].done)
+            self.assertEqual(own[-1].status_code, 200)
+
+    async def test_ready_streams_are_served_in_turn(self):
+        async with self.multiplexer(buffer_size=8, quantum=4) as mux:
+            mux.add_thread_chat("a", "docs", "burst-a", "hi", "chat", 1, "token")
+            mux.add_thread_chat("b", "docs", "burst-b", "hi", "chat", 1, "token")
+            # Les deux buffers se remplissent, puis la lecture des flux s'arrête
+            await asyncio.sleep(0.3)
+            order = [event.stream_id async for event in mux if not event.done]
+        self.assertEqual((order.count("a"), order.count("b")), (201, 201))
+        first = order[:16]
+        self.assertEqual(first.count("a"), 8)
+        self.assertTrue(all(len(set(first[index:index + 4])) == 1 for index in range(0, 16, 4)))
+
+    async def test_slow_consumer_cancels_only_the_stalled_stream(self):
+        async with self.multiplexer(buffer_size=4, stall_timeout=0.2) as mux:
+            mux.add_thread_chat("endless", "docs", "endless", "hi", "chat", 1, "token")
+            await asyncio.sleep(0.6)
+            mux.add_thread_chat("short", "docs", "short", "hi", "chat", 1, "token")
+            events = [event async for event in mux]
+        endless = [event for event in events if event.stream_id == "endless"]
+        self.assertLessEqual(len(endless), 6)
+        self.assertIn("stalled", endless[-2].event.error)
+        self.assertTrue(endless[-1].cancelled)
+        self.assertTrue(self.server.disconnected.wait(2))
+        self.assertEqual("".join(event.delta or "" for event in events if event.stream_id == "short"), "abc")
+
+    async def test_cancel_one_stream_and_report_open_errors(self):
+        async with self.multiplexer() as mux:
+            mux.add_thread_chat("endless", "docs", "endless", "hi", "chat", 1, "token")
+            mux.add_thread_chat("missing", "docs", "missing", "hi", "chat", 1, "token")
+            finished = {}
+            async for event in mux:
+                if event.done:
+                    finished[event.stream_id] = event
+                    if event.stream_id == "missing":
+                        await mux.cancel("endless")
+        self.assertEqual(finished["missing"].status_code, 404)
+        self.assertTrue(finished["endless"].cancelled)
+        self.assertTrue(self.server.disconnected.wait(2))
+        with self.assertRaises(ValueError):
+            mux2 = self.multiplexer()
+            mux2.add_thread_chat("a", "docs", "short", "hi", "chat", 1, "token")
+            try:
+                mux2.add_thread_chat("a", "docs", "short", "hi", "chat", 1, "token")
+            finally:
+                await mux2.aclose()
+
+
+if __name__ == "__main__":
+    unittest.main()
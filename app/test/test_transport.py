@@ -0,0 +1,42 @@
+import unittest
+from unittest.mock import patch
+from services.transport import HttpTransport
+from services.workspace import WorkspaceService
+from test.local_server import LocalServerMixin, RouteHandler
+
+# app/test/test_transport.py
+
+class _Handler(RouteHandler):
+    def do_GET(self):
+        self.send_json({"path": self.path})
+
+
+class TestHttpTransport(LocalServerMixin, unittest.TestCase):
+    handler = _Handler
+    base_path = ""
+
+    def test_connections_are_reused(self):
+        with HttpTransport(pool_maxsize=2) as transport:
+            for _ in range(5):
+                response = transport.get(f"{self.base_url}/v1/auth")
+                self.assertEqual(response.json(), {"path": "/v1/auth"})
+            self.assertEqual(transport.pool_misses, 1)
+            self.assertEqual(transport.pool_hits, 4)
+
+    def test_default_timeout_is_applied(self):
+        transport = HttpTransport(timeout=3)
+        with patch.object(transport.session, "request") as mock_request:
+            transport.get(f"{self.base_url}/v1/auth")
+            self.assertEqual(mock_request.call_args.kwargs["timeout"], 3)
+            transport.get(f"{self.base_url}/v1/auth", timeout=10)
+            self.assertEqual(mock_request.call_args.kwargs["timeout"], 10)
+
+    def test_services_share_the_transport(self):
+        transport = HttpTransport()
+        service = WorkspaceService(transport=transport)
+        self.assertIs(service.transport, transport)
+        self.assertIs(service.auth_service.transport, transport)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, Mock
+from services.upload_index import UploadIndex
+from services.documents import DocumentService
+from services.systemsettings import SystemSettingsService
+
+# app/test/test_upload_index.py
+
+UPLOAD_RESPONSE = {"success": True, "error": None, "documents": [{"location": "custom-documents/a.txt-1234.json"}]}
+
+
+class TestUploadIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = UploadIndex(":memory:")
+        self.auth_service = Mock()
+        self.auth_service.auth.return_value = ({"authenticated": True}, 200)
+        self.document_service = DocumentService(auth_service=self.auth_service, transport=Mock(), upload_index=self.index)
+        with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as tmp:
+            tmp.write("same content")
+        self.path = tmp.name
+
+    def tearDown(self):
+        os.remove(self.path)
+
+    def test_same_file_is_uploaded_once(self):
+        with patch.object(self.document_service, "_call", return_value=(UPLOAD_RESPONSE, 200)) as mock_request:
+            first, _ = self.document_service.upload_file(self.path, "token")
+            second, status_code = self.document_service.upload_file(self.path, "token")
+        self.assertEqual(mock_request.call_count, 1)
+        self.assertEqual(status_code, 200)
+        self.assertTrue(second["cached"])
+        self.assertEqual(second["documents"], first["documents"])
+
+    def test_indexed_upload_still_checks_the_token(self):
+        with patch.object(self.document_service, "_call", return_value=(UPLOAD_RESPONSE, 200)):
+            self.document_service.upload_file(self.path, "token")
+        self.auth_service.auth.return_value = ({"message": "invalid"}, 403)
+        response, status_code = self.document_service.upload_file(self.path, "bad")
+        self.assertEqual(status_code, 403)
+        self.assertEqual(response["error"], "Authentication failed")
+
+    def test_failed_upload_is_not_indexed(self):
+        with patch.object(self.document_service, "_call", return_value=({"error": "HTTP Error: boom"}, 500)) as mock_request:
+            self.document_service.upload_file(self.path, "token")
+            self.document_service.upload_file(self.path, "token")
+        self.assertEqual(mock_request.call_count, 2)
+
+    def test_raw_text_depends_on_metadata(self):
+        with patch.object(self.document_service, "_call", return_value=(UPLOAD_RESPONSE, 200)) as mock_request:
+            self.document_service.upload_raw_text("text", {"title": "a"}, "token")
+            self.document_service.upload_raw_text("text", {"title": "a"}, "token")
+            self.document_service.upload_raw_text("text", {"title": "b"}, "token")
+        self.assertEqual(mock_request.call_count, 2)
+
+    def test_remove_documents_invalidates_index(self):
+        with patch.object(self.document_service, "_call", return_value=(UPLOAD_RESPONSE, 200)):
+            self.document_service.upload_file(self.path, "token")
+        self.assertEqual(len(self.index), 1)
+
+        transport = Mock()
+        transport.delete.return_value = Mock(status_code=200, json=Mock(return_value={"success": True}))
+        settings_service = SystemSettingsService(auth_service=self.auth_service, transport=transport, upload_index=self.index)
+        settings_service.base_url = self.document_service.base_url
+        settings_service.remove_documents(["custom-documents/a.txt-1234.json"], "token")
+        self.assertEqual(len(self.index), 0)
+
+    def test_index_is_persistent(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_path = os.path.join(tmpdir, "index.sqlite3")
+            index = UploadIndex(db_path)
+            index.put("http://server/api", "file:abc", UPLOAD_RESPONSE)
+            index.close()
+            reopened = UploadIndex(db_path)
+            self.assertEqual(reopened.get("http://server/api", "file:abc"), UPLOAD_RESPONSE)
+            self.assertIsNone(reopened.get("http://other/api", "file:abc"))
+            reopened.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
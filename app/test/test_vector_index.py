@@ -0,0 +1,72 @@
+import tempfile
+import unittest
+import numpy as np
+from services.vector_index import VectorIndex
+
+# app/test/test_vector_index.py
+
+class TestVectorIndex(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.vectors = rng.normal(size=(200, 16)).astype(np.float32)
+        self.ids = [f"doc-{i}" for i in range(200)]
+        self.index = VectorIndex(initial_capacity=8)
+        self.index.add(self.ids, self.vectors)
+
+    def brute_force(self, query, k):
+        normalized = self.vectors / np.linalg.norm(self.vectors, axis=1, keepdims=True)
+        scores = normalized @ (query / np.linalg.norm(query))
+        return [self.ids[i] for i in np.argsort(-scores)[:k]]
+
+    def test_search_matches_brute_force(self):
+        query = self.vectors[42] + 0.1
+        results = self.index.search(query, k=5)
+        self.assertEqual([id_ for id_, _ in results], self.brute_force(query, 5))
+        self.assertEqual(results[0][0], "doc-42")
+
+    def test_batch_search(self):
+        results = self.index.search(self.vectors[:3], k=2)
+        self.assertEqual([r[0][0] for r in results], ["doc-0", "doc-1", "doc-2"])
+
+    def test_remove_and_replace(self):
+        self.assertEqual(self.index.remove(["doc-42", "unknown"]), 1)
+        self.assertNotIn("doc-42", self.index)
+        self.assertEqual(len(self.index), 199)
+        self.assertNotEqual(self.index.search(self.vectors[42], k=1)[0][0], "doc-42")
+        self.assertEqual(self.index.search(self.vectors[199], k=1)[0][0], "doc-199")
+
+        self.index.add(["doc-7"], self.vectors[8])
+        self.assertEqual(len(self.index), 199)
+        self.assertEqual(self.index.search(self.vectors[8], k=2)[1][1], self.index.search(self.vectors[8], k=2)[0][1])
+
+    def test_search_and_empty_adds_do_not_fix_the_dimension(self):
+        index = VectorIndex()
+        self.assertEqual(index.search(np.ones(3)), [])
+        index.add_embeddings({"ids": [], "embeddings": np.empty((0, 0), dtype=np.float32)})
+        self.assertIsNone(index.dim)
+        index.add(["a"], np.ones(4))
+        self.assertEqual(index.search(np.ones(4), k=1)[0][0], "a")
+        with self.assertRaises(ValueError):
+            index.search(np.ones(3))
+
+    def test_add_embeddings_from_service_output(self):
+        index = VectorIndex(metric="dot")
+        index.add_embeddings({"data": [{"embedding": [1.0, 0.0], "index": 0}, {"embedding": [0.0, 2.0], "index": 1}]}, ids=["a", "b"])
+        index.add_embeddings({"ids": [0], "embeddings": np.array([[3.0, 3.0]], dtype=np.float32)}, ids=["c"])
+        self.assertEqual([id_ for id_, _ in index.search([0.0, 1.0], k=3)], ["c", "b", "a"])
+
+    def test_save_and_load_with_mmap(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.index.save(tmpdir)
+            loaded = VectorIndex.load(tmpdir)
+            self.assertIsInstance(loaded.vectors, np.memmap)
+            self.assertEqual(loaded.search(self.vectors[10], k=3), self.index.search(self.vectors[10], k=3))
+            loaded.add(["new"], self.vectors[0] * -1)
+            loaded.remove(["doc-0"])
+            self.assertEqual(len(loaded), 200)
+            self.assertEqual(loaded.search(-self.vectors[0], k=1)[0][0], "new")
+            del loaded
+
+
+if __name__ == '__main__':
+    unittest.main()